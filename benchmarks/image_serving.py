@@ -0,0 +1,75 @@
+"""이미지 전송 방식별 처리량 비교
+
+같은 이미지를 파이썬이 직접 보내는 서버 (image_offload = none) 와
+nginx 가 X-Accel-Redirect 로 보내는 서버 (image_offload = x-accel) 에 동시에 요청해서 초당 요청 수, 지연 시간, 전송량을 비교함
+조건부 요청 없이 매번 전체 파일을 받아서 디스크 -> 소켓 경로 자체를 측정함
+
+    python -m benchmarks.image_serving images/ab/cd/<hash>.jpg http://127.0.0.1:8000 http://127.0.0.1:8080 --requests 2000 --concurrency 32
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import httpx
+import time
+
+async def run(base_url: str, path: str, requests: int, concurrency: int, size: str) -> Dict[str, float]:
+    """
+    Parameters:
+        base_url (str): 서버 주소 (직접 전송이면 uvicorn, 프록시 전송이면 nginx) \n
+        path (str): 요청할 이미지 경로 \n
+        requests (int): 전체 요청 수 \n
+        concurrency (int): 동시에 보내는 요청 수 \n
+        size (str): thumb, card, full 중 하나 \n
+
+    Returns:
+        Dict[str, float]: 초당 요청 수, 지연 시간 백분위 (ms), 초당 전송량 (MB), 실패 수 \n
+    """
+    latencies: List[float] = []
+    received = 0
+    failed = 0
+    remaining = iter(range(requests))
+    params = {"path": path, "size": size}
+
+    async with httpx.AsyncClient(base_url = base_url, timeout = 30, limits = httpx.Limits(max_connections = concurrency)) as client:
+        # 연결을 미리 열어서 첫 요청의 TCP 연결 시간이 결과에 섞이지 않게 함
+        await asyncio.gather(*[client.get("/item/images/", params = params) for _ in range(concurrency)])
+
+        async def worker() -> None:
+            nonlocal received, failed
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get("/item/images/", params = params)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    failed += 1
+
+                received += len(response.content)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "mb_per_s": received / elapsed / 1024 / 1024,
+        "failed": failed
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "이미지 전송 방식별 처리량 비교")
+    parser.add_argument("path", help = "요청할 이미지 경로 (images/...)")
+    parser.add_argument("urls", nargs = "+", help = "비교할 서버 주소들 (예: 직접 전송 uvicorn, X-Accel-Redirect nginx)")
+    parser.add_argument("--requests", type = int, default = 2000)
+    parser.add_argument("--concurrency", type = int, default = 32)
+    parser.add_argument("--size", default = "full", choices = ["thumb", "card", "full"])
+    args = parser.parse_args()
+
+    print(f"{'server':<32} {'req/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'MB/s':>10} {'failed':>8}")
+    for url in args.urls:
+        result = asyncio.run(run(url, args.path, args.requests, args.concurrency, args.size))
+        print(f"{url:<32} {result['rps']:>10.1f} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} {result['p99_ms']:>10.2f} {result['mb_per_s']:>10.2f} {result['failed']:>8}")
@@ -1,3 +1,4 @@
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.engine.base import Connection
 from sqlalchemy.orm.session import Session
 from sqlalchemy.orm import sessionmaker
@@ -25,7 +26,7 @@ def load_mysql_user_info() -> Dict[str, Any]:
         if len(keys) != len(values):
             raise IndexError("Please Match Keys And Values")
 
-        must_info = ["host", "user", "password"]
+        must_info = [] if "sqlite" in keys else ["host", "user", "password"]
         for info in must_info:
             if info not in keys:
                 raise KeyError("Insufficient information entered")
@@ -33,7 +34,22 @@ def load_mysql_user_info() -> Dict[str, Any]:
         return {keys[i]: values[i] for i in range(len(keys))}
     
 user_info = load_mysql_user_info()
-DB_URL = f'mysql+pymysql://{user_info["user"]}:{user_info["password"]}@{user_info["host"]}:{user_info["port"]}/{user_info["db"]}'
+if "sqlite" in user_info:
+    # 로컬 실행용: user_info.txt 에 sqlite = ./mac.db 처럼 파일 경로만 적으면 됨
+    DB_URL = f'sqlite:///{user_info["sqlite"]}'
+    ASYNC_DB_URL = f'sqlite+aiosqlite:///{user_info["sqlite"]}'
+
+else:
+    DB_URL = f'mysql+pymysql://{user_info["user"]}:{user_info["password"]}@{user_info["host"]}:{user_info["port"]}/{user_info["db"]}'
+    ASYNC_DB_URL = f'mysql+aiomysql://{user_info["user"]}:{user_info["password"]}@{user_info["host"]}:{user_info["port"]}/{user_info["db"]}'
+
+# 커넥션 풀 설정, user_info.txt 에 pool_size = 20 처럼 적어서 덮어쓸 수 있음
+POOL_OPTIONS = {
+    "pool_size": int(user_info.get("pool_size", 10)), # 유지하는 커넥션 개수
+    "max_overflow": int(user_info.get("max_overflow", 20)), # pool_size 를 넘어 잠깐 더 열 수 있는 커넥션 개수
+    "pool_pre_ping": user_info.get("pool_pre_ping", "true").lower() == "true", # 꺼내기 전에 살아있는 커넥션인지 확인
+    "pool_recycle": int(user_info.get("pool_recycle", 3600)) # MySQL wait_timeout 전에 커넥션을 새로 맺는 주기(초)
+}
 
 
 class EngineConn(object):
@@ -53,7 +69,7 @@ class EngineConn(object):
         return cls.instance
     
     def __init__(self):
-        self.engine = create_engine(DB_URL)
+        self.engine = create_engine(DB_URL, **POOL_OPTIONS)
     
     def session_maker(self) -> Session:
         Session = sessionmaker(bind = self.engine)
@@ -70,4 +86,26 @@ class EngineConn(object):
 
     def connection(self) -> Connection:
         return self.engine.connect()
-    
\ No newline at end of file
+
+
+class AsyncEngineConn(object):
+    """ 비동기 드라이버(aiomysql, aiosqlite)로 데이터 베이스와 연동을 도와주는 클래스
+    
+    Methods:
+        session_maker(self) : 이벤트 루프를 막지 않는 AsyncSession 을 생성해 주는 class 메소드 \n
+    """
+    
+    def __new__(cls, *args, **kwargs):
+        """싱글톤 패턴을 위해 추가"""
+        if not hasattr(cls, 'instance'):
+            cls.instance = super(AsyncEngineConn, cls).__new__(cls)
+            
+        return cls.instance
+    
+    def __init__(self):
+        if not hasattr(self, "engine"):
+            self.engine = create_async_engine(ASYNC_DB_URL, **POOL_OPTIONS)
+            self.session_factory = async_sessionmaker(bind = self.engine, expire_on_commit = False)
+    
+    def session_maker(self) -> AsyncSession:
+        return self.session_factory()
@@ -0,0 +1,124 @@
+"""아무 데도 쓰이지 않는 이미지 파일을 지우는 가비지 컬렉터
+
+1. item_images.path, user.profile 을 스트리밍으로 읽어서 실제 참조 수를 세고 image_blob.ref_count 를 맞춤
+   (물품 삭제의 CASCADE 등으로 release 없이 사라진 참조를 바로잡음)
+2. 저장소를 폴더 단위 배치로 훑으면서 참조가 없고 grace_hours 보다 오래된 파일 (해시 파일, uuid 이름의 예전 파일, 남은 임시 파일) 을 지움
+3. 파일이 이미 없는 ref_count 0 행을 지움
+
+유예 시간 안에 업로드 되었거나 다시 참조된 파일은 지우지 않으므로 서버가 켜져 있는 동안 실행해도 됨
+user_info.txt 에 image_gc_interval (초) 을 적으면 서버가 백그라운드에서 주기적으로 실행하고, 직접 실행할 수도 있음
+
+    python -m database.jobs.image_gc [grace_hours] [--dry-run]
+"""
+from database.storage import ImageStorage, image_storage
+from database.models.item_images import ItemImages
+from database.models.image_blob import ImageBlob
+from sqlalchemy.orm.session import Session
+from database.conn import EngineConn
+from database.models.user import User
+from sqlalchemy.sql import func
+from datetime import timedelta
+from collections import Counter
+from typing import Dict, Set, Tuple
+import time
+import sys
+import os
+
+def load_references(db_session: Session, storage: ImageStorage, batch_size: int) -> Tuple[Counter, Set[str]]:
+    """ (해시별 참조 수, 해시가 아닌 예전 경로 집합), 경로 전체 대신 해시만 들고 있음 """
+    referenced: Counter = Counter()
+    legacy: Set[str] = set()
+    for column in [ItemImages.path, User.profile]:
+        for (path,) in db_session.query(column).filter(column != None).yield_per(batch_size): #type: ignore
+            digest = storage.digest_of(path)
+            if digest is not None:
+                referenced[digest] += 1
+
+            else:
+                legacy.add(os.path.normpath(path))
+
+    return referenced, legacy
+
+def collect(db_session: Session, storage: ImageStorage = image_storage, grace_hours: float = 24, batch_size: int = 1000, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Parameters:
+        db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체, 배치마다 commit 함 \n
+        storage (ImageStorage): 파일 저장소 \n
+        grace_hours (float): 마지막으로 쓰이거나 수정된 뒤 이 시간이 지나야 지움 \n
+        batch_size (int): 한 번에 읽고 지우는 개수 \n
+        dry_run (bool): True 면 아무것도 바꾸지 않고 지울 대상만 셈 \n
+
+    Returns:
+        Dict[str, int]: 고친 참조 수, 지운 image_blob 행, 지운 파일 묶음, 되찾은 바이트 \n
+    """
+    report = {"ref_counts_fixed": 0, "blobs_inserted": 0, "blobs_deleted": 0, "files_deleted": 0, "reclaimed_bytes": 0}
+    started = db_session.query(func.now()).scalar()
+    db_cutoff = started - timedelta(hours = grace_hours)
+    file_cutoff = time.time() - grace_hours * 3600
+
+    referenced, legacy = load_references(db_session, storage, batch_size)
+
+    # 1. ref_count 를 실제 참조 수로 맞춤
+    for batch in ImageBlob.iter_ref_counts(db_session, batch_size):
+        drifted = {hash: referenced.get(hash, 0) for hash, ref_count in batch if ref_count != referenced.get(hash, 0)}
+        if drifted:
+            report["ref_counts_fixed"] += len(drifted) if dry_run else ImageBlob.fix_ref_counts(db_session, drifted, started)
+            db_session.commit()
+
+    digests = list(referenced)
+    for i in range(0, len(digests), batch_size):
+        chunk = digests[i: i + batch_size]
+        existing = ImageBlob.get_ref_counts_by_hashes(db_session, chunk)
+        missing = [(digest, os.path.getsize(storage.path(digest)) if storage.exists(storage.path(digest)) else 0, referenced[digest]) for digest in chunk if digest not in existing]
+        report["blobs_inserted"] += len(missing)
+        if missing and not dry_run:
+            ImageBlob.insert_many(db_session, missing)
+            db_session.commit()
+
+    # 2. 참조가 없고 오래된 파일을 지움
+    for batch in storage.scan(batch_size):
+        old = [(storage.digest_of(path), path, size) for path, size, modified in batch if modified < file_cutoff]
+        candidates = {digest: (path, size) for digest, path, size in old if digest is not None}
+        legacy_paths = [(path, size) for digest, path, size in old if digest is None]
+        ref_counts = ImageBlob.get_ref_counts_by_hashes(db_session, list(candidates)) # type: ignore
+        for digest, (path, size) in candidates.items():
+            if referenced.get(digest, 0) > 0 or ref_counts.get(digest, 0) > 0: # type: ignore
+                continue
+
+            if not dry_run:
+                # 행을 먼저 지우고 commit 해서, 그 사이 다시 참조된 파일 (updated_at 이 바뀜) 은 남김
+                if digest in ref_counts and not ImageBlob.delete_unreferenced(db_session, digest, db_cutoff): # type: ignore
+                    continue
+
+                db_session.commit()
+                size = storage.delete(path)
+
+            report["blobs_deleted"] += digest in ref_counts
+            report["files_deleted"] += 1
+            report["reclaimed_bytes"] += size
+
+        for path, size in legacy_paths:
+            if os.path.normpath(path) in legacy:
+                continue
+
+            report["files_deleted"] += 1
+            report["reclaimed_bytes"] += size if dry_run else storage.delete(path)
+
+    # 3. 파일이 이미 없는 ref_count 0 행
+    for hashes in ImageBlob.get_unreferenced_hashes(db_session, db_cutoff, batch_size):
+        for digest in hashes:
+            if referenced.get(digest, 0) == 0 and not storage.exists(storage.path(digest)):
+                report["blobs_deleted"] += 1 if dry_run else ImageBlob.delete_unreferenced(db_session, digest, db_cutoff)
+
+        if not dry_run:
+            db_session.commit()
+
+    return report
+
+if __name__ == "__main__":
+    arguments = [argument for argument in sys.argv[1:] if argument != "--dry-run"]
+    grace_hours = float(arguments[0]) if arguments else 24
+    db_session = EngineConn().session_maker()
+    report = collect(db_session, grace_hours = grace_hours, dry_run = "--dry-run" in sys.argv)
+    db_session.close()
+    print(report)
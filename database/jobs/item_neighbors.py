@@ -0,0 +1,68 @@
+"""saved_items, purchase 를 기준으로 함께 저장/구매된 아이템 상위 N 개를 item_neighbors 에 다시 채우는 작업
+
+유저 x 아이템 0/1 행렬 X 를 희소 행렬로 만들고 X.T @ X 로 아이템끼리 함께 나온 유저 수를 센 뒤,
+인기 아이템이 모든 곳에 끼지 않도록 코사인 유사도 (함께 나온 수 / sqrt(각 아이템 유저 수의 곱)) 로 나눠서 순위를 매김
+numpy, scipy 가 필요하며 주기적으로 (예: cron 으로 1시간마다) 실행
+
+    python -m database.jobs.item_neighbors [top_n]
+"""
+from database.models.item_neighbors import ItemNeighbors
+from database.models.saved_items import SavedItems
+from database.models.purchase import Purchase
+from sqlalchemy.orm.session import Session
+from database.conn import EngineConn
+from typing import List, Tuple
+from scipy import sparse
+import numpy as np
+import sys
+
+def load_pairs(db_session: Session) -> np.ndarray:
+    """ (user_seq, item_seq) 쌍, 같은 유저가 저장도 하고 구매도 했으면 나중에 하나로 합쳐짐 """
+    pairs = [pair for table in [SavedItems, Purchase] for pair in db_session.query(table.user_seq, table.item_seq).yield_per(10000)]
+    return np.array(pairs, dtype = np.int64).reshape(-1, 2)
+
+def build_neighbors(pairs: np.ndarray, top_n: int) -> List[Tuple[int, int, int, float]]:
+    """
+    Parameters:
+        pairs (np.ndarray): (user_seq, item_seq) 쌍, shape = (n, 2) \n
+        top_n (int): 아이템마다 저장할 이웃 개수 \n
+
+    Returns:
+        List[Tuple[int, int, int, float]]: (item_seq, rank, neighbor_seq, score) 목록 \n
+    """
+    if len(pairs) == 0:
+        return []
+
+    users, user_index = np.unique(pairs[:, 0], return_inverse = True)
+    items, item_index = np.unique(pairs[:, 1], return_inverse = True)
+    interactions = sparse.csr_matrix((np.ones(len(pairs), dtype = np.float64), (user_index, item_index)), shape = (len(users), len(items)))
+    interactions.data[:] = 1.0
+
+    co_counts = (interactions.T @ interactions).tocsr()
+    item_counts = co_counts.diagonal()
+    co_counts = (co_counts - sparse.diags(item_counts)).tocsr()
+    co_counts.eliminate_zeros()
+
+    norm = sparse.diags(1.0 / np.sqrt(item_counts))
+    similarity = (norm @ co_counts @ norm).tocsr()
+
+    rows: List[Tuple[int, int, int, float]] = []
+    for i in range(similarity.shape[0]):
+        start, end = similarity.indptr[i], similarity.indptr[i + 1]
+        if start == end:
+            continue
+
+        scores, columns = similarity.data[start:end], similarity.indices[start:end]
+        # 점수 내림차순, 같으면 아이템 고유 번호 오름차순 (부동소수점 오차로 순서가 바뀌지 않도록 반올림해서 비교)
+        top = np.lexsort((items[columns], -np.round(scores, 12)))[:top_n]
+        rows.extend((int(items[i]), rank, int(items[columns[j]]), float(scores[j])) for rank, j in enumerate(top))
+
+    return rows
+
+if __name__ == "__main__":
+    top_n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    db_session = EngineConn().session_maker()
+    rows = build_neighbors(load_pairs(db_session), top_n)
+    ItemNeighbors.replace_all(db_session, rows)
+    db_session.commit()
+    print(f"item_neighbors 에 저장한 행 개수: {len(rows)}")
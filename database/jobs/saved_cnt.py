@@ -0,0 +1,14 @@
+"""item.saved_cnt 를 saved_items 기준으로 다시 맞추는 작업
+
+회원 탈퇴로 saved_items 가 CASCADE 삭제되는 등 카운터가 틀어질 수 있어서 주기적으로 (예: cron 으로 하루 1번) 실행
+
+    python -m database.jobs.saved_cnt
+"""
+from database.models.item import Item
+from database.conn import EngineConn
+
+if __name__ == "__main__":
+    db_session = EngineConn().session_maker()
+    fixed = Item.reconcile_saved_cnt(db_session)
+    db_session.commit()
+    print(f"saved_cnt 를 고친 아이템 개수: {fixed}")
\ No newline at end of file
@@ -1,4 +1,9 @@
+from database.search.fulltext import FullTextIndex
 from database.conn import EngineConn
+from sqlalchemy import inspect, text
+from .item_neighbors import ItemNeighbors
+from .image_blob import ImageBlob
+from .item_viewers import ItemViewers
 from .item_images import ItemImages
 from .saved_items import SavedItems
 from .category import Category
@@ -8,6 +13,19 @@ from .user import User
 from .item import Item
 
 def create_table(engine: EngineConn):
-    tables = [User, SavedItems, Category, Item, ItemImages, Purchase, Address]
+    tables = [User, SavedItems, Category, Item, ItemImages, ItemViewers, ItemNeighbors, ImageBlob, Purchase, Address]
     for table in tables:
-        table.__table__.create(bind = engine.engine, checkfirst = True)
\ No newline at end of file
+        table.__table__.create(bind = engine.engine, checkfirst = True)
+        for index in table.__table__.indexes:
+            index.create(bind = engine.engine, checkfirst = True)
+            
+    if "saved_cnt" not in {column["name"] for column in inspect(engine.engine).get_columns("item")}:
+        # saved_cnt 컬럼이 생기기 전에 만든 테이블이면 컬럼을 추가하고 저장 횟수를 한 번 채워줌
+        with engine.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE item ADD COLUMN saved_cnt INT NOT NULL DEFAULT 0"))
+            
+        db_session = engine.session_maker()
+        Item.reconcile_saved_cnt(db_session)
+        db_session.commit()
+        
+    FullTextIndex.create(engine.engine)
\ No newline at end of file
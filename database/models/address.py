@@ -2,6 +2,7 @@ from sqlalchemy import Column, String, BIGINT, TEXT, BOOLEAN, ForeignKeyConstrai
 from database.models.results import MACResult
 from sqlalchemy.orm.session import Session
 from sqlalchemy.exc import IntegrityError
+from database.utility.commit_hooks import rollback_only
 from database.models.base import Base
 from pydantic import BaseModel
 from typing import Optional
@@ -72,6 +73,7 @@ class Address(Base):
         try:
             address_obj = Address(user_seq, road_full_addr, eng_addr, zip_no, adm_cd, rn_mgt_sn, bg_mgt_sn, si_nm, sgg_nm, emd_nm, rn, addr_detail)
             db_session.add(address_obj)
+            db_session.flush()
             
             return MACResult.SUCCESS
 
@@ -81,11 +83,9 @@ class Address(Base):
             
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
             
-        finally:
-            db_session.commit()
-            
     @staticmethod
     def delete_address(db_session: Session, user_seq: int, road_full_addr: str):
         try:
@@ -94,10 +94,8 @@ class Address(Base):
             
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
-        
-        finally:
-            db_session.commit()
             
     @staticmethod
     def get_address(db_session: Session, user_seq: int):
@@ -118,6 +116,7 @@ class Address(Base):
         
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.FAIL
         
     @staticmethod
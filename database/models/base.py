@@ -1,3 +1,7 @@
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import BIGINT, INTEGER
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+# SQLite 는 INTEGER PRIMARY KEY 만 자동 증가하므로, 로컬(aiosqlite) 실행을 위한 변형 타입
+BIGINT_PK = BIGINT().with_variant(INTEGER(), "sqlite")
\ No newline at end of file
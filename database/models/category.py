@@ -1,7 +1,8 @@
 from sqlalchemy import Column, BIGINT, String
 from sqlalchemy.orm.session import Session
-from typing import Optional, List, Union
-from database.models.base import Base
+from typing import Optional, List, Union, Dict
+from database.models.base import Base, BIGINT_PK
+from database.utility.commit_hooks import on_commit
 import traceback
 import logging
 
@@ -11,9 +12,13 @@ class Category(Base):
     """
     __tablename__ = "category"
     
-    seq = Column(BIGINT, nullable = False, autoincrement = True, primary_key = True) # 카테고리 일련번호
+    seq = Column(BIGINT_PK, nullable = False, autoincrement = True, primary_key = True) # 카테고리 일련번호
     name = Column(String(10), nullable = False, unique = True) # 카테고리 이름
     
+    # 프로세스 안에서 쓰는 카테고리 이름 <-> 고유 번호 사전, 서버 시작 시 load 로 채우고 카테고리가 바뀌면 invalidate
+    name_to_seq: Dict[str, int] = {}
+    seq_to_name: Dict[int, str] = {}
+    
     def __init__(self, name: str, seq: Optional[int] = None):
         self.seq = seq
         self.name = name
@@ -26,18 +31,32 @@ class Category(Base):
                 obj = Category(category)
                 db_session.add(obj)
             
-            db_session.commit()
+            db_session.flush()
+            # commit 전에 지우면 그 사이 요청이 아직 commit 안 된 카테고리를 모르는 채로 다시 채울 수 있음
+            on_commit(db_session, Category.invalidate)
             
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
             
         
+    @staticmethod
+    def load(db_session: Session) -> None:
+        result = db_session.query(Category.seq, Category.name).order_by(Category.seq.asc()).all()
+        Category.seq_to_name = {seq: name for seq, name in result}
+        Category.name_to_seq = {name: seq for seq, name in result}
+        
+    @staticmethod
+    def invalidate() -> None:
+        Category.seq_to_name = {}
+        Category.name_to_seq = {}
+        
     @staticmethod
     def get_all_category_name(db_session: Session) -> Optional[List[str]]:
         try:
-            result = db_session.query(Category.name).all()
-            categories = list(map(lambda x: x[0], result))
-            return categories
+            if not Category.seq_to_name:
+                Category.load(db_session)
+                
+            return list(Category.seq_to_name.values())
         
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
@@ -47,15 +66,22 @@ class Category(Base):
     def convert_member(db_session: Session, name: Optional[str] = None, seq: Optional[int] = None) -> Optional[Union[int, str]]:
         assert [name, seq].count(None), "name과 seq중 값 하나만 있어야 합니다."
         try:
+            if not Category.seq_to_name:
+                Category.load(db_session)
+                
             if name is not None:
-                result = db_session.query(Category.seq).filter_by(name = name).first()
+                return Category.name_to_seq.get(name)
                 
             else:
-                result = db_session.query(Category.name).filter_by(seq = seq).first()
-                
-            return None if result is None else result[0]
+                return Category.seq_to_name.get(seq) #type: ignore
         
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
             return None
-        
\ No newline at end of file
+        
+    @staticmethod
+    def convert_seqs_to_names(db_session: Session, seqs: List[int]) -> Dict[int, str]:
+        if not Category.seq_to_name:
+            Category.load(db_session)
+            
+        return {seq: Category.seq_to_name[seq] for seq in seqs if seq in Category.seq_to_name}
\ No newline at end of file
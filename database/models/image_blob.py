@@ -0,0 +1,142 @@
+from sqlalchemy import Column, BIGINT, INT, String, DateTime
+from sqlalchemy.orm.session import Session
+from sqlalchemy.exc import IntegrityError
+from database.models.base import Base
+from typing import Dict, Iterator, List, Tuple
+from sqlalchemy.sql import func
+from sqlalchemy import case
+from datetime import datetime
+
+class ImageBlob(Base):
+    """ImageBlob Class
+
+    내용 해시로 저장한 이미지 파일 하나를 몇 군데(상품 이미지, 프로필)에서 쓰고 있는지 세는 테이블
+    ref_count 가 0 이 된 파일은 바로 지우지 않고 가비지 컬렉터가 유예 시간이 지난 뒤에 지움
+    """
+    __tablename__ = "image_blob"
+
+    hash = Column(String(64), nullable = False, primary_key = True) # 업로드 원본의 sha256
+    size = Column(BIGINT, nullable = False, default = 0) # 저장된 full 이미지 크기 (바이트)
+    ref_count = Column(INT, nullable = False, default = 0) # 이 파일을 가리키는 행 개수
+    created_at = Column(DateTime(timezone = True), default = func.now())
+    updated_at = Column(DateTime(timezone = True), default = func.now()) # ref_count 가 마지막으로 바뀐 시간
+
+    def __init__(self, hash: str, size: int = 0, ref_count: int = 0):
+        self.hash = hash
+        self.size = size
+        self.ref_count = ref_count
+
+    @staticmethod
+    def acquire(db_session: Session, hash: str, size: int) -> None:
+        """ 참조 1 증가, 처음 보는 해시면 행을 만듦 """
+        query = db_session.query(ImageBlob).filter_by(hash = hash)
+        if query.update({"ref_count": ImageBlob.ref_count + 1, "updated_at": func.now()}, synchronize_session = False) == 0:
+            try:
+                # 같은 이미지가 동시에 처음 올라오면 한쪽은 PK 충돌이 나므로 savepoint 안에서 넣고 실패하면 증가로 바꿈
+                with db_session.begin_nested():
+                    db_session.add(ImageBlob(hash, size, 1))
+
+            except IntegrityError:
+                query.update({"ref_count": ImageBlob.ref_count + 1, "updated_at": func.now()}, synchronize_session = False)
+
+        db_session.flush()
+
+    @staticmethod
+    def acquire_many(db_session: Session, blobs: Dict[str, Tuple[int, int]]) -> None:
+        """ 여러 해시의 참조를 한 번에 올림, 있는 행은 CASE 문 UPDATE 1번, 처음 보는 해시는 bulk INSERT 1번
+
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            blobs (Dict[str, Tuple[int, int]]): 해시별 (늘릴 참조 수, 파일 크기) \n
+        """
+        if len(blobs) == 0:
+            return
+
+        existing = {hash for (hash,) in db_session.query(ImageBlob.hash).filter(ImageBlob.hash.in_(blobs.keys())).all()}
+        if existing:
+            db_session.query(ImageBlob).filter(ImageBlob.hash.in_(existing)).update({
+                "ref_count": ImageBlob.ref_count + case({hash: blobs[hash][0] for hash in existing}, value = ImageBlob.hash, else_ = 0),
+                "updated_at": func.now()
+            }, synchronize_session = False)
+
+        rows = [{"hash": hash, "size": size, "ref_count": count} for hash, (count, size) in blobs.items() if hash not in existing]
+        if rows:
+            try:
+                with db_session.begin_nested():
+                    db_session.bulk_insert_mappings(ImageBlob, rows) # type: ignore
+
+            except IntegrityError:
+                # 다른 요청이 같은 이미지를 먼저 처음 넣었으면 acquire 처럼 하나씩 다시 처리 (드문 경우라 여기서만 해시마다 쿼리)
+                for row in rows:
+                    for _ in range(row["ref_count"]):
+                        ImageBlob.acquire(db_session, row["hash"], row["size"])
+
+        db_session.flush()
+
+    @staticmethod
+    def release(db_session: Session, hash: str) -> None:
+        """ 참조 1 감소 (0 아래로는 내려가지 않음) """
+        db_session.query(ImageBlob).filter(ImageBlob.hash == hash, ImageBlob.ref_count > 0).update(
+            {"ref_count": ImageBlob.ref_count - 1, "updated_at": func.now()}, synchronize_session = False
+        )
+        db_session.flush()
+
+    @staticmethod
+    def iter_ref_counts(db_session: Session, batch_size: int) -> Iterator[List[Tuple[str, int]]]:
+        """ hash 순서로 batch_size 개씩 (hash, ref_count) 를 읽음, 커서를 열어두지 않도록 마지막 hash 다음부터 다시 조회 """
+        last = ""
+        while True:
+            batch = db_session.query(ImageBlob.hash, ImageBlob.ref_count).filter(ImageBlob.hash > last).order_by(ImageBlob.hash.asc()).limit(batch_size).all()
+            if len(batch) == 0:
+                return
+
+            yield [(hash, ref_count) for hash, ref_count in batch]
+            last = batch[-1][0]
+
+    @staticmethod
+    def get_ref_counts_by_hashes(db_session: Session, hashes: List[str]) -> Dict[str, int]:
+        if len(hashes) == 0:
+            return {}
+
+        return {hash: ref_count for hash, ref_count in db_session.query(ImageBlob.hash, ImageBlob.ref_count).filter(ImageBlob.hash.in_(hashes)).all()}
+
+    @staticmethod
+    def fix_ref_counts(db_session: Session, counts: Dict[str, int], before: datetime) -> int:
+        """ 실제 참조 수로 ref_count 를 고침, before 이후에 acquire/release 된 행은 집계와 어긋날 수 있어서 건너뜀
+
+        Returns:
+            int: 고친 행 개수 \n
+        """
+        fixed = 0
+        for hash, ref_count in counts.items():
+            fixed += db_session.query(ImageBlob).filter(ImageBlob.hash == hash, ImageBlob.updated_at < before).update(
+                {"ref_count": ref_count, "updated_at": func.now()}, synchronize_session = False
+            )
+
+        db_session.flush()
+        return fixed
+
+    @staticmethod
+    def delete_unreferenced(db_session: Session, hash: str, before: datetime) -> bool:
+        """ ref_count 가 0 이고 before 이전부터 바뀌지 않은 행만 지움, 그 사이에 다시 참조되었으면 False """
+        deleted = db_session.query(ImageBlob).filter(ImageBlob.hash == hash, ImageBlob.ref_count == 0, ImageBlob.updated_at < before).delete(synchronize_session = False)
+        db_session.flush()
+        return deleted == 1
+
+    @staticmethod
+    def get_unreferenced_hashes(db_session: Session, before: datetime, batch_size: int) -> Iterator[List[str]]:
+        last = ""
+        while True:
+            batch = db_session.query(ImageBlob.hash).filter(ImageBlob.hash > last, ImageBlob.ref_count == 0, ImageBlob.updated_at < before).order_by(ImageBlob.hash.asc()).limit(batch_size).all()
+            if len(batch) == 0:
+                return
+
+            yield [hash for (hash,) in batch]
+            last = batch[-1][0]
+
+    @staticmethod
+    def insert_many(db_session: Session, rows: List[Tuple[str, int, int]]) -> None:
+        """ (hash, size, ref_count) 목록으로 행을 만듦, 참조는 있는데 행이 없는 파일을 가비지 컬렉터가 채울 때 사용 """
+        if rows:
+            db_session.bulk_insert_mappings(ImageBlob, [{"hash": hash, "size": size, "ref_count": ref_count} for hash, size, ref_count in rows]) # type: ignore
+            db_session.flush()
@@ -1,26 +1,39 @@
-from sqlalchemy import Column, BIGINT, TEXT, INT, DateTime, BOOLEAN, ForeignKeyConstraint
-from typing import Optional, TypeVar, List, Any, Dict
+from sqlalchemy import Column, BIGINT, TEXT, INT, DateTime, BOOLEAN, ForeignKeyConstraint, Index
+from typing import Optional, TypeVar, List, Any, Dict, Set
+from database.utility.cursor_util import CursorUtility
 from database.utility.time_util import TimeUtility
+from database.utility.image_util import ImageUtility
+from database.utility.response_cache import response_cache
+from database.utility.commit_hooks import on_commit, rollback_only
+from database.models.item_neighbors import ItemNeighbors
+from database.models.item_viewers import ItemViewers
 from database.models.item_images import ItemImages
+from database.search import FullTextIndex, index_item, unindex_item, autocomplete_index, hangul_index, trending_index, similar_index
 from database.models.saved_items import SavedItems
 from database.models.category import Category
+from sqlalchemy.ext.asyncio import AsyncSession
 from database.models.results import MACResult
 from sqlalchemy.orm.session import Session
-from database.models.base import Base
+from database.models.base import Base, BIGINT_PK
 from sqlalchemy.sql import func
+from sqlalchemy import select, update, case, or_, and_
 from datetime import datetime
 import traceback
 import logging
 
 Item = TypeVar("Item", bound="Item")
 
+# fields= 로 고를 수 있는 응답 필드 (응답 dict 의 키 순서)
+INFO_FIELDS = ("seq", "middleman_name", "name", "category", "cnt", "price", "description", "views", "saved_cnt", "unique_viewers", "created_at", "images")
+RECOMMEND_FIELDS = ("seq", "name", "created_at", "price", "saved_cnt", "image_path")
+
 class Item(Base):
     """Item Class
     
     """
     __tablename__ = "item"
     
-    seq = Column(BIGINT, nullable = False, autoincrement = True, primary_key = True) # 아이템 일련번호
+    seq = Column(BIGINT_PK, nullable = False, autoincrement = True, primary_key = True) # 아이템 일련번호
     user_seq = Column(BIGINT, nullable = False) # 미들맨 고유 번호
     name = Column(TEXT, nullable = False) # 아이템 이름
     cnt = Column(INT, nullable = True, default = -1) # 아이템 잔여 개수
@@ -30,38 +43,79 @@ class Item(Base):
     created_at = Column(DateTime, nullable = True, default = func.now()) # 아이템 등록 날짜
     category_seq = Column(BIGINT, nullable = False) # 카테고리 고유 번호
     purchase_type = Column(BOOLEAN, default = False) # 상품 구매 상태 여부
+    saved_cnt = Column(INT, nullable = False, default = 0, server_default = "0") # 아이템을 저장한 유저 수, User.update_saved_items 에서 갱신
     
     __table_args__ = (ForeignKeyConstraint(
         ["category_seq"], ["category.seq"] , ondelete="CASCADE", onupdate="CASCADE"
-    ),)
+    ), Index("ix_item_recommend", "purchase_type", "views", "seq"),)
+    
+    def info(self, db_session: Session, fields: Optional[Set[str]] = None):    
+        return Item.info_many(db_session, [self], fields)[0]
+        
+    def recommend(self, db_session: Session, fields: Optional[Set[str]] = None):
+        return Item.recommend_many(db_session, [self], fields)[0]
     
-    def info(self, db_session: Session):    
+    @staticmethod
+    def info_many(db_session: Session, items: List[Item], fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            items (List[Item]): 상세 정보를 만들 아이템 목록 \n
+            fields (Set[str] | None): 만들 필드 (INFO_FIELDS 중 일부, seq 는 항상 포함), None 이면 전부 \n
+            
+        Returns:
+            List[Dict[str, Any]]: items 순서대로 만든 info 목록, 아이템 개수와 상관없이 쿼리 최대 3번으로 처리 \n
+            middleman_name, images, unique_viewers 를 빼면 해당 쿼리를 하지 않음 \n
+        """
         from database.models.user import User
-        return {
-            "seq": self.seq,
-            "middleman_name": User.convert_seq_to_name(db_session, self.user_seq), #type: ignore
-            "name": self.name,
-            "category": Category.convert_member(db_session, seq = self.category_seq), # type: ignore
-            "cnt": format(self.cnt, ','),
-            "price": format(self.price, ','),
-            "description": self.description,
-            "views": self.views,
-            "saved_cnt": len(SavedItems.get_saved_items_by_item_seq(db_session, self.seq)), #type: ignore
-            "created_at": TimeUtility.parse_time(self.created_at.strftime("%Y/%m/%d %H:%M:%S")),
-            "images": ItemImages.get_all_image_path(db_session, self.seq) #type: ignore
+        fields = set(INFO_FIELDS) if fields is None else fields | {"seq"}
+        seqs = [item.seq for item in items]
+        middleman_names = User.convert_seqs_to_names(db_session, [item.user_seq for item in items]) if "middleman_name" in fields else {} #type: ignore
+        category_names = Category.convert_seqs_to_names(db_session, [item.category_seq for item in items]) if "category" in fields else {} #type: ignore
+        images = ItemImages.get_all_image_path_by_item_seqs(db_session, seqs) if "images" in fields else {} #type: ignore
+        unique_viewers = ItemViewers.get_unique_viewers_by_item_seqs(db_session, seqs) if "unique_viewers" in fields else {} #type: ignore
+        
+        builders = {
+            "seq": lambda item: item.seq,
+            "middleman_name": lambda item: middleman_names.get(item.user_seq), #type: ignore
+            "name": lambda item: item.name,
+            "category": lambda item: category_names.get(item.category_seq), #type: ignore
+            "cnt": lambda item: format(item.cnt, ','),
+            "price": lambda item: format(item.price, ','),
+            "description": lambda item: item.description,
+            "views": lambda item: item.views,
+            "saved_cnt": lambda item: item.saved_cnt or 0,
+            "unique_viewers": lambda item: unique_viewers.get(item.seq, 0), #type: ignore
+            "created_at": lambda item: TimeUtility.parse_time(item.created_at.strftime("%Y/%m/%d %H:%M:%S")),
+            "images": lambda item: images.get(item.seq, []) #type: ignore
         }
+        return [{field: builders[field](item) for field in INFO_FIELDS if field in fields} for item in items]
         
-    def recommend(self, db_session: Session):
-        return {
-            "seq": self.seq,
-            "name": self.name,
-            "created_at": TimeUtility.parse_time(self.created_at.strftime("%Y/%m/%d %H:%M:%S")),
-            "price": self.price,
-            "saved_cnt": len(SavedItems.get_saved_items_by_item_seq(db_session, self.seq)), #type: ignore
-            "image_path": ItemImages.get_image_path(db_session, self.seq, 0) #type: ignore
+    @staticmethod
+    def recommend_many(db_session: Session, items: List[Item], fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            items (List[Item]): 목록 카드로 보여줄 아이템 목록 \n
+            fields (Set[str] | None): 만들 필드 (RECOMMEND_FIELDS 중 일부, seq 는 항상 포함), None 이면 전부 \n
+            
+        Returns:
+            List[Dict[str, Any]]: items 순서대로 만든 recommend 목록, 아이템 개수와 상관없이 쿼리 1번으로 처리 (image_path 를 빼면 0번) \n
+        """
+        fields = set(RECOMMEND_FIELDS) if fields is None else fields | {"seq"}
+        image_paths = ItemImages.get_image_path_by_item_seqs(db_session, [item.seq for item in items], 0) if "image_path" in fields else {} #type: ignore
+        
+        builders = {
+            "seq": lambda item: item.seq,
+            "name": lambda item: item.name,
+            "created_at": lambda item: TimeUtility.parse_time(item.created_at.strftime("%Y/%m/%d %H:%M:%S")),
+            "price": lambda item: item.price,
+            "saved_cnt": lambda item: item.saved_cnt or 0,
+            "image_path": lambda item: ImageUtility.variant_path(image_paths[item.seq], "card") if item.seq in image_paths else None #type: ignore
         }
+        return [{field: builders[field](item) for field in RECOMMEND_FIELDS if field in fields} for item in items]
     
-    def __init__(self, name: str, category_seq: int, user_seq: int, seq: Optional[int] = None, cnt: Optional[int] = None, price: Optional[int] = None, description: Optional[str] = None, views: Optional[int] = None, created_at: datetime = datetime.now(), purchase_type: Optional[bool] = None):
+    def __init__(self, name: str, category_seq: int, user_seq: int, seq: Optional[int] = None, cnt: Optional[int] = None, price: Optional[int] = None, description: Optional[str] = None, views: Optional[int] = None, created_at: Optional[datetime] = None, purchase_type: Optional[bool] = None, saved_cnt: Optional[int] = None):
         self.name = name
         self.category_seq = category_seq
         self.user_seq = user_seq
@@ -70,8 +124,10 @@ class Item(Base):
         self.price = price
         self.description = description
         self.views = views
-        self.created_at = created_at
+        # 기본값을 datetime.now() 로 두면 import 할 때 한 번만 계산돼서 모든 아이템의 등록 시간이 같아짐
+        self.created_at = created_at or datetime.now()
         self.purchase_type = purchase_type
+        self.saved_cnt = saved_cnt
        
     @staticmethod
     def get_item_by_item_seq(db_session: Session, seq: int) -> Optional[Item]:
@@ -97,7 +153,95 @@ class Item(Base):
             return None
         
     @staticmethod
-    def get_recommended_item(db_session: Session, start: int, count: int) -> Optional[List[Item]]:
+    async def get_item_by_item_seq_async(db_session: AsyncSession, seq: int) -> Optional[Item]:
+        """
+        Parameters:
+            db_session (AsyncSession): 데이터베이스 연동을 위한 sqlalchemy AsyncSession 객체. \n
+            seq (int | None): 아이템 고유 번호를 통해 정보를 불러옴 \n
+            
+        Returns:
+            Item: 아이템 정보를 담은 Item 객체 \n
+            None: 정보를 불러오는데 실패 \n
+        """
+        
+        try:
+            item = (await db_session.execute(select(Item).filter_by(seq = seq))).scalars().first()
+            if item is None:
+                return None
+            return Item(**{key: value for key, value in item.__dict__.items() if key != "_sa_instance_state"})
+        
+        except Exception as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+        
+    @staticmethod
+    def get_items_by_item_seqs(db_session: Session, seqs: List[int]) -> List[Item]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            seqs (List[int]): 불러올 아이템 고유 번호 목록 \n
+            
+        Returns:
+            List[Item]: seqs 순서대로 정렬된 Item 객체 목록, 존재하지 않는 아이템은 빠짐 \n
+        """
+        if len(seqs) == 0:
+            return []
+        
+        items = {item.seq: item for item in db_session.query(Item).filter(Item.seq.in_(seqs)).all()}
+        return [items[seq] for seq in seqs if seq in items]
+        
+    @staticmethod
+    def get_info_by_item_seqs(db_session: Session, seqs: List[int], fields: Optional[Set[str]] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            seqs (List[int]): 불러올 아이템 고유 번호 목록 (중복 가능) \n
+            fields (Set[str] | None): 만들 필드, None 이면 전부 \n
+            
+        Returns:
+            List[Dict[str, Any] | None]: seqs 순서대로 만든 info 목록, 존재하지 않는 아이템 자리는 None \n
+            아이템 개수와 상관없이 item 조회 1번 + info_many 쿼리로 처리 \n
+        """
+        items = Item.get_items_by_item_seqs(db_session, list(dict.fromkeys(seqs)))
+        infos = {info["seq"]: info for info in Item.info_many(db_session, items, fields)}
+        return [infos.get(seq) for seq in seqs]
+        
+    @staticmethod
+    def _unranked_query(db_session: Session, category_seq: Optional[int] = None):
+        """ 인기 순위 밖의 판매중인 아이템 (다른 프로세스에서 등록돼서 다음 rebuild 전까지 순위에 없는 아이템) 을 조회수 순으로 고르는 쿼리
+
+        Returns:
+            (int, Query): 순위 개수, 쿼리 (순위를 아직 한 번도 만들지 않았으면 판매중인 모든 아이템) \n
+        """
+        ranked, max_seq, added = trending_index.unranked(category_seq)
+        query = db_session.query(Item).filter(Item.purchase_type == False, Item.seq > max_seq) # type: ignore
+        if added:
+            query = query.filter(Item.seq.notin_(added))
+            
+        if category_seq is not None:
+            query = query.filter_by(category_seq = category_seq)
+            
+        return ranked, query.order_by(Item.views.desc(), Item.seq.asc()) # type: ignore
+    
+    @staticmethod
+    def _on_sale(db_session: Session, seqs: List[int]) -> List[Item]:
+        """ 순위에 남아 있지만 다른 프로세스에서 구매/삭제된 아이템을 뺀 seqs 순서의 Item 목록 """
+        return [item for item in Item.get_items_by_item_seqs(db_session, seqs) if not item.purchase_type]
+        
+    @staticmethod
+    def get_recommended_item(db_session: Session, start: int, count: int, category_seq: Optional[int] = None, fields: Optional[Set[str]] = None) -> Optional[List[Item]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            start (int): 건너뛸 아이템 개수 \n
+            count (int): 불러올 아이템 개수 \n
+            category_seq (int | None): 카테고리 고유 번호, None 이면 전체 \n
+            fields (Set[str] | None): 만들 필드, None 이면 전부 \n
+            
+        Returns:
+            List[Dict[str, Any]]: 인기 순위 (trending_index) 순서의 recommend 목록 (순위에 없는 새 아이템은 뒤에 조회수 순), 순위가 아직 없으면 조회수 순 \n
+            None: start 또는 count 가 잘못됨 \n
+        """
         try:
             if count > 50 or count < 0:
                 raise ValueError("count (max: 50, min: 0)")
@@ -105,12 +249,135 @@ class Item(Base):
             if start < 0:
                 raise ValueError("start (min: 0)")
             
-            items = db_session.query(Item).filter_by(purchase_type = False).order_by(Item.views.desc()).all()[start: start + count] #type: ignore
-            if items is None:
+            seqs = trending_index.slice(start, count, category_seq)
+            items = Item._on_sale(db_session, seqs)
+            ranked, query = Item._unranked_query(db_session, category_seq)
+            
+            # 구매/삭제돼서 빠진 자리는 순위의 다음 아이템으로 채움
+            position = start + len(seqs)
+            while len(items) < count and position < ranked:
+                seqs = trending_index.slice(position, count - len(items), category_seq)
+                if len(seqs) == 0:
+                    break
+                
+                position += len(seqs)
+                items += Item._on_sale(db_session, seqs)
+                
+            if len(items) < count:
+                items += query.offset(max(start - ranked, 0)).limit(count - len(items)).all()
+                
+            return Item.recommend_many(db_session, items, fields) # type: ignore
+        
+        except ValueError as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+        
+    @staticmethod
+    def get_recommended_item_by_cursor(db_session: Session, cursor: str, count: int, category_seq: Optional[int] = None, fields: Optional[Set[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            cursor (str): 이전 페이지의 next_cursor, 첫 페이지는 빈 문자열 \n
+            count (int): 한 페이지에 불러올 아이템 개수 \n
+            category_seq (int | None): 카테고리 고유 번호, None 이면 전체 \n
+            fields (Set[str] | None): 만들 필드, None 이면 전부 \n
+            
+        Returns:
+            Dict[str, Any]: {"items": recommend 목록, "next_cursor": 다음 페이지 커서 (마지막 페이지면 None)} \n
+            get_recommended_item 과 같은 순서 (인기 순위, 그 뒤에 순위 밖 아이템 조회수 순) \n
+            None: count 또는 cursor 가 잘못됨 \n
+        """
+        try:
+            if count > 50 or count < 1:
+                raise ValueError("count (max: 50, min: 1)")
+            
+            last = CursorUtility.decode(cursor)
+            if last is None:
+                raise ValueError("invalid cursor")
+            
+            # 다음 페이지가 있는지 알도록 count + 1 개를 모으고, 아이템마다 그 아이템 다음부터 이어갈 커서를 같이 둠
+            items: List[Item] = []
+            cursors: List[Dict[str, Any]] = []
+            if "views" not in last:
+                while len(items) <= count:
+                    page = trending_index.after(last, count + 1 - len(items), category_seq)
+                    if len(page) == 0:
+                        break
+                    
+                    last = page[-1][1]
+                    on_sale = {item.seq: item for item in Item._on_sale(db_session, [seq for seq, _ in page])}
+                    for seq, next_cursor in page:
+                        if seq in on_sale:
+                            items.append(on_sale[seq])
+                            cursors.append(next_cursor)
+                            
+                last = {}
+                
+            if len(items) <= count:
+                _, query = Item._unranked_query(db_session, category_seq)
+                if last:
+                    query = query.filter(or_(Item.views < last["views"], and_(Item.views == last["views"], Item.seq > last["seq"])))
+                    
+                for item in query.limit(count + 1 - len(items)).all():
+                    items.append(item)
+                    cursors.append({"views": item.views, "seq": item.seq})
+                    
+            next_cursor = CursorUtility.encode(cursors[count - 1]) if len(items) > count else None
+            return {"items": Item.recommend_many(db_session, items[:count], fields), "next_cursor": next_cursor} # type: ignore
+        
+        except (ValueError, KeyError, TypeError) as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+        
+    @staticmethod
+    def get_related_items(db_session: Session, item_seq: int, count: int, fields: Optional[Set[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            item_seq (int): 기준 아이템 고유 번호 \n
+            count (int): 불러올 아이템 개수 \n
+            fields (Set[str] | None): 만들 필드, None 이면 전부 \n
+            
+        Returns:
+            List[Dict[str, Any]]: 함께 저장/구매된 판매중인 아이템의 recommend 목록 (item_neighbors 순위 순) \n
+            None: count 가 잘못됨 \n
+        """
+        try:
+            if count > 50 or count < 1:
+                raise ValueError("count (max: 50, min: 1)")
+            
+            # 판매가 끝난 이웃은 빼야 하므로 넉넉히 읽어서 자름
+            seqs = ItemNeighbors.get_neighbor_seqs(db_session, item_seq, count * 2)
+            items = [item for item in Item.get_items_by_item_seqs(db_session, seqs) if not item.purchase_type][:count]
+            return Item.recommend_many(db_session, items, fields) # type: ignore
+        
+        except ValueError as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+        
+    @staticmethod
+    def get_similar_items(db_session: Session, item_seq: int, count: int, fields: Optional[Set[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            item_seq (int): 기준 아이템 고유 번호 \n
+            count (int): 불러올 아이템 개수 \n
+            fields (Set[str] | None): 만들 필드, None 이면 전부 \n
+            
+        Returns:
+            List[Dict[str, Any]]: 이름과 설명이 비슷한 판매중인 아이템의 recommend 목록 (유사도 순) \n
+            None: count 가 잘못됐거나 기준 아이템이 없음 \n
+        """
+        try:
+            if count > 50 or count < 1:
+                raise ValueError("count (max: 50, min: 1)")
+            
+            item = db_session.query(Item.name, Item.description).filter_by(seq = item_seq).first()
+            if item is None:
                 return None
             
-            else:
-                return list(map(lambda x: x.recommend(db_session), items)) # type: ignore
+            seqs = similar_index.search(item.name, item.description, count, exclude = item_seq)
+            return Item.recommend_many(db_session, Item.get_items_by_item_seqs(db_session, seqs), fields) # type: ignore
         
         except ValueError as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
@@ -125,8 +392,182 @@ class Item(Base):
             if start < 0:
                 raise ValueError("start (min: 0)")
             
-            items = db_session.query(Item.name).filter(Item.name.ilike(f"%{search_value}%"), Item.purchase_type == False).order_by(Item.seq.asc()).all() #type: ignore
-            return [dict(t) for t in {tuple(d.items()) for d in list(map(lambda x: {"name": x[0]}, items))}]
+            items = db_session.query(Item.name).filter(Item.name.ilike(f"%{search_value}%"), Item.purchase_type == False).group_by(Item.name).order_by(func.min(Item.seq).asc()).offset(start).limit(count).all() #type: ignore
+            return list(map(lambda x: {"name": x[0]}, items))
+            
+        except ValueError as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+    
+        except Exception as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+        
+    @staticmethod
+    def search_detail_items(db_session: Session, search_value: str, start: int, count: int, fields: Optional[Set[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        try:
+            if count > 50 or count < 1:
+                raise ValueError("count (max: 50, min: 1)")
+            
+            if start < 0:
+                raise ValueError("start (min: 0)")
+            
+            items = db_session.query(Item).filter(Item.name.ilike(f"%{search_value}%"), Item.purchase_type == False).order_by(Item.seq.asc()).offset(start).limit(count).all() #type: ignore
+            return Item.recommend_many(db_session, items, fields) # type: ignore
+        
+        except ValueError as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+    
+        except Exception as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+        
+    @staticmethod
+    def search_detail_items_by_cursor(db_session: Session, search_value: str, cursor: str, count: int, fields: Optional[Set[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            search_value (str): 검색어 \n
+            cursor (str): 이전 페이지의 next_cursor, 첫 페이지는 빈 문자열 \n
+            count (int): 한 페이지에 불러올 아이템 개수 \n
+            fields (Set[str] | None): 만들 필드, None 이면 전부 \n
+            
+        Returns:
+            Dict[str, Any]: {"items": recommend 목록, "next_cursor": 다음 페이지 커서 (마지막 페이지면 None)} \n
+            None: count 또는 cursor 가 잘못됨 \n
+        """
+        try:
+            if count > 50 or count < 1:
+                raise ValueError("count (max: 50, min: 1)")
+            
+            last = CursorUtility.decode(cursor)
+            if last is None:
+                raise ValueError("invalid cursor")
+            
+            query = db_session.query(Item).filter(Item.name.ilike(f"%{search_value}%"), Item.purchase_type == False) #type: ignore
+            if last:
+                query = query.filter(Item.seq > last["seq"])
+                
+            items = query.order_by(Item.seq.asc()).limit(count + 1).all() #type: ignore
+            next_cursor = CursorUtility.encode({"seq": items[count - 1].seq}) if len(items) > count else None
+            return {"items": Item.recommend_many(db_session, items[:count], fields), "next_cursor": next_cursor} # type: ignore
+        
+        except (ValueError, KeyError) as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+    
+        except Exception as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+        
+    @staticmethod
+    def suggest_items(db_session: Session, search_value: str, start: int, count: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            search_value (str): 검색창에 입력한 문자열 \n
+            start (int): 건너뛸 추천어 개수 \n
+            count (int): 불러올 추천어 개수 \n
+            
+        Returns:
+            List[Dict[str, Any]]: 메모리 접두사 인덱스에서 꺼낸 아이템 이름 목록 (조회수 높은 순) \n
+            None: 검색 실패 \n
+        """
+        try:
+            if count > 50 or count < 1:
+                raise ValueError("count (max: 50, min: 1)")
+            
+            if start < 0:
+                raise ValueError("start (min: 0)")
+            
+            if not autocomplete_index.loaded:
+                return Item.search_items(db_session, search_value, start, count)
+            
+            return list(map(lambda x: {"name": x}, autocomplete_index.suggest(search_value, start, count)))
+            
+        except ValueError as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+        
+    @staticmethod
+    def search_chosung_items(db_session: Session, search_value: str, start: int, count: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            search_value (str): 초성 또는 덜 완성된 한글이 섞인 검색어 (예시: "ㅇㅇㅍ", "아이ㅍ") \n
+            start (int): 건너뛸 결과 개수 \n
+            count (int): 불러올 결과 개수 \n
+            
+        Returns:
+            List[Dict[str, Any]]: 자모/초성 인덱스로 찾은 아이템 이름 목록 (조회수 높은 순, 중복 제거) \n
+            None: 검색 실패 \n
+        """
+        try:
+            if count > 50 or count < 1:
+                raise ValueError("count (max: 50, min: 1)")
+            
+            if start < 0:
+                raise ValueError("start (min: 0)")
+            
+            items = Item.get_items_by_item_seqs(db_session, hangul_index.search(search_value, start, count))
+            return list(map(lambda x: {"name": x}, dict.fromkeys(item.name for item in items)))
+            
+        except ValueError as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+        
+    @staticmethod
+    def search_detail_chosung_items(db_session: Session, search_value: str, start: int, count: int, fields: Optional[Set[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            search_value (str): 초성 또는 덜 완성된 한글이 섞인 검색어 (예시: "ㅇㅇㅍ", "아이ㅍ") \n
+            start (int): 건너뛸 결과 개수 \n
+            count (int): 불러올 결과 개수 \n
+            fields (Set[str] | None): 만들 필드, None 이면 전부 \n
+            
+        Returns:
+            List[Dict[str, Any]]: 자모/초성 인덱스로 찾은 아이템의 recommend 목록 (조회수 높은 순) \n
+            None: 검색 실패 \n
+        """
+        try:
+            if count > 50 or count < 1:
+                raise ValueError("count (max: 50, min: 1)")
+            
+            if start < 0:
+                raise ValueError("start (min: 0)")
+            
+            items = Item.get_items_by_item_seqs(db_session, hangul_index.search(search_value, start, count))
+            return Item.recommend_many(db_session, items, fields) # type: ignore
+            
+        except ValueError as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+       
+    @staticmethod
+    def search_fulltext_items(db_session: Session, search_value: str, start: int, count: int, with_description: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            search_value (str): 검색어 \n
+            start (int): 건너뛸 결과 개수 \n
+            count (int): 불러올 결과 개수 \n
+            with_description (bool): True 면 아이템 설명까지 검색 \n
+            
+        Returns:
+            List[Dict[str, Any]]: 전문 검색 인덱스로 찾은 아이템 이름 목록 (관련도 높은 순, 중복 제거) \n
+            None: 검색 실패 \n
+        """
+        try:
+            if count > 50 or count < 1:
+                raise ValueError("count (max: 50, min: 1)")
+            
+            if start < 0:
+                raise ValueError("start (min: 0)")
+            
+            items = Item.get_items_by_item_seqs(db_session, FullTextIndex.search(db_session, search_value, with_description, start, count))
+            return list(map(lambda x: {"name": x}, dict.fromkeys(item.name for item in items)))
             
         except ValueError as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
@@ -137,7 +578,20 @@ class Item(Base):
             return None
         
     @staticmethod
-    def search_detail_items(db_session: Session, search_value: str, start: int, count: int) -> Optional[List[Dict[str, Any]]]:
+    def search_detail_fulltext_items(db_session: Session, search_value: str, start: int, count: int, with_description: bool = False, fields: Optional[Set[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            search_value (str): 검색어 \n
+            start (int): 건너뛸 결과 개수 \n
+            count (int): 불러올 결과 개수 \n
+            with_description (bool): True 면 아이템 설명까지 검색 \n
+            fields (Set[str] | None): 만들 필드, None 이면 전부 \n
+            
+        Returns:
+            List[Dict[str, Any]]: 전문 검색 인덱스로 찾은 아이템의 recommend 목록 (관련도 높은 순) \n
+            None: 검색 실패 \n
+        """
         try:
             if count > 50 or count < 1:
                 raise ValueError("count (max: 50, min: 1)")
@@ -145,8 +599,8 @@ class Item(Base):
             if start < 0:
                 raise ValueError("start (min: 0)")
             
-            items = db_session.query(Item).filter(Item.name.ilike(f"%{search_value}%"), Item.purchase_type == False).order_by(Item.seq.asc()).all() #type: ignore
-            return list(map(lambda x: x.recommend(db_session), items))
+            items = Item.get_items_by_item_seqs(db_session, FullTextIndex.search(db_session, search_value, with_description, start, count))
+            return Item.recommend_many(db_session, items, fields) # type: ignore
         
         except ValueError as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
@@ -169,16 +623,21 @@ class Item(Base):
             else:
                 item = Item(name = name, user_seq = user_seq, category_seq = category_seq, cnt = cnt, price = price, description = description)
                 db_session.add(item)
-                db_session.commit()
+                db_session.flush()
+                on_commit(db_session, index_item, item.seq, item.name, item.views or 0, item.description or "")
+                on_commit(db_session, trending_index.add, item.seq, item.category_seq, item.views or 0, item.saved_cnt or 0, item.created_at)
+                # 새 아이템이 들어갈 수 있는 목록 (추천, 검색) 응답을 지움
+                response_cache.invalidate_on_commit(db_session, "items")
                 return MACResult.SUCCESS
         
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
                 
-    def update_item_info(self, db_session: Session, user_seq: int, name: Optional[str] = None, cnt: Optional[int] = None, price: Optional[int] = None, description: Optional[str] = None, views: Optional[int] = None) -> MACResult:
+    def update_item_info(self, db_session: Session, user_seq: int, name: Optional[str] = None, cnt: Optional[int] = None, price: Optional[int] = None, description: Optional[str] = None) -> MACResult:
         try:
-            if any(arg is not None for arg in [name, cnt, price, description, views]):
+            if any(arg is not None for arg in [name, cnt, price, description]):
                 item = db_session.query(Item).filter_by(seq = self.seq)
                 if item.first().user_seq != user_seq: # type: ignore
                     return MACResult.FORBIDDEN
@@ -195,10 +654,16 @@ class Item(Base):
                 if description:
                     item.update({"description": description})
                 
-                if views:
-                    item.update({"views": views})
+                db_session.flush()
+                updated = item.first()
+                if not updated.purchase_type: # type: ignore
+                    # 이름이나 설명이 바뀔 때만 비슷한 아이템 인덱스를 다시 계산
+                    on_commit(db_session, index_item, updated.seq, updated.name, updated.views or 0, (updated.description or "") if name or description else None) # type: ignore
+                response_cache.invalidate_on_commit(db_session, f"item:{self.seq}")
+                if name or description:
+                    # 바뀐 이름/설명으로 전에는 안 걸리던 검색 결과에 새로 들어갈 수 있음
+                    response_cache.invalidate_on_commit(db_session, "items")
                     
-                db_session.commit()
                 return MACResult.SUCCESS
             
             else:
@@ -206,6 +671,7 @@ class Item(Base):
             
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
 
     def delete_item(self, db_session: Session, user_seq: int) -> MACResult:
@@ -213,20 +679,98 @@ class Item(Base):
             if user_seq != self.user_seq:
                 return MACResult.FORBIDDEN
             
+            ItemImages.release_images(db_session, [self.seq]) # type: ignore
             result = db_session.query(Item).filter_by(seq = self.seq).delete()
-            db_session.commit()
+            db_session.flush()
+            on_commit(db_session, unindex_item, self.seq)
+            response_cache.invalidate_on_commit(db_session, f"item:{self.seq}")
             return MACResult.SUCCESS if result == 1 else MACResult.FAIL
         
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
     
     def purchase_request(self, db_session: Session) -> MACResult:
         try:
             db_session.query(Item).filter_by(seq = self.seq).update({"purchase_type": True})
-            db_session.commit()
+            db_session.flush()
+            on_commit(db_session, unindex_item, self.seq)
+            response_cache.invalidate_on_commit(db_session, f"item:{self.seq}")
             return MACResult.SUCCESS
         
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
-            return MACResult.INTERNAL_SERVER_ERROR
\ No newline at end of file
+            rollback_only(db_session)
+            return MACResult.INTERNAL_SERVER_ERROR
+        
+    @staticmethod
+    def reconcile_saved_cnt(db_session: Session) -> int:
+        """ saved_items 를 GROUP BY 로 다시 세서 item.saved_cnt 와 다른 값만 한 번에 고침
+        
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            
+        Returns:
+            int: 값이 틀려서 고친 아이템 개수 \n
+        """
+        counts = dict(db_session.query(SavedItems.item_seq, func.count()).group_by(SavedItems.item_seq).all()) #type: ignore
+        drifted = [
+            {"seq": seq, "saved_cnt": counts.get(seq, 0)}
+            for seq, saved_cnt in db_session.query(Item.seq, Item.saved_cnt).yield_per(10000) if saved_cnt != counts.get(seq, 0)
+        ]
+        if drifted:
+            db_session.execute(update(Item), drifted)
+            db_session.flush()
+            
+        return len(drifted)
+    
+    @staticmethod
+    def apply_view_counts(db_session: Session, counts: Dict[int, int]) -> None:
+        """ ViewCounter 에 모인 조회수 증가량을 CASE 문 UPDATE 한 번으로 반영
+        
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            counts (Dict[int, int]): 아이템 고유 번호별 조회수 증가량 \n
+        """
+        if len(counts) == 0:
+            return
+        
+        db_session.query(Item).filter(Item.seq.in_(counts.keys())).update(
+            {"views": func.coalesce(Item.views, 0) + case(counts, value = Item.seq, else_ = 0)}, synchronize_session = False
+        )
+        db_session.flush()
+        
+        # 검색어 추천 순위도 조회수 기준이라 바뀐 조회수로 다시 넣어줌
+        for seq, name, views in db_session.query(Item.seq, Item.name, Item.views).filter(Item.seq.in_(counts.keys()), Item.purchase_type == False).all(): # type: ignore
+            on_commit(db_session, index_item, seq, name, views or 0)
+            
+        # 조회수는 상세 응답에만 있으므로 목록 응답은 그대로 두고 상세 응답만 지움
+        response_cache.invalidate_on_commit(db_session, *[f"views:{seq}" for seq in counts])
+            
+    @staticmethod
+    def get_seller_stats(db_session: Session, user_seq: int) -> Dict[str, Any]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            user_seq (int): 판매자 고유 번호 \n
+            
+        Returns:
+            Dict[str, Any]: 판매자 상품별 조회수, 저장 횟수, 고유 조회자 추정치와 그 합계 \n
+        """
+        items = db_session.query(Item.seq, Item.name, Item.views, Item.saved_cnt).filter_by(user_seq = user_seq).order_by(Item.seq.asc()).all()
+        seqs = [item.seq for item in items]
+        unique_viewers = ItemViewers.get_unique_viewers_by_item_seqs(db_session, seqs)
+        
+        return {
+            "total_views": sum(item.views or 0 for item in items),
+            "total_saved_cnt": sum(item.saved_cnt or 0 for item in items),
+            "unique_viewers": ItemViewers.count_union(db_session, seqs) if seqs else 0,
+            "items": [{
+                "seq": item.seq,
+                "name": item.name,
+                "views": item.views or 0,
+                "saved_cnt": item.saved_cnt or 0,
+                "unique_viewers": unique_viewers.get(item.seq, 0)
+            } for item in items]
+        }
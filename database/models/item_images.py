@@ -1,17 +1,18 @@
 from sqlalchemy import Column, BIGINT, TEXT, ForeignKeyConstraint, PrimaryKeyConstraint
 from database.models.results import MACResult
+from database.storage import image_storage
+from database.utility.response_cache import response_cache
+from database.utility.commit_hooks import rollback_only
 from sqlalchemy.orm.session import Session
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from database.models.base import Base
 import traceback
 import logging
-import uuid
-import os
 
 class ItemImages(Base):
     __tablename__ = "item_images"
     
-    item_seq = Column(BIGINT, nullable = False, autoincrement = True, primary_key = False) # 물품 고유 번호
+    item_seq = Column(BIGINT, nullable = False, autoincrement = False, primary_key = False) # 물품 고유 번호
     index = Column(BIGINT, nullable = True, default = 0) # 물품 이미지 인덱스
     path = Column(TEXT, default = None, nullable = True) # 이미지 경로
     
@@ -53,32 +54,143 @@ class ItemImages(Base):
             return None
             
     @staticmethod
-    def insert_image(db_session: Session, item_seq: int, index: int, image: bytes) -> MACResult:
-        try:
-            file_name = f"{str(uuid.uuid4())}.jpg"
-            with open(os.path.join("images", file_name), "wb") as fp:
-                fp.write(image)
+    def get_all_image_path_by_item_seqs(db_session: Session, item_seqs: List[int]) -> Dict[int, List[Dict[str, str]]]:
+        if len(item_seqs) == 0:
+            return {}
+        
+        result = db_session.query(ItemImages.item_seq, ItemImages.path, ItemImages.index).filter(ItemImages.item_seq.in_(item_seqs)).order_by(ItemImages.index.asc()).all()
+        paths = {}
+        for item_seq, path, index in result:
+            paths.setdefault(item_seq, []).append({"path": path, "index": index})
             
-            item_images = ItemImages(item_seq, index, os.path.join("images", file_name))
+        return paths
+    
+    @staticmethod
+    def get_image_path_by_item_seqs(db_session: Session, item_seqs: List[int], index: int) -> Dict[int, str]:
+        if len(item_seqs) == 0:
+            return {}
+        
+        result = db_session.query(ItemImages.item_seq, ItemImages.path).filter(ItemImages.item_seq.in_(item_seqs), ItemImages.index == index).all()
+        return {item_seq: path for item_seq, path in result}
+            
+    @staticmethod
+    def insert_image(db_session: Session, item_seq: int, index: int, path: str) -> MACResult:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            item_seq (int): 물품 고유 번호 \n
+            index (int): 물품 이미지 인덱스 \n
+            path (str): routers.upload.save_image_upload 로 image_storage 에 저장한 이미지 경로 \n
+            
+        Returns:
+            MACResult.SUCCESS: 이미지 등록 성공 \n
+            MACResult.CONFLICT: 해당 인덱스에 이미지가 이미 있음 \n
+            MACResult.INTERNAL_SERVER_ERROR: 서버 내부 에러 \n
+        """
+        try:
+            item_images = ItemImages(item_seq, index, path)
             if db_session.query(ItemImages.index).filter_by(item_seq = item_seq, index = index).first() is not None:
                 return MACResult.CONFLICT
             db_session.add(item_images)
+            image_storage.acquire(db_session, path)
             
-            db_session.commit()
+            db_session.flush()
+            response_cache.invalidate_on_commit(db_session, f"item:{item_seq}")
             return MACResult.SUCCESS
         
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
         
     @staticmethod
-    def delete_image(db_session: Session, item_seq: int, file_path: str) -> MACResult:
+    def insert_images(db_session: Session, item_seq: int, images: List[Tuple[int, str]]) -> List[MACResult]:
+        """ 여러 이미지를 기존 인덱스 조회 1번, bulk INSERT 1번으로 등록 (image_blob 참조 수도 이미지 개수와 상관없이 acquire_many 로 한 번에 올림)
+        
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            item_seq (int): 물품 고유 번호 \n
+            images (List[Tuple[int, str]]): (물품 이미지 인덱스, routers.upload.save_image_upload 로 저장한 이미지 경로) 목록 \n
+            
+        Returns:
+            List[MACResult]: images 와 같은 순서의 결과 \n
+                MACResult.SUCCESS: 이미지 등록 성공 \n
+                MACResult.CONFLICT: 해당 인덱스에 이미지가 이미 있거나 요청 안에서 인덱스가 겹침 \n
+                MACResult.NOT_FOUND: 물품이 존재하지 않음 \n
+                MACResult.INTERNAL_SERVER_ERROR: 서버 내부 에러 \n
+        """
+        from database.models.item import Item
+        
         try:
-            obj = db_session.query(ItemImages).filter_by(item_seq = item_seq, file_path = file_path).first()
-            db_session.query(ItemImages).delete(obj)
-            db_session.commit()
+            if db_session.query(Item.seq).filter_by(seq = item_seq).first() is None:
+                return [MACResult.NOT_FOUND] * len(images)
+            
+            taken = {index for (index,) in db_session.query(ItemImages.index).filter_by(item_seq = item_seq).all()}
+            results: List[MACResult] = []
+            rows = []
+            for index, path in images:
+                if index in taken:
+                    results.append(MACResult.CONFLICT)
+                    continue
+                
+                taken.add(index)
+                rows.append({"item_seq": item_seq, "index": index, "path": path})
+                results.append(MACResult.SUCCESS)
+                
+            if rows:
+                db_session.bulk_insert_mappings(ItemImages, rows) # type: ignore
+                image_storage.acquire_many(db_session, [row["path"] for row in rows])
+                    
+                response_cache.invalidate_on_commit(db_session, f"item:{item_seq}")
+                    
+            db_session.flush()
+            return results
+        
+        except Exception as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
+            return [MACResult.INTERNAL_SERVER_ERROR] * len(images)
+        
+    @staticmethod
+    def delete_image(db_session: Session, item_seq: int, index: Optional[int] = None) -> MACResult:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            item_seq (int): 물품 고유 번호 \n
+            index (int | None): 지울 이미지 인덱스, None 이면 물품의 모든 이미지 \n
+            
+        Returns:
+            MACResult.SUCCESS: 이미지 제거 성공 \n
+            MACResult.NOT_FOUND: 지울 이미지가 없음 \n
+            MACResult.INTERNAL_SERVER_ERROR: 서버 내부 에러 \n
+        """
+        try:
+            query = db_session.query(ItemImages).filter_by(item_seq = item_seq)
+            if index is not None:
+                query = query.filter_by(index = index)
+                
+            paths = [path for (path,) in query.with_entities(ItemImages.path).all()]
+            if len(paths) == 0:
+                return MACResult.NOT_FOUND
+            
+            query.delete(synchronize_session = False)
+            for path in paths:
+                image_storage.release(db_session, path)
+                
+            db_session.flush()
+            response_cache.invalidate_on_commit(db_session, f"item:{item_seq}")
             return MACResult.SUCCESS
         
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
-            return MACResult.INTERNAL_SERVER_ERROR
\ No newline at end of file
+            rollback_only(db_session)
+            return MACResult.INTERNAL_SERVER_ERROR
+        
+    @staticmethod
+    def release_images(db_session: Session, item_seqs: List[int]) -> None:
+        """ 물품이 삭제되어 item_images 행이 CASCADE 로 지워지기 전에 이미지 참조를 놓음 (파일은 가비지 컬렉터가 지움) """
+        if len(item_seqs) == 0:
+            return
+        
+        for (path,) in db_session.query(ItemImages.path).filter(ItemImages.item_seq.in_(item_seqs)).all():
+            image_storage.release(db_session, path)
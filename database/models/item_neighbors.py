@@ -0,0 +1,72 @@
+from sqlalchemy import Column, BIGINT, INT, FLOAT, ForeignKeyConstraint, PrimaryKeyConstraint
+from sqlalchemy.orm.session import Session
+from database.models.base import Base
+from typing import Dict, List, Tuple
+
+class ItemNeighbors(Base):
+    """ItemNeighbors Class
+
+    "이 상품을 저장/구매한 사람들이 함께 저장/구매한 상품" 을 미리 계산해 둔 테이블
+    database/jobs/item_neighbors.py 가 아이템마다 상위 N 개를 rank 순서로 채움
+    """
+    __tablename__ = "item_neighbors"
+
+    item_seq = Column(BIGINT, nullable = False, autoincrement = False) # 기준 아이템 고유 번호
+    rank = Column(INT, nullable = False, autoincrement = False) # 0 부터 시작하는 순위
+    neighbor_seq = Column(BIGINT, nullable = False) # 함께 저장/구매된 아이템 고유 번호
+    score = Column(FLOAT, nullable = False) # 코사인 유사도
+
+    __table_args__ = (ForeignKeyConstraint(
+        ["item_seq"], ["item.seq"], ondelete="CASCADE", onupdate="CASCADE"
+    ), ForeignKeyConstraint(
+        ["neighbor_seq"], ["item.seq"], ondelete="CASCADE", onupdate="CASCADE"
+    ), PrimaryKeyConstraint("item_seq", "rank"),)
+
+    def __init__(self, item_seq: int, rank: int, neighbor_seq: int, score: float):
+        self.item_seq = item_seq
+        self.rank = rank
+        self.neighbor_seq = neighbor_seq
+        self.score = score
+
+    @staticmethod
+    def replace_all(db_session: Session, rows: List[Tuple[int, int, int, float]]) -> None:
+        """ 배치 작업 결과로 테이블 전체를 교체, 커밋 전까지는 이전 결과가 보임
+
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            rows (List[Tuple[int, int, int, float]]): (item_seq, rank, neighbor_seq, score) 목록 \n
+        """
+        db_session.query(ItemNeighbors).delete()
+        if rows:
+            db_session.bulk_insert_mappings(ItemNeighbors, [ # type: ignore
+                {"item_seq": item_seq, "rank": rank, "neighbor_seq": neighbor_seq, "score": score}
+                for item_seq, rank, neighbor_seq, score in rows
+            ])
+
+        db_session.flush()
+
+    @staticmethod
+    def get_neighbor_seqs(db_session: Session, item_seq: int, count: int) -> List[int]:
+        result = db_session.query(ItemNeighbors.neighbor_seq).filter_by(item_seq = item_seq).order_by(ItemNeighbors.rank.asc()).limit(count).all()
+        return [neighbor_seq for (neighbor_seq,) in result]
+
+    @staticmethod
+    def get_neighbor_scores_by_item_seqs(db_session: Session, item_seqs: List[int]) -> Dict[int, float]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            item_seqs (List[int]): 유저가 저장/구매한 아이템 고유 번호 목록 \n
+
+        Returns:
+            Dict[int, float]: 이웃 아이템 고유 번호별 유사도 합, item_seqs 에 있는 아이템은 빠짐 \n
+        """
+        if len(item_seqs) == 0:
+            return {}
+
+        seqs = set(item_seqs)
+        scores: Dict[int, float] = {}
+        for neighbor_seq, score in db_session.query(ItemNeighbors.neighbor_seq, ItemNeighbors.score).filter(ItemNeighbors.item_seq.in_(seqs)).all():
+            if neighbor_seq not in seqs:
+                scores[neighbor_seq] = scores.get(neighbor_seq, 0.0) + score
+
+        return scores
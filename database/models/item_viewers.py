@@ -0,0 +1,77 @@
+from sqlalchemy import Column, BIGINT, INT, LargeBinary, ForeignKeyConstraint
+from database.utility.hyperloglog import HyperLogLog
+from sqlalchemy.orm.session import Session
+from database.models.base import Base
+from typing import Dict, List
+
+class ItemViewers(Base):
+    """ItemViewers Class
+
+    아이템별 고유 조회자 HyperLogLog 스케치, (유저, 아이템) 행을 쌓는 대신 아이템당 4KB 만 저장
+    """
+    __tablename__ = "item_viewers"
+
+    item_seq = Column(BIGINT, nullable = False, primary_key = True, autoincrement = False)
+    sketch = Column(LargeBinary, nullable = False) # HyperLogLog 레지스터
+    unique_viewers = Column(INT, nullable = False, default = 0) # sketch 로 계산한 추정치, 조회할 때마다 다시 계산하지 않도록 저장
+
+    __table_args__ = (ForeignKeyConstraint(
+        ["item_seq"], ["item.seq"], ondelete="CASCADE", onupdate="CASCADE"
+    ),)
+
+    def __init__(self, item_seq: int, sketch: bytes, unique_viewers: int = 0):
+        self.item_seq = item_seq
+        self.sketch = sketch
+        self.unique_viewers = unique_viewers
+
+    @staticmethod
+    def merge_sketches(db_session: Session, sketches: Dict[int, HyperLogLog]) -> None:
+        """ 워커에서 모은 스케치를 저장된 스케치와 합쳐서 저장
+
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            sketches (Dict[int, HyperLogLog]): 아이템 고유 번호별로 이번에 모은 스케치, 없는 아이템은 건너뜀 \n
+        """
+        from database.models.item import Item
+
+        if len(sketches) == 0:
+            return
+
+        # 버퍼에 있는 동안 지워진 아이템은 item_seq 외래 키에 걸리므로 버림
+        # (Item.apply_view_counts 가 같은 트랜잭션에서 먼저 UPDATE 해서 남은 아이템 행은 commit 까지 잠겨 있음)
+        existing = {seq for (seq,) in db_session.query(Item.seq).filter(Item.seq.in_(sketches.keys())).all()}
+        sketches = {item_seq: sketch for item_seq, sketch in sketches.items() if item_seq in existing}
+        if len(sketches) == 0:
+            return
+
+        # 다른 워커가 동시에 합치면서 레지스터를 덮어쓰지 않도록 행을 잠그고 합침
+        rows = db_session.query(ItemViewers).filter(ItemViewers.item_seq.in_(sketches.keys())).with_for_update().all()
+        stored = {row.item_seq: row for row in rows}
+        for item_seq, sketch in sketches.items():
+            row = stored.get(item_seq)
+            if row is None:
+                db_session.add(ItemViewers(item_seq, sketch.to_bytes(), sketch.count()))
+
+            else:
+                merged = HyperLogLog.from_bytes(row.sketch).merge(sketch) # type: ignore
+                row.sketch = merged.to_bytes()
+                row.unique_viewers = merged.count()
+
+        db_session.flush()
+
+    @staticmethod
+    def get_unique_viewers_by_item_seqs(db_session: Session, item_seqs: List[int]) -> Dict[int, int]:
+        if len(item_seqs) == 0:
+            return {}
+
+        result = db_session.query(ItemViewers.item_seq, ItemViewers.unique_viewers).filter(ItemViewers.item_seq.in_(set(item_seqs))).all()
+        return {item_seq: unique_viewers for item_seq, unique_viewers in result}
+
+    @staticmethod
+    def count_union(db_session: Session, item_seqs: List[int]) -> int:
+        """ 여러 아이템의 스케치를 합쳐서 아이템 중 하나라도 본 고유 조회자 수를 추정 """
+        union = HyperLogLog()
+        for (sketch,) in db_session.query(ItemViewers.sketch).filter(ItemViewers.item_seq.in_(set(item_seqs))).yield_per(1000):
+            union.merge(HyperLogLog.from_bytes(sketch))
+
+        return union.count()
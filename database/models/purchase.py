@@ -46,7 +46,7 @@ class Purchase(Base):
     def get_purchase_item_list(db_session: Session, user_seq: int) -> List[Item]:
         try:
             results = db_session.query(Purchase).filter_by(user_seq = user_seq, complete = False).all()
-            return list(map(lambda x: Item.get_item_by_item_seq(db_session, x.item_seq).recommend(db_session), results)) #type: ignore
+            return Item.recommend_many(db_session, Item.get_items_by_item_seqs(db_session, [x.item_seq for x in results])) #type: ignore
             
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
@@ -7,6 +7,7 @@ class MACResult(Enum):
     NOT_FOUND = 404
     TIME_OUT = 408
     CONFLICT = 409
+    PAYLOAD_TOO_LARGE = 413
     ENTITY_ERROR = 422
     INTERNAL_SERVER_ERROR = 500
     
\ No newline at end of file
@@ -2,14 +2,22 @@ from sqlalchemy import Column, TEXT, BIGINT, String, DateTime, BOOLEAN
 from typing import List, Optional, TypeVar, Dict, Any
 from database.models.saved_items import SavedItems
 from email.mime.multipart import MIMEMultipart
+from database.models.item_neighbors import ItemNeighbors
 from database.models.purchase import Purchase
+from sqlalchemy.ext.asyncio import AsyncSession
 from database.models.results import MACResult
+from database.storage import image_storage
 from sqlalchemy.orm.session import Session
 from database.models.item import Item
-from database.models.base import Base
+from database.models.base import Base, BIGINT_PK
+from database.utility.ttl_cache import TTLCache
+from database.utility.response_cache import response_cache
+from database.utility.commit_hooks import on_commit, rollback_only
+from database.conn import user_info
 from email.mime.text import MIMEText
 from auth.env import APP_PASSWORD
 from sqlalchemy.sql import func
+from sqlalchemy import select
 from pydantic import BaseModel
 from datetime import datetime
 from auth.env import SENDER
@@ -18,11 +26,12 @@ import traceback
 import logging
 import smtplib
 import bcrypt
-import uuid
-import os
 
 
 User = TypeVar("User", bound="User")
+
+# 사용자 정보 캐시, user_info.txt 에 user_cache_size = 4096 처럼 적어서 덮어쓸 수 있음
+user_cache = TTLCache(maxsize = int(user_info.get("user_cache_size", 1024)), ttl = float(user_info.get("user_cache_ttl", 60)))
     
     
 class IDPWDModel(BaseModel):
@@ -67,7 +76,7 @@ class User(Base):
     
     __tablename__ = "user"
     
-    seq = Column(BIGINT, nullable = False, autoincrement = True, primary_key = True) # 유저 일련번호
+    seq = Column(BIGINT_PK, nullable = False, autoincrement = True, primary_key = True) # 유저 일련번호
     user_id = Column(String(15), nullable = False, unique = True) # 유저 아이디
     password = Column(String(60), nullable = False) # 유저 비밀번호
     name = Column(String(10), nullable = False) # 유저 이름
@@ -116,13 +125,21 @@ class User(Base):
     @staticmethod
     def convert_seq_to_name(db_session: Session, seq: int) -> Optional[str]:
         try:
-            result = db_session.query(User.name).filter_by(user_seq = seq).first()
-            return result
+            result = db_session.query(User.name).filter_by(seq = seq).first()
+            return None if result is None else result[0]
             
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
             return None
         
+    @staticmethod
+    def convert_seqs_to_names(db_session: Session, seqs: List[int]) -> Dict[int, str]:
+        if len(seqs) == 0:
+            return {}
+        
+        result = db_session.query(User.seq, User.name).filter(User.seq.in_(set(seqs))).all()
+        return {seq: name for seq, name in result}
+        
     @staticmethod
     def _load_user_info(db_session: Session, seq: Optional[int] = None, user_id: Optional[str] = None, email: Optional[str] = None) -> Optional[User]:
         """
@@ -137,6 +154,10 @@ class User(Base):
             None: 정보를 불러오는데 실패 \n
         """
         try:
+            cached = User._get_cached_user(seq = seq, user_id = user_id, email = email)
+            if cached:
+                return cached
+            
             result = None
             query = db_session.query(User)
             if seq:
@@ -151,13 +172,110 @@ class User(Base):
             if result is None or len(result) == 0:
                 return None
             
-            user = result[0]
-            del user.__dict__["_sa_instance_state"]
-            return User(**user.__dict__)
+            return User._cache_user(result[0])
             
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
             return None
+        
+    @staticmethod
+    async def _load_user_info_async(db_session: AsyncSession, seq: Optional[int] = None, user_id: Optional[str] = None, email: Optional[str] = None) -> Optional[User]:
+        """
+        Parameters:
+            db_session (AsyncSession): 데이터베이스 연동을 위한 sqlalchemy AsyncSession 객체. \n
+            seq (int | None): 사용자 고유 번호를 통해 정보를 불러옴 \n
+            user_id (str | None): 사용자 아이디를 통해 정보를 불러옴 \n
+            email (str | None): 사용자 이메일을 통해 정보를 불러옴 \n
+            
+        Returns:
+            User: 사용자 정보를 담은 User 객체 \n
+            None: 정보를 불러오는데 실패 \n
+        """
+        try:
+            cached = User._get_cached_user(seq = seq, user_id = user_id, email = email)
+            if cached:
+                return cached
+            
+            statement = None
+            if seq:
+                statement = select(User).filter_by(seq = seq)
+                
+            if user_id:
+                statement = select(User).filter_by(user_id = user_id)
+                
+            if email:
+                statement = select(User).filter_by(email = email)
+                
+            if statement is None:
+                return None
+            
+            user = (await db_session.execute(statement)).scalars().first()
+            if user is None:
+                return None
+            
+            return User._cache_user(user)
+            
+        except Exception as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+
+        
+    @staticmethod
+    def _get_cached_user(seq: Optional[int] = None, user_id: Optional[str] = None, email: Optional[str] = None) -> Optional[User]:
+        # _load_user_info 와 같은 우선순위 (email > user_id > seq)
+        if email:
+            values = user_cache.get(("email", email))
+            
+        elif user_id:
+            values = user_cache.get(("user_id", user_id))
+            
+        elif seq:
+            values = user_cache.get(("seq", seq))
+            
+        else:
+            return None
+        
+        return None if values is None else User(**values)
+    
+    @staticmethod
+    def _cache_user(user: User) -> User:
+        """
+        Parameters:
+            user (User): 데이터베이스에서 읽어온 User 객체 
+
+            
+        Returns:
+            User: 세션과 분리된 새 User 객체 (캐시 값을 건드리지 않도록 매번 새로 만듦) 
+
+        """
+        values = {key: value for key, value in user.__dict__.items() if key != "_sa_instance_state"}
+        for key in User._cache_keys(values["seq"], values["user_id"], values["email"]):
+            user_cache.set(key, values)
+            
+        return User(**values)
+    
+    @staticmethod
+    def _cache_keys(seq: int, user_id: str, email: str) -> List[tuple]:
+        return [("seq", seq), ("user_id", user_id), ("email", email)]
+    
+    def invalidate_cache(self, db_session: Optional[Session] = None) -> None:
+        """ 사용자 정보가 바뀌었을 때 캐시에서 지움 (바뀌기 전의 아이디, 이메일 키도 함께 지움)
+        
+        db_session 이 있으면 commit 뒤에 한 번 더 지움 (flush 와 commit 사이에 다른 요청이 바뀌기 전 행을 다시 캐시했을 수 있음),
+        GET /user/{user_id} 응답 캐시 (user:아이디 태그) 는 db_session 이 있으면 commit 뒤에만, 없으면 바로 지움
+        """
+        keys = User._cache_keys(self.seq, self.user_id, self.email) # type: ignore
+        user_cache.delete(*keys)
+        if db_session is None:
+            response_cache.invalidate(f"user:{self.user_id}")
+            
+        else:
+            on_commit(db_session, user_cache.delete, *keys)
+            response_cache.invalidate_on_commit(db_session, f"user:{self.user_id}")
+        
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        return user_cache.stats()
 
 
     def _check_exsit_session(self, session: Dict[str, Any]) -> bool:
@@ -208,6 +326,7 @@ class User(Base):
 
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
     
     @staticmethod
@@ -235,11 +354,12 @@ class User(Base):
             hashed_password = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
             user = User(user_id = user_id, password = hashed_password, name = name, email = email, phone = phone, idnum = idnum)
             db_session.add(user)
-            db_session.commit()
+            db_session.flush()
             return MACResult.SUCCESS
             
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
     
     def signout(self, db_session: Session, session: Dict[str, Any]) -> MACResult:
@@ -261,12 +381,15 @@ class User(Base):
             return MACResult.TIME_OUT
         
         try:
+            image_storage.release(db_session, self.profile) # type: ignore
             db_session.query(User).filter_by(seq = self.seq).delete()
-            db_session.commit()
+            db_session.flush()
+            self.invalidate_cache(db_session)
             return MACResult.SUCCESS
             
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
         
         
@@ -289,18 +412,20 @@ class User(Base):
             user = User._load_user_info(db_session, user_id = user_id)
             if user:
                 if bcrypt.checkpw(password.encode("utf-8"), user.password.encode("utf-8")):
-                    db_session.query(User).update({"login_at": datetime.now()})
+                    db_session.query(User).filter_by(seq = user.seq).update({"login_at": datetime.now()})
+                    user.invalidate_cache(db_session)
                     
                     if user_id not in session.keys():
                         session[user_id] = f"check-id-{user_id}"
                     
-                    db_session.commit()
+                    db_session.flush()
                     return MACResult.SUCCESS
                 
             return MACResult.FAIL
             
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
 
 
@@ -319,8 +444,9 @@ class User(Base):
         try:
             if self.user_id in session.keys():
                 del session[self.user_id.__str__()]
-                db_session.query(User).update({"logout_at": datetime.now()})
-                db_session.commit()
+                db_session.query(User).filter_by(seq = self.seq).update({"logout_at": datetime.now()})
+                db_session.flush()
+                self.invalidate_cache(db_session)
                 return MACResult.SUCCESS
             
             else:
@@ -328,6 +454,7 @@ class User(Base):
         
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR    
     
     @staticmethod
@@ -351,12 +478,14 @@ class User(Base):
             
             hashed_password = bcrypt.hashpw(new_password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
             db_session.query(User).filter_by(seq = user.seq).update({"password": hashed_password, "password_update_at": datetime.now()})
-            db_session.commit()
+            db_session.flush()
+            user.invalidate_cache(db_session)
             del session[user_id]
             return MACResult.SUCCESS
             
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
         
     def update_info(self, db_session: Session, user_id: str, name: Optional[str] = None, email: Optional[str] = None, phone: Optional[str] = None) -> MACResult:
@@ -366,6 +495,7 @@ class User(Base):
                 if user:
                     return MACResult.CONFLICT
             
+            renamed = bool(name) and name != self.name
             user = db_session.query(User).filter_by(user_id = user_id)
             if user:
                 env_list = "name email phone".split(" ")
@@ -375,22 +505,28 @@ class User(Base):
             else:
                 return MACResult.FAIL
                 
+            db_session.flush()
+            self.invalidate_cache(db_session)
+            if renamed:
+                # 물품 상세 응답의 middleman_name 이 바뀌므로 이 유저가 등록한 물품의 캐시도 지움
+                item_seqs = [seq for (seq,) in db_session.query(Item.seq).filter_by(user_seq = self.seq).all()]
+                if item_seqs:
+                    response_cache.invalidate_on_commit(db_session, *[f"item:{seq}" for seq in item_seqs])
+                    
             return MACResult.SUCCESS
         
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
-        
-        finally:
-            db_session.commit()
     
-    def update_profile_image(self, db_session: Session, session: Dict[str, Any], profile: Optional[bytes]) -> MACResult:
+    def update_profile_image(self, db_session: Session, session: Dict[str, Any], profile: Optional[str]) -> MACResult:
         """
         Parameters:
             self: 클래스 객체 본인. \n
             db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
             session (Dict[str, Any]): 세션이 존재하는지 확인하기 위한 Session. \n
-            profile (Optional[bytes]): 프로필 이미지 파일. None은 기본 이미지로 변경. \n
+            profile (Optional[str]): routers.upload.save_image_upload 로 image_storage 에 저장한 프로필 이미지 경로. None은 기본 이미지로 변경. \n
         
         Returns:
             MACResult.SUCCESS: 프로필 이미지 변경 성공 \n
@@ -402,22 +538,18 @@ class User(Base):
             return MACResult.TIME_OUT
         
         try:
-            if profile:
-                file_name = f"{str(uuid.uuid4())}.jpg"
-                with open(os.path.join("images", file_name), "wb") as fp:
-                    fp.write(profile)
-                    
-                self.profile = os.path.join("images", file_name)
-                
-            else:
-                self.profile = None
-
-            db_session.query(User).update({"profile": self.profile})
-            db_session.commit()
+            # 같은 이미지를 다시 올린 경우에도 참조 수가 맞도록 새 이미지를 먼저 참조하고 이전 이미지를 놓음
+            image_storage.acquire(db_session, profile)
+            image_storage.release(db_session, self.profile) # type: ignore
+            self.profile = profile
+            db_session.query(User).filter_by(seq = self.seq).update({"profile": self.profile})
+            db_session.flush()
+            self.invalidate_cache(db_session)
             return MACResult.SUCCESS
         
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
             
     def load_saved_items(self, db_session: Session) -> List[Item]:
@@ -432,15 +564,41 @@ class User(Base):
         """
         try:
             saved_items = SavedItems.get_saved_items_by_user_seq(db_session, self.seq) # type: ignore
-            results = []
-            for item in saved_items:
-                results.append(Item.get_item_by_item_seq(db_session, item.item_seq)) #type: ignore
-            return results
+            return Item.get_items_by_item_seqs(db_session, [item.item_seq for item in saved_items]) #type: ignore
             
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
             return []
     
+    def get_recommended_items(self, db_session: Session, count: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Parameters:
+            self: 클랙스 객체 본인. \n
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            count (int): 불러올 아이템 개수 \n
+            
+        Returns:
+            List[Dict[str, Any]]: 저장/구매한 아이템들의 이웃 유사도 합 순서의 recommend 목록, 저장/구매한 아이템이 없으면 인기 순위 \n
+            None: count 가 잘못됨 \n
+        """
+        try:
+            if count > 50 or count < 1:
+                raise ValueError("count (max: 50, min: 1)")
+            
+            saved_seqs = [item.item_seq for item in SavedItems.get_saved_items_by_user_seq(db_session, self.seq)] # type: ignore
+            purchased_seqs = [item_seq for (item_seq,) in db_session.query(Purchase.item_seq).filter_by(user_seq = self.seq).all()]
+            scores = ItemNeighbors.get_neighbor_scores_by_item_seqs(db_session, saved_seqs + purchased_seqs) # type: ignore
+            if len(scores) == 0:
+                return Item.get_recommended_item(db_session, 0, count)
+            
+            seqs = sorted(scores, key = lambda seq: (-scores[seq], seq))[:count * 2]
+            items = [item for item in Item.get_items_by_item_seqs(db_session, seqs) if not item.purchase_type][:count]
+            return Item.recommend_many(db_session, items) # type: ignore
+        
+        except ValueError as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return None
+    
     def update_saved_items(self, db_session: Session, item_seq: int) -> MACResult:
         """
         Parameters:
@@ -454,19 +612,24 @@ class User(Base):
             MACResult.INTERNAL_SERVER_ERROR: 서버 내부 에러. \n
         """
         try:
-            items = self.load_saved_items(db_session)
-            if item_seq not in list(map(lambda x: x.seq, items)):
+            if db_session.query(SavedItems).filter_by(user_seq = self.seq, item_seq = item_seq).first() is None:
                 saved_item = SavedItems(self.seq, item_seq, datetime.now()) #type: ignore
                 db_session.add(saved_item)
+                delta = 1
                 
             else:
                 db_session.query(SavedItems).filter_by(user_seq = self.seq, item_seq = item_seq).delete()
-                
-            db_session.commit()
+                delta = -1
+            
+            # 읽고 쓰는 대신 UPDATE 안에서 더해서 동시에 저장해도 값이 틀어지지 않게 함
+            db_session.query(Item).filter_by(seq = item_seq).update({"saved_cnt": Item.saved_cnt + delta}, synchronize_session = False)
+            db_session.flush()
+            response_cache.invalidate_on_commit(db_session, f"item:{item_seq}")
             return MACResult.SUCCESS
 
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
         
     @staticmethod
@@ -547,7 +710,7 @@ class User(Base):
                     item.purchase_request(db_session)
                     purchase = Purchase(self.seq, item_seq) #type: ignore
                     db_session.add(purchase)
-                    db_session.commit()
+                    db_session.flush()
                     
                 else:
                     return MACResult.CONFLICT
@@ -559,8 +722,9 @@ class User(Base):
         
         except Exception as e:
             logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            rollback_only(db_session)
             return MACResult.INTERNAL_SERVER_ERROR
         
     def get_registerd_item(self, db_session: Session):
         items = db_session.query(Item).filter_by(user_seq = self.seq).all()
-        return list(map(lambda x: x.recommend(db_session), items)) # type: ignore
\ No newline at end of file
+        return Item.recommend_many(db_session, items) # type: ignore
\ No newline at end of file
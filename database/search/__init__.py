@@ -0,0 +1,20 @@
+from .hangul import HangulUtility, HangulSearchIndex, hangul_index
+from .autocomplete import AutocompleteIndex, autocomplete_index
+from .similar import SimilarItemIndex, similar_index
+from .trending import TrendingIndex, trending_index
+from .fulltext import FullTextIndex
+from typing import Optional
+
+def index_item(seq: int, name: str, views: int, description: Optional[str] = None) -> None:
+    """ 판매중인 아이템이 등록되거나 수정됐을 때 메모리 검색 인덱스에 반영, 비슷한 아이템 인덱스는 description 을 넘길 때만 갱신 """
+    autocomplete_index.upsert(seq, name, views)
+    hangul_index.upsert(seq, name, views)
+    if description is not None:
+        similar_index.upsert(seq, name, description)
+
+def unindex_item(seq: int) -> None:
+    """ 아이템이 삭제되거나 구매돼서 더 이상 검색되면 안 될 때 메모리 검색 인덱스와 인기 순위에서 제거 """
+    autocomplete_index.remove(seq)
+    hangul_index.remove(seq)
+    trending_index.remove(seq)
+    similar_index.remove(seq)
\ No newline at end of file
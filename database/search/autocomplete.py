@@ -0,0 +1,172 @@
+from sqlalchemy.orm.session import Session
+from typing import Dict, List, Tuple
+import threading
+
+class _Node:
+    __slots__ = ("children", "names", "top")
+    
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.names: set = set() # 이 노드에서 끝나는 키를 가진 아이템 이름
+        self.top: List[Tuple[int, str]] = [] # 서브트리 안에서 (조회수, 이름) 상위 top_k 개, 내림차순
+
+
+class AutocompleteIndex:
+    """ 판매중인 아이템 이름으로 만든 접두사 트라이 (검색창 자동완성용)
+    
+    노드마다 서브트리의 상위 top_k 개 이름을 조회수 순으로 미리 계산해 두어서,
+    검색어 길이만큼 노드를 따라 내려가면 DB 조회 없이 바로 추천어를 돌려줌. \n
+    이름 전체와 공백 뒤의 각 단어 시작 위치를 키로 넣기 때문에 "아이폰 15" 는 "아이", "15" 로 모두 찾을 수 있음. \n
+    같은 이름의 아이템이 여러 개면 하나로 합치고, 그중 가장 높은 조회수로 순위를 매김. \n
+    프로세스마다 메모리에 따로 가지고 있으며, 서버 시작 시 load 로 채우고 아이템 등록/수정/삭제/구매 때 갱신함.
+    """
+    
+    def __init__(self, top_k: int = 50):
+        self.top_k = top_k
+        self.root = _Node()
+        self.items: Dict[int, Tuple[str, int]] = {} # 아이템 고유 번호 -> (이름, 조회수)
+        self.names: Dict[str, Dict[int, int]] = {} # 이름 -> {아이템 고유 번호: 조회수}
+        self.loaded = False
+        self.lock = threading.RLock()
+    
+    @staticmethod
+    def _keys(name: str) -> List[str]:
+        key = name.lower()
+        keys = [key]
+        for i in range(1, len(key)):
+            if key[i - 1].isspace() and not key[i].isspace():
+                keys.append(key[i:])
+                
+        return keys
+    
+    def _score(self, name: str) -> int:
+        seqs = self.names.get(name)
+        return max(seqs.values()) if seqs else -1
+    
+    def _path(self, key: str, create: bool = False) -> List[_Node]:
+        node, path = self.root, [self.root]
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return []
+                
+                child = node.children[char] = _Node()
+                
+            node = child
+            path.append(node)
+            
+        return path
+    
+    def _recompute(self, node: _Node) -> None:
+        candidates = {name: self._score(name) for name in node.names}
+        for child in node.children.values():
+            for score, name in child.top:
+                candidates[name] = score
+                
+        node.top = sorted(((score, name) for name, score in candidates.items()), key = lambda x: (-x[0], x[1]))[:self.top_k]
+    
+    def _refresh(self, name: str, old_score: int) -> None:
+        """ name 의 점수가 old_score 에서 바뀐 뒤 키 경로의 top 목록을 고쳐줌 """
+        new_score = self._score(name)
+        for key in self._keys(name):
+            path = self._path(key, create = new_score >= 0)
+            if not path:
+                continue
+            
+            if new_score >= 0:
+                path[-1].names.add(name)
+                
+            else:
+                path[-1].names.discard(name)
+            
+            for node in reversed(path):
+                ranked = [entry for entry in node.top if entry[1] != name]
+                if new_score < old_score and len(ranked) < len(node.top) and len(node.top) == self.top_k:
+                    # 순위가 내려간 이름의 빈자리는 자식들의 목록에서 다시 채워야 함
+                    self._recompute(node)
+                    continue
+                
+                if new_score >= 0:
+                    ranked.append((new_score, name))
+                    
+                node.top = sorted(ranked, key = lambda x: (-x[0], x[1]))[:self.top_k]
+                
+            # 빈 노드는 잘라내서 트라이가 계속 커지지 않게 함
+            for i in range(len(path) - 1, 0, -1):
+                if path[i].children or path[i].names:
+                    break
+                
+                del path[i - 1].children[key[i - 1]]
+    
+    def upsert(self, seq: int, name: str, views: int) -> None:
+        with self.lock:
+            if seq in self.items:
+                self.remove(seq)
+                
+            views = views or 0
+            old_score = self._score(name)
+            self.items[seq] = (name, views)
+            self.names.setdefault(name, {})[seq] = views
+            self._refresh(name, old_score)
+    
+    def remove(self, seq: int) -> None:
+        with self.lock:
+            if seq not in self.items:
+                return
+            
+            name, _ = self.items.pop(seq)
+            old_score = self._score(name)
+            del self.names[name][seq]
+            if not self.names[name]:
+                del self.names[name]
+                
+            self._refresh(name, old_score)
+    
+    def suggest(self, prefix: str, start: int, count: int) -> List[str]:
+        """
+        Parameters:
+            prefix (str): 검색창에 입력한 문자열 \n
+            start (int): 건너뛸 추천어 개수 \n
+            count (int): 불러올 추천어 개수 (start + count 는 top_k 이하) \n
+            
+        Returns:
+            List[str]: 조회수 높은 순 아이템 이름 목록 \n
+        """
+        with self.lock:
+            path = self._path(prefix.lower().strip())
+            if not path:
+                return []
+            
+            return [name for _, name in path[-1].top[start: start + count]]
+    
+    def load(self, db_session: Session) -> None:
+        """ 판매중인 모든 아이템으로 인덱스를 새로 만듦 (서버 시작 시 1번) """
+        from database.models.item import Item
+        
+        rows = db_session.query(Item.seq, Item.name, Item.views).filter(Item.purchase_type == False).all() #type: ignore
+        with self.lock:
+            self.root, self.items, self.names = _Node(), {}, {}
+            for seq, name, views in rows:
+                self.items[seq] = (name, views or 0)
+                self.names.setdefault(name, {})[seq] = views or 0
+                
+            for name in self.names:
+                for key in self._keys(name):
+                    self._path(key, create = True)[-1].names.add(name)
+                    
+            self._build(self.root)
+            self.loaded = True
+    
+    def _build(self, node: _Node) -> None:
+        stack, order = [node], []
+        while stack:
+            current = stack.pop()
+            order.append(current)
+            stack.extend(current.children.values())
+            
+        for current in reversed(order):
+            self._recompute(current)
+            
+
+autocomplete_index = AutocompleteIndex()
\ No newline at end of file
@@ -0,0 +1,90 @@
+from sqlalchemy.orm.session import Session
+from sqlalchemy.engine import Engine
+from sqlalchemy import text, inspect
+from typing import List
+
+class FullTextIndex:
+    """ item.name, item.description 전문 검색 인덱스
+    
+    MySQL: ngram 파서를 쓰는 FULLTEXT 인덱스 (한글은 공백 단위 토큰으로는 부분 검색이 안 됨) \n
+    SQLite: trigram 토크나이저를 쓰는 FTS5 가상 테이블, item 테이블 트리거로 동기화 (로컬 실행용) \n
+    
+    ILIKE '%검색어%' 와 달리 인덱스를 타고, 결과는 관련도 순으로 정렬됨 \n
+    토크나이저 최소 길이 (trigram 3글자, ngram 기본 2글자) 보다 짧은 검색어는 인덱스로 찾을 수 없어서 LIKE 로 찾음 ("가방" 같은 두 글자 한글 검색)
+    """
+    MIN_LENGTH = {"sqlite": 3, "mysql": 2}
+    
+    @staticmethod
+    def create(engine: Engine) -> None:
+        if engine.dialect.name == "mysql":
+            indexes = {index["name"] for index in inspect(engine).get_indexes("item")}
+            with engine.begin() as conn:
+                if "ft_item_name" not in indexes:
+                    conn.execute(text("ALTER TABLE item ADD FULLTEXT INDEX ft_item_name (name) WITH PARSER ngram"))
+                    
+                if "ft_item_name_description" not in indexes:
+                    conn.execute(text("ALTER TABLE item ADD FULLTEXT INDEX ft_item_name_description (name, description) WITH PARSER ngram"))
+                    
+        elif engine.dialect.name == "sqlite":
+            with engine.begin() as conn:
+                exists = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'item_fts'")).first() is not None
+                conn.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS item_fts USING fts5(name, description, content = 'item', content_rowid = 'seq', tokenize = 'trigram')"))
+                conn.execute(text("""
+                    CREATE TRIGGER IF NOT EXISTS item_fts_insert AFTER INSERT ON item BEGIN
+                        INSERT INTO item_fts(rowid, name, description) VALUES (new.seq, new.name, new.description);
+                    END"""))
+                conn.execute(text("""
+                    CREATE TRIGGER IF NOT EXISTS item_fts_delete AFTER DELETE ON item BEGIN
+                        INSERT INTO item_fts(item_fts, rowid, name, description) VALUES ('delete', old.seq, old.name, old.description);
+                    END"""))
+                conn.execute(text("""
+                    CREATE TRIGGER IF NOT EXISTS item_fts_update AFTER UPDATE OF name, description ON item BEGIN
+                        INSERT INTO item_fts(item_fts, rowid, name, description) VALUES ('delete', old.seq, old.name, old.description);
+                        INSERT INTO item_fts(rowid, name, description) VALUES (new.seq, new.name, new.description);
+                    END"""))
+                
+                if not exists:
+                    conn.execute(text("INSERT INTO item_fts(item_fts) VALUES ('rebuild')"))
+    
+    @staticmethod
+    def search(db_session: Session, search_value: str, with_description: bool, start: int, count: int) -> List[int]:
+        """
+        Parameters:
+            db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+            search_value (str): 검색어 \n
+            with_description (bool): True 면 아이템 설명까지 검색 \n
+            start (int): 건너뛸 결과 개수 \n
+            count (int): 불러올 결과 개수 \n
+            
+        Returns:
+            List[int]: 판매중인 아이템 고유 번호 목록 (관련도 높은 순) \n
+        """
+        params = {"start": start, "count": count}
+        dialect = db_session.get_bind().dialect.name
+        if len(search_value.strip()) < FullTextIndex.MIN_LENGTH.get(dialect, 1):
+            # 관련도를 계산할 수 없으므로 등록 순
+            params["value"] = f"%{search_value}%"
+            condition = "(name LIKE :value OR description LIKE :value)" if with_description else "name LIKE :value"
+            statement = text(f"""
+                SELECT seq FROM item
+                WHERE {condition} AND purchase_type = 0
+                ORDER BY seq LIMIT :count OFFSET :start""")
+        
+        elif dialect == "sqlite":
+            # trigram 토크나이저는 3글자 이상부터 인덱스를 탐
+            phrase = '"' + search_value.replace('"', '""') + '"'
+            params["value"] = phrase if with_description else f"name : {phrase}"
+            statement = text("""
+                SELECT item.seq FROM item_fts JOIN item ON item.seq = item_fts.rowid
+                WHERE item_fts MATCH :value AND item.purchase_type = 0
+                ORDER BY item_fts.rank LIMIT :count OFFSET :start""")
+        
+        else:
+            params["value"] = search_value
+            columns = "name, description" if with_description else "name"
+            statement = text(f"""
+                SELECT seq FROM item
+                WHERE MATCH({columns}) AGAINST(:value IN NATURAL LANGUAGE MODE) AND purchase_type = 0
+                ORDER BY MATCH({columns}) AGAINST(:value IN NATURAL LANGUAGE MODE) DESC LIMIT :count OFFSET :start""")
+            
+        return [row[0] for row in db_session.execute(statement, params).all()]
\ No newline at end of file
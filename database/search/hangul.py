@@ -0,0 +1,126 @@
+from sqlalchemy.orm.session import Session
+from typing import Dict, List, Set, Tuple
+import threading
+
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSUNG = ["ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ", "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ"]
+JONGSUNG = ["", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ", "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# 키보드로 직접 입력한 겹모음, 겹받침 호환 자모도 기본 자모로 풀어서 비교
+COMPOUND_JAMO = {"ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ", "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+                 "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ"}
+
+class HangulUtility:
+    @staticmethod
+    def decompose(text: str) -> Tuple[str, str]:
+        """
+        Parameters:
+            text (str): 분해할 문자열 \n
+            
+        Returns:
+            Tuple[str, str]: (자모 문자열, 초성 문자열), 공백은 빼고 한글이 아닌 글자는 소문자로 그대로 둠 \n
+            
+        Examples:
+            "아이폰 15" -> ("ㅇㅏㅇㅣㅍㅗㄴ15", "ㅇㅇㅍ15")
+        """
+        jamo, chosung = [], []
+        for char in text.lower():
+            if char.isspace():
+                continue
+            
+            code = ord(char) - 0xAC00
+            if 0 <= code < 11172:
+                jamo.append(CHOSUNG[code // 588] + JUNGSUNG[code % 588 // 28] + JONGSUNG[code % 28])
+                chosung.append(CHOSUNG[code // 588])
+                
+            else:
+                jamo.append(COMPOUND_JAMO.get(char, char))
+                chosung.append(char)
+                
+        return "".join(jamo), "".join(chosung)
+    
+    @staticmethod
+    def is_chosung(text: str) -> bool:
+        text = "".join(text.split())
+        return len(text) > 0 and all(char in CHOSUNG for char in text)
+
+
+class HangulSearchIndex:
+    """ 아이템 이름을 자모, 초성으로 분해해서 만든 n-gram 역색인 (한글 부분 입력 검색용)
+    
+    "ㅇㅇㅍ" 처럼 초성만 입력하면 초성 문자열에서, "아이ㅍ" 나 입력 도중의 "아잎" 처럼 덜 완성된 글자가 섞이면
+    자모 문자열에서 부분 문자열로 찾음. \n
+    검색어의 1, 2-gram 목록의 교집합으로 후보를 좁힌 뒤 실제 부분 문자열인지 확인하므로 테이블 전체를 훑지 않음. \n
+    프로세스마다 메모리에 따로 가지고 있으며, 서버 시작 시 load 로 채우고 아이템 등록/수정/삭제/구매 때 갱신함.
+    """
+    
+    def __init__(self):
+        self.items: Dict[int, Tuple[str, str, int]] = {} # 아이템 고유 번호 -> (자모 문자열, 초성 문자열, 조회수)
+        self.jamo_grams: Dict[str, Set[int]] = {}
+        self.chosung_grams: Dict[str, Set[int]] = {}
+        self.loaded = False
+        self.lock = threading.RLock()
+    
+    @staticmethod
+    def _grams(text: str) -> Set[str]:
+        return set(text) | {text[i: i + 2] for i in range(len(text) - 1)}
+    
+    def upsert(self, seq: int, name: str, views: int) -> None:
+        with self.lock:
+            self.remove(seq)
+            jamo, chosung = HangulUtility.decompose(name)
+            self.items[seq] = (jamo, chosung, views or 0)
+            for gram in self._grams(jamo):
+                self.jamo_grams.setdefault(gram, set()).add(seq)
+                
+            for gram in self._grams(chosung):
+                self.chosung_grams.setdefault(gram, set()).add(seq)
+    
+    def remove(self, seq: int) -> None:
+        with self.lock:
+            if seq not in self.items:
+                return
+            
+            jamo, chosung, _ = self.items.pop(seq)
+            for grams, text in ((self.jamo_grams, jamo), (self.chosung_grams, chosung)):
+                for gram in self._grams(text):
+                    grams[gram].discard(seq)
+                    if not grams[gram]:
+                        del grams[gram]
+    
+    def search(self, search_value: str, start: int, count: int) -> List[int]:
+        """
+        Parameters:
+            search_value (str): 초성 또는 덜 완성된 한글이 섞인 검색어 \n
+            start (int): 건너뛸 결과 개수 \n
+            count (int): 불러올 결과 개수 \n
+            
+        Returns:
+            List[int]: 이름이 검색어를 포함하는 아이템 고유 번호 목록 (조회수 높은 순) \n
+        """
+        use_chosung = HangulUtility.is_chosung(search_value)
+        jamo, chosung = HangulUtility.decompose(search_value)
+        query, grams, position = (chosung, self.chosung_grams, 1) if use_chosung else (jamo, self.jamo_grams, 0)
+        if query == "":
+            return []
+        
+        with self.lock:
+            postings = sorted((grams.get(gram, set()) for gram in self._grams(query)), key = len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            matched = [(self.items[seq][2], seq) for seq in candidates if query in self.items[seq][position]]
+            
+        return [seq for _, seq in sorted(matched, key = lambda x: (-x[0], x[1]))[start: start + count]]
+    
+    def load(self, db_session: Session) -> None:
+        """ 판매중인 모든 아이템으로 인덱스를 새로 만듦 (서버 시작 시 1번) """
+        from database.models.item import Item
+        
+        rows = db_session.query(Item.seq, Item.name, Item.views).filter(Item.purchase_type == False).all() #type: ignore
+        with self.lock:
+            self.items, self.jamo_grams, self.chosung_grams = {}, {}, {}
+            for seq, name, views in rows:
+                self.upsert(seq, name, views)
+                
+            self.loaded = True
+            
+
+hangul_index = HangulSearchIndex()
\ No newline at end of file
@@ -0,0 +1,145 @@
+from sqlalchemy.orm.session import Session
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
+import numpy as np
+import threading
+import math
+import zlib
+
+class SimilarItemIndex:
+    """ 이름과 설명의 글자 n-gram TF-IDF 코사인 유사도로 비슷한 아이템을 찾는 인덱스
+
+    형태소 분석 없이도 "아이폰", "아이폰15" 처럼 띄어쓰기가 제각각인 한국어를 비교할 수 있도록 2, 3 글자 n-gram 을 씀 \n
+    n-gram 은 해싱으로 dim 차원에 넣고 (hashing trick), 모든 아이템의 TF 를 (행, 열, 값) COO 배열로 들고 있다가
+    질의할 때 현재 IDF 를 곱해서 np.bincount 한 번으로 모든 아이템과의 내적과 노름을 한꺼번에 계산함 \n
+    등록/수정된 아이템은 delta 에 쌓였다가 다음 질의 때 main 배열 뒤에 붙고, 삭제/수정 전 행은 tombstone 으로 표시만 함.
+    tombstone 이 절반을 넘으면 살아있는 행만 남기도록 압축해서 전체를 다시 만들 필요가 없음
+
+    Methods:
+        upsert(self, seq, name, description): 아이템을 추가하거나 바뀐 내용으로 교체 \n
+        remove(self, seq): 아이템을 제거 \n
+        search(self, name, description, count, exclude): 비슷한 아이템 고유 번호 목록 \n
+        load(self, db_session): 판매중인 모든 아이템으로 인덱스를 새로 만듦 \n
+    """
+    def __init__(self, dim: int = 1 << 18, ngram_sizes: Tuple[int, ...] = (2, 3), name_weight: float = 2.0):
+        self.dim = dim
+        self.ngram_sizes = ngram_sizes
+        self.name_weight = name_weight
+        self.loaded = False
+        self.lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.df = np.zeros(self.dim, dtype = np.int64) # n-gram 이 들어있는 살아있는 아이템 수
+        self.docs = 0
+        # main 세그먼트: 행 번호, 해시 열, TF 값
+        self.rows = np.zeros(0, dtype = np.int64)
+        self.cols = np.zeros(0, dtype = np.int64)
+        self.vals = np.zeros(0, dtype = np.float64)
+        # delta 세그먼트: 다음 질의 때 main 에 붙일 행
+        self.delta: List[Tuple[int, np.ndarray, np.ndarray]] = []
+        self.row_seqs: List[int] = [] # 행 번호 -> 아이템 고유 번호
+        self.alive: List[bool] = [] # 행 번호 -> tombstone 이 아니면 True
+        self.features: Dict[int, Tuple[int, np.ndarray]] = {} # 아이템 고유 번호 -> (행 번호, 해시 열)
+
+    def _grams(self, text: str) -> List[str]:
+        text = f" {' '.join(text.lower().split())} "
+        return [text[i: i + n] for n in self.ngram_sizes for i in range(len(text) - n + 1)]
+
+    def vectorize(self, name: str, description: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """ 해시 열과 TF (1 + log(횟수)) 값, 이름에 나온 n-gram 은 name_weight 배 """
+        counts: Counter = Counter()
+        for text, weight in [(name, self.name_weight), (description or "", 1.0)]:
+            for gram in self._grams(text):
+                counts[zlib.crc32(gram.encode("utf-8")) % self.dim] += weight
+
+        cols = np.fromiter(counts.keys(), dtype = np.int64, count = len(counts))
+        vals = np.fromiter((1 + math.log(count) for count in counts.values()), dtype = np.float64, count = len(counts))
+        return cols, vals
+
+    def upsert(self, seq: int, name: str, description: Optional[str]) -> None:
+        cols, vals = self.vectorize(name, description)
+        with self.lock:
+            self.remove(seq)
+            row = len(self.row_seqs)
+            self.row_seqs.append(seq)
+            self.alive.append(True)
+            self.features[seq] = (row, cols)
+            self.delta.append((row, cols, vals))
+            self.df[cols] += 1
+            self.docs += 1
+
+    def remove(self, seq: int) -> None:
+        with self.lock:
+            if seq not in self.features:
+                return
+
+            row, cols = self.features.pop(seq)
+            self.alive[row] = False
+            self.df[cols] -= 1
+            self.docs -= 1
+
+    def _merge(self) -> None:
+        """ delta 를 main 뒤에 붙이고, tombstone 이 절반을 넘으면 살아있는 행만 남김 """
+        if self.delta:
+            self.rows = np.concatenate([self.rows] + [np.full(len(cols), row, dtype = np.int64) for row, cols, _ in self.delta])
+            self.cols = np.concatenate([self.cols] + [cols for _, cols, _ in self.delta])
+            self.vals = np.concatenate([self.vals] + [vals for _, _, vals in self.delta])
+            self.delta = []
+
+        if len(self.row_seqs) > 2 * max(self.docs, 1):
+            alive = np.array(self.alive, dtype = bool)
+            renumber = np.cumsum(alive) - 1
+            keep = alive[self.rows]
+            self.rows, self.cols, self.vals = renumber[self.rows[keep]], self.cols[keep], self.vals[keep]
+            self.row_seqs = [seq for seq, is_alive in zip(self.row_seqs, self.alive) if is_alive]
+            self.alive = [True] * len(self.row_seqs)
+            self.features = {seq: (row, self.features[seq][1]) for row, seq in enumerate(self.row_seqs)}
+
+    def search(self, name: str, description: Optional[str], count: int, exclude: Optional[int] = None) -> List[int]:
+        """
+        Parameters:
+            name (str): 기준 아이템 이름 \n
+            description (str | None): 기준 아이템 설명 \n
+            count (int): 불러올 아이템 개수 \n
+            exclude (int | None): 결과에서 뺄 아이템 고유 번호 (보통 기준 아이템 본인) \n
+
+        Returns:
+            List[int]: 코사인 유사도 내림차순 아이템 고유 번호 목록 (유사도 0 인 아이템은 빠짐) \n
+        """
+        query_cols, query_vals = self.vectorize(name, description)
+        with self.lock:
+            self._merge()
+            if self.docs == 0 or len(self.rows) == 0:
+                return []
+
+            idf = np.log((1 + self.docs) / (1 + np.maximum(self.df, 0))) + 1
+            query = np.zeros(self.dim, dtype = np.float64)
+            query[query_cols] = query_vals * idf[query_cols]
+
+            weighted = self.vals * idf[self.cols]
+            dots = np.bincount(self.rows, weights = weighted * query[self.cols], minlength = len(self.row_seqs))
+            norms = np.sqrt(np.bincount(self.rows, weights = weighted * weighted, minlength = len(self.row_seqs)))
+            scores = np.divide(dots, norms, out = np.zeros_like(dots), where = norms > 0)
+            scores[~np.array(self.alive, dtype = bool)] = 0
+            if exclude is not None and exclude in self.features:
+                scores[self.features[exclude][0]] = 0
+
+            top = np.argsort(-scores, kind = "stable")[:count]
+            return [self.row_seqs[row] for row in top if scores[row] > 0]
+
+    def load(self, db_session: Session) -> None:
+        """ 판매중인 모든 아이템으로 인덱스를 새로 만듦 (서버 시작 시 1번) """
+        from database.models.item import Item
+
+        rows = db_session.query(Item.seq, Item.name, Item.description).filter(Item.purchase_type == False).all() #type: ignore
+        with self.lock:
+            self._reset()
+            for seq, name, description in rows:
+                self.upsert(seq, name, description)
+
+            self._merge()
+            self.loaded = True
+
+
+similar_index = SimilarItemIndex()
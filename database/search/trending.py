@@ -0,0 +1,169 @@
+from sqlalchemy.orm.session import Session
+from typing import Dict, List, Optional, Set, Tuple, Any
+from database.conn import user_info
+from datetime import datetime
+import threading
+import math
+
+class TrendingIndex:
+    """ 추천 화면용 인기 순위를 미리 정렬해 둔 목록 (전체 + 카테고리별)
+
+    점수 = (조회수 + saves_weight * 저장 횟수 + 1) * 0.5 ^ (등록 후 지난 시간 / half_life_hours) \n
+    요청마다 전체 아이템을 정렬하는 대신 interval 초마다 백그라운드에서 다시 만들고,
+    요청은 만들어 둔 목록에서 start ~ start + count 만 잘라서 씀 \n
+    새로 등록된 아이템은 commit 뒤에 add 로 바로 끼워 넣고 (점수는 built_at 기준), 삭제/구매된 아이템은 바로 빠짐 \n
+    다른 프로세스에서 등록돼서 아직 순위에 없는 아이템은 unranked 로 구분해서 조회수 순으로 순위 뒤에 붙여 씀
+
+    Methods:
+        fetch(self, db_session): 순위 계산에 필요한 컬럼만 읽어옴 \n
+        build(self, rows): 읽어온 행으로 순위를 계산해서 통째로 교체 (CPU 작업이라 스레드에서 실행) \n
+        load(self, db_session): fetch + build \n
+        slice(self, start, count, category_seq): 순위 목록의 일부 \n
+        after(self, cursor, count, category_seq): 커서 다음 순위부터 count 개 \n
+        add(self, seq, category_seq, views, saved_cnt, created_at): 새로 등록된 아이템을 점수 위치에 끼워 넣음 \n
+        remove(self, seq): 삭제/구매된 아이템을 순위에서 뺌 \n
+        unranked(self, category_seq): 순위 개수와 순위 밖 아이템을 고르는 기준 \n
+    """
+    def __init__(self, saves_weight: float = 3.0, half_life_hours: float = 24.0, interval: float = 300.0):
+        self.saves_weight = saves_weight
+        self.half_life_hours = half_life_hours
+        self.interval = interval
+        self.ranking: List[int] = []
+        self.categories: Dict[int, List[int]] = {}
+        self.scores: Dict[int, float] = {} # 아이템 고유 번호 -> built_at 기준 점수
+        self.max_seq = 0 # rebuild 할 때 읽은 가장 큰 아이템 고유 번호, 이보다 크면 순위에 없을 수 있음
+        self.added: Set[int] = set() # rebuild 뒤에 add 로 들어온 아이템
+        self.built_at: Optional[datetime] = None
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def score(self, views: int, saved_cnt: int, created_at: datetime, now: datetime) -> float:
+        age_hours = max((now - created_at).total_seconds(), 0) / 3600
+        return (views + self.saves_weight * saved_cnt + 1) * 0.5 ** (age_hours / self.half_life_hours)
+
+    def fetch(self, db_session: Session) -> List[Tuple[int, int, int, int, datetime]]:
+        from database.models.item import Item
+
+        return db_session.query(Item.seq, Item.category_seq, Item.views, Item.saved_cnt, Item.created_at).filter(Item.purchase_type == False).all() #type: ignore
+
+    def build(self, rows: List[Tuple[int, int, int, int, datetime]]) -> None:
+        now = datetime.now()
+        scored = sorted(((-self.score(views or 0, saved_cnt or 0, created_at, now), seq, category_seq) for seq, category_seq, views, saved_cnt, created_at in rows))
+        ranking: List[int] = []
+        categories: Dict[int, List[int]] = {}
+        scores: Dict[int, float] = {}
+        for score, seq, category_seq in scored:
+            ranking.append(seq)
+            categories.setdefault(category_seq, []).append(seq)
+            scores[seq] = -score
+
+        with self.lock:
+            self.ranking, self.categories, self.scores = ranking, categories, scores
+            self.max_seq = max(scores, default = 0)
+            self.added = set()
+            self.built_at = now
+            self.loaded = True
+
+    def load(self, db_session: Session) -> None:
+        self.build(self.fetch(db_session))
+
+    def slice(self, start: int, count: int, category_seq: Optional[int] = None) -> List[int]:
+        with self.lock:
+            ranking = self.ranking if category_seq is None else self.categories.get(category_seq, [])
+            return ranking[start: start + count]
+
+    def after(self, cursor: Dict[str, Any], count: int, category_seq: Optional[int] = None) -> List[Tuple[int, Dict[str, Any]]]:
+        """ 커서 페이지네이션용, cursor 로 받은 아이템 바로 다음 순위부터 count 개
+
+        Parameters:
+            cursor (Dict[str, Any]): 이전에 돌려준 (아이템 고유 번호, 커서) 의 커서, 빈 dict 면 처음부터 \n
+            count (int): 불러올 아이템 개수 \n
+            category_seq (int | None): 카테고리 고유 번호, None 이면 전체 \n
+
+        Returns:
+            List[Tuple[int, Dict[str, Any]]]: (아이템 고유 번호, 그 아이템 다음부터 이어서 부를 커서) 목록 \n
+            순위 위치 대신 (점수, 고유 번호) 를 커서로 써서 사이에 아이템이 추가/삭제돼도 건너뛰거나 겹치지 않고,
+            커서를 만든 뒤에 다시 build 했으면 점수를 새 built_at 기준으로 환산해서 이어감 \n
+        """
+        with self.lock:
+            if not self.loaded:
+                return []
+
+            ranking = self.ranking if category_seq is None else self.categories.get(category_seq, [])
+            built_at = self.built_at.timestamp() # type: ignore
+            low = 0
+            if cursor:
+                score = float(cursor["score"]) * 0.5 ** ((built_at - float(cursor["built_at"])) / 3600 / self.half_life_hours)
+                # 환산한 점수와 새로 계산한 점수는 부동소수점 오차만큼 다를 수 있어서, 커서 아이템 자신은 새 점수로 맞춤
+                if int(cursor["seq"]) in self.scores and math.isclose(score, self.scores[int(cursor["seq"])], rel_tol = 1e-9):
+                    score = self.scores[int(cursor["seq"])]
+
+                low = self._bisect(ranking, (-score, int(cursor["seq"])), right = True)
+
+            return [(seq, {"score": self.scores[seq], "seq": seq, "built_at": built_at}) for seq in ranking[low: low + count]]
+
+    def _bisect(self, seqs: List[int], key: Tuple[float, int], right: bool = False) -> int:
+        """ (점수 내림차순, 고유 번호 오름차순) 으로 정렬된 seqs 에서 key 가 들어갈 위치, right 면 key 와 같은 아이템 뒤 """
+        low, high = 0, len(seqs)
+        while low < high:
+            middle = (low + high) // 2
+            if (-self.scores[seqs[middle]], seqs[middle]) < key or (right and (-self.scores[seqs[middle]], seqs[middle]) == key):
+                low = middle + 1
+
+            else:
+                high = middle
+
+        return low
+
+    def _insert(self, seqs: List[int], seq: int) -> List[int]:
+        """ (점수 내림차순, 고유 번호 오름차순) 정렬을 유지하도록 끼워 넣은 새 목록 """
+        low = self._bisect(seqs, (-self.scores[seq], seq))
+        return seqs[:low] + [seq] + seqs[low:]
+
+    def add(self, seq: int, category_seq: int, views: int, saved_cnt: int, created_at: datetime) -> None:
+        """ 새로 등록된 아이템을 다음 rebuild 를 기다리지 않고 순위에 넣음, 아직 한 번도 build 하지 않았으면 무시 (조회수 순으로 대신 보여줌) """
+        with self.lock:
+            if not self.loaded or seq in self.scores:
+                return
+
+            self.scores[seq] = self.score(views, saved_cnt, created_at, self.built_at) # type: ignore
+            self.ranking = self._insert(self.ranking, seq)
+            self.categories = {**self.categories, category_seq: self._insert(self.categories.get(category_seq, []), seq)}
+            self.added.add(seq)
+
+    def remove(self, seq: int) -> None:
+        with self.lock:
+            if seq not in self.scores:
+                return
+
+            del self.scores[seq]
+            self.added.discard(seq)
+            self.ranking = [item for item in self.ranking if item != seq]
+            self.categories = {category_seq: [item for item in seqs if item != seq] for category_seq, seqs in self.categories.items()}
+
+    def unranked(self, category_seq: Optional[int] = None) -> Tuple[int, int, List[int]]:
+        """
+        Returns:
+            (int, int, List[int]): 순위 개수, max_seq, add 로 이미 들어간 아이템 \n
+            순위에 없는 아이템은 고유 번호가 max_seq 보다 크면서 마지막 목록에 없는 아이템 \n
+        """
+        with self.lock:
+            ranking = self.ranking if category_seq is None else self.categories.get(category_seq, [])
+            return len(ranking), self.max_seq, list(self.added)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "items": len(self.ranking),
+                "categories": {category_seq: len(seqs) for category_seq, seqs in self.categories.items()},
+                "built_at": self.built_at.strftime("%Y/%m/%d %H:%M:%S") if self.built_at else None,
+                "interval": self.interval
+            }
+
+
+# 순위 설정, user_info.txt 에 trending_interval = 60 처럼 적어서 덮어쓸 수 있음
+trending_index = TrendingIndex(
+    saves_weight = float(user_info.get("trending_saves_weight", 3)),
+    half_life_hours = float(user_info.get("trending_half_life_hours", 24)),
+    interval = float(user_info.get("trending_interval", 300))
+)
@@ -0,0 +1,4 @@
+from .content_addressed import ContentAddressedStorage
+from .base import ImageStorage
+
+image_storage: ImageStorage = ContentAddressedStorage()
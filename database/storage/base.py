@@ -0,0 +1,55 @@
+from sqlalchemy.orm.session import Session
+from typing import Iterator, List, Optional, Tuple
+from abc import ABC, abstractmethod
+
+class ImageStorage(ABC):
+    """ 이미지 파일 저장소 인터페이스, 모델과 업로드 코드는 open() 대신 이 인터페이스를 통해 파일을 다룸
+
+    Methods:
+        temp_path(self): 업로드를 받아 둘 임시 파일 경로 \n
+        path(self, digest): 내용 해시에 해당하는 최종 저장 경로 \n
+        digest_of(self, path): 저장 경로에서 내용 해시를 꺼냄 (이 저장소 파일이 아니면 None) \n
+        exists(self, path): 이미 저장된 파일인지 \n
+        acquire(self, db_session, path): 경로를 데이터베이스 행이 참조하기 시작함 \n
+        acquire_many(self, db_session, paths): 여러 경로를 한 번에 acquire, 같은 경로가 여러 번 있으면 그만큼 참조함 \n
+        release(self, db_session, path): 경로를 참조하던 데이터베이스 행이 사라짐 \n
+        delete(self, path): 파일과 파생 이미지를 지움 \n
+        scan(self, batch_size): 저장된 파일을 (원본 경로, 파생 이미지 포함 크기, 마지막 수정 시간) 묶음으로 훑음 \n
+
+    acquire_many 말고는 모두 추상 메소드라서 하나라도 빠진 구현은 만들 때 TypeError 가 남
+    """
+    @abstractmethod
+    def temp_path(self) -> str:
+        ...
+
+    @abstractmethod
+    def path(self, digest: str) -> str:
+        ...
+
+    @abstractmethod
+    def digest_of(self, path: Optional[str]) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def exists(self, path: str) -> bool:
+        ...
+
+    @abstractmethod
+    def acquire(self, db_session: Session, path: Optional[str]) -> None:
+        ...
+
+    def acquire_many(self, db_session: Session, paths: List[Optional[str]]) -> None:
+        for path in paths:
+            self.acquire(db_session, path)
+
+    @abstractmethod
+    def release(self, db_session: Session, path: Optional[str]) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, path: str) -> int:
+        ...
+
+    @abstractmethod
+    def scan(self, batch_size: int) -> Iterator[List[Tuple[str, int, float]]]:
+        ...
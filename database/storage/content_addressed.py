@@ -0,0 +1,111 @@
+from database.utility.image_util import ImageUtility
+from sqlalchemy.orm.session import Session
+from database.storage.base import ImageStorage
+from typing import Dict, Iterator, List, Optional, Tuple
+import re
+import uuid
+import os
+
+DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+class ContentAddressedStorage(ImageStorage):
+    """ 업로드 원본의 sha256 을 파일 이름으로 쓰는 저장소
+
+    images/ab/cd/abcd....jpg 처럼 해시 앞 글자로 폴더를 나눠서 (fan-out) 한 폴더에 파일이 몰리지 않게 하고,
+    같은 사진을 다시 올리면 파일을 새로 만들지 않고 image_blob.ref_count 만 올림 \n
+    uuid 이름으로 저장된 예전 파일은 digest_of 가 None 이라 참조 수를 세지 않음
+    """
+    def __init__(self, root: str = "images", depth: int = 2, width: int = 2, extension: str = ".jpg"):
+        self.root = root
+        self.depth = depth
+        self.width = width
+        self.extension = extension
+
+    def temp_path(self) -> str:
+        # 최종 경로로 os.replace 할 수 있도록 같은 파일 시스템 안에 둠
+        directory = os.path.join(self.root, "tmp")
+        os.makedirs(directory, exist_ok = True)
+        return os.path.join(directory, f"{str(uuid.uuid4())}.part")
+
+    def path(self, digest: str) -> str:
+        shards = [digest[i * self.width: (i + 1) * self.width] for i in range(self.depth)]
+        return os.path.join(self.root, *shards, f"{digest}{self.extension}")
+
+    def digest_of(self, path: Optional[str]) -> Optional[str]:
+        if path is None:
+            return None
+
+        digest = os.path.splitext(os.path.basename(ImageUtility.base_path(path)))[0]
+        return digest if DIGEST.match(digest) and self.path(digest) == os.path.normpath(ImageUtility.base_path(path)) else None
+
+    def exists(self, path: str) -> bool:
+        return os.path.isfile(path)
+
+    def acquire(self, db_session: Session, path: Optional[str]) -> None:
+        from database.models.image_blob import ImageBlob
+
+        digest = self.digest_of(path)
+        if digest is not None:
+            ImageBlob.acquire(db_session, digest, os.path.getsize(path) if os.path.isfile(path) else 0) # type: ignore
+
+    def acquire_many(self, db_session: Session, paths: List[Optional[str]]) -> None:
+        from database.models.image_blob import ImageBlob
+
+        blobs: Dict[str, Tuple[int, int]] = {}
+        for path in paths:
+            digest = self.digest_of(path)
+            if digest is not None:
+                count, size = blobs.get(digest, (0, os.path.getsize(path) if os.path.isfile(path) else 0)) # type: ignore
+                blobs[digest] = (count + 1, size)
+
+        ImageBlob.acquire_many(db_session, blobs)
+
+    def release(self, db_session: Session, path: Optional[str]) -> None:
+        from database.models.image_blob import ImageBlob
+
+        digest = self.digest_of(path)
+        if digest is not None:
+            ImageBlob.release(db_session, digest)
+
+    def delete(self, path: str) -> int:
+        """ 파일과 파생 이미지를 지우고 지운 바이트 수를 돌려줌 """
+        reclaimed = 0
+        for file_path in {path, *ImageUtility.all_paths(path)}:
+            if os.path.isfile(file_path):
+                reclaimed += os.path.getsize(file_path)
+                os.remove(file_path)
+
+        return reclaimed
+
+    def scan(self, batch_size: int = 1000) -> Iterator[List[Tuple[str, int, float]]]:
+        """ root 아래 파일을 폴더 하나씩 읽어서 batch_size 개씩 돌려줌 (전체 목록을 메모리에 올리지 않음)
+
+        파생 이미지 (_thumb, _card, .webp) 는 원본 경로 하나로 묶고, 크기는 합, 수정 시간은 가장 최근 값 \n
+        images/tmp 의 .part 파일과 uuid 이름의 예전 파일도 그대로 돌려주므로 digest_of 로 구분해서 씀
+        """
+        batch: List[Tuple[str, int, float]] = []
+        for directory, directories, files in os.walk(self.root):
+            directories.sort()
+            groups: Dict[str, Tuple[int, float]] = {}
+            for name in sorted(files):
+                file_path = os.path.join(directory, name)
+                try:
+                    stat_result = os.stat(file_path)
+
+                except FileNotFoundError:
+                    continue
+
+                # .webp 는 같은 이름 .jpg 의 파생 이미지라 같은 묶음으로 셈
+                root, extension = os.path.splitext(ImageUtility.base_path(file_path))
+                base_path = f"{root}{self.extension if extension == '.webp' else extension}"
+                size, modified = groups.get(base_path, (0, 0.0))
+                groups[base_path] = (size + stat_result.st_size, max(modified, stat_result.st_mtime))
+
+            for base_path, (size, modified) in groups.items():
+                batch.append((base_path, size, modified))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+
+        if batch:
+            yield batch
@@ -0,0 +1,49 @@
+from sqlalchemy.orm.session import Session, SessionTransaction
+from typing import Any, Callable
+from sqlalchemy import event
+import traceback
+import logging
+
+def on_commit(db_session: Session, callback: Callable[..., Any], *args: Any) -> None:
+    """ db_session 이 commit 된 뒤에 callback(*args) 를 실행, rollback 되거나 commit 없이 닫히면 버림
+
+    모델 메소드는 flush 까지만 하므로 메모리 인덱스나 캐시처럼 되돌릴 수 없는 프로세스 전역 상태는 이걸로 바꿔야
+    요청이 실패했을 때 데이터베이스와 어긋나지 않음 \n
+    등록한 순서대로 실행하고, callback 에서 난 예외는 로그만 남김 (이미 commit 된 요청을 실패로 만들지 않음)
+
+    Parameters:
+        db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+        callback (Callable): commit 뒤에 실행할 함수 \n
+        args: callback 에 넘길 인자 \n
+    """
+    if not db_session.in_transaction():
+        # 트랜잭션이 끝날 때 버려지도록 아직 시작 전이면 지금 시작함
+        db_session.begin()
+
+    db_session.info.setdefault("on_commit", []).append((callback, args))
+
+def rollback_only(db_session: Session) -> None:
+    """ 요청이 에러 결과로 끝났다고 표시, routers.env.get_db_session 이 요청 끝에 commit 대신 rollback 함
+
+    모델 메소드는 예외를 MACResult 로 바꿔서 돌려주므로 의존성에서는 예외를 볼 수 없음,
+    예외를 잡은 곳에서 이걸 불러야 실패 전에 flush 한 변경사항 (이미지 참조 해제 등) 이 commit 되지 않음
+
+    Parameters:
+        db_session (Session): 데이터베이스 연동을 위한 sqlalchemy Session 객체. \n
+    """
+    db_session.info["rollback_only"] = True
+
+@event.listens_for(Session, "after_commit")
+def _run_on_commit(db_session: Session) -> None:
+    for callback, args in db_session.info.pop("on_commit", []):
+        try:
+            callback(*args)
+
+        except Exception as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_on_end(db_session: Session, transaction: SessionTransaction) -> None:
+    # commit 이면 after_commit 에서 이미 꺼냈으므로 여기서는 rollback, close 로 끝난 트랜잭션의 남은 작업만 버림
+    if transaction.parent is None:
+        db_session.info.pop("on_commit", None)
@@ -0,0 +1,32 @@
+from typing import Dict, Any, Optional
+import base64
+import json
+
+class CursorUtility:
+    """ keyset 페이지네이션에서 쓰는 next_cursor 를 만들고 해석하는 클래스
+    
+    클라이언트는 커서 내용을 몰라도 되도록 마지막 행의 정렬 키를 base64 로 감싸서 전달함
+    """
+    @staticmethod
+    def encode(values: Dict[str, Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(values, separators = (",", ":")).encode("utf-8")).decode("utf-8").rstrip("=")
+    
+    @staticmethod
+    def decode(cursor: str) -> Optional[Dict[str, Any]]:
+        """
+        Parameters:
+            cursor (str): encode 로 만든 커서, 빈 문자열은 첫 페이지를 의미 \n
+            
+        Returns:
+            Dict[str, Any]: 마지막 행의 정렬 키 (첫 페이지는 빈 dict) \n
+            None: 잘못된 커서 \n
+        """
+        if cursor == "":
+            return {}
+        
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8"))
+            return values if isinstance(values, dict) else None
+        
+        except Exception:
+            return None
\ No newline at end of file
@@ -0,0 +1,27 @@
+from typing import Iterable, Optional, Set
+
+class FieldUtility:
+    """ fields= 쿼리 파라미터 ("name,price") 를 응답에 넣을 필드 집합으로 바꿔주는 클래스 """
+    @staticmethod
+    def parse(fields: Optional[str], allowed: Iterable[str]) -> Optional[Set[str]]:
+        """
+        Parameters:
+            fields (str | None): 쉼표로 구분한 필드 이름 \n
+            allowed (Iterable[str]): 고를 수 있는 필드 이름 \n
+
+        Returns:
+            Set[str]: 고른 필드 \n
+            None: fields 가 없거나 비어 있음 (모든 필드) \n
+
+        Raises:
+            ValueError: allowed 에 없는 필드, 메시지는 쉼표로 구분한 잘못된 필드 이름 \n
+        """
+        if fields is None or fields.strip() == "":
+            return None
+
+        selected = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = selected - set(allowed)
+        if unknown:
+            raise ValueError(",".join(sorted(unknown)))
+
+        return selected
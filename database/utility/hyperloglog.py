@@ -0,0 +1,52 @@
+from typing import Optional
+import hashlib
+import math
+
+class HyperLogLog:
+    """ 고유 방문자 수를 고정 크기(2^p 바이트)로 추정하는 HyperLogLog 스케치
+
+    같은 값을 여러 번 넣어도 한 번으로 세고, 두 스케치를 레지스터별 max 로 합치면
+    두 집합의 합집합을 추정한 것과 같아서 워커마다 따로 모은 스케치를 합칠 수 있음
+    p = 12 이면 4KB, 표준오차는 약 1.04 / sqrt(2^p) = 1.6%
+
+    Methods:
+        add(self, value): 값을 추가 \n
+        count(self): 고유한 값 개수 추정치 \n
+        merge(self, other): 다른 스케치를 합침 (레지스터별 max) \n
+        to_bytes(self), from_bytes(data): 데이터베이스에 저장하기 위한 직렬화 \n
+    """
+    def __init__(self, p: int = 12, registers: Optional[bytearray] = None) -> None:
+        self.p = p
+        self.m = 1 << p
+        self.registers = registers if registers is not None else bytearray(self.m)
+
+    def add(self, value: str) -> None:
+        # 파이썬 hash() 는 프로세스마다 달라서 워커끼리 합칠 수 있도록 고정된 해시를 사용
+        x = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size = 8).digest(), "big")
+        index = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # 값이 적을 때는 빈 레지스터 비율로 세는 linear counting 이 더 정확함
+            estimate = self.m * math.log(self.m / zeros)
+
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        assert self.p == other.p, "p 가 같은 스케치끼리만 합칠 수 있습니다."
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "HyperLogLog":
+        return HyperLogLog(p = len(data).bit_length() - 1, registers = bytearray(data))
@@ -0,0 +1,116 @@
+from PIL import Image, ImageOps, UnidentifiedImageError
+from typing import List, Optional
+import tempfile
+import re
+import os
+
+# 크기별 긴 변의 최대 픽셀, full 은 원본 경로 자체에 저장
+VARIANTS = {"thumb": 160, "card": 480, "full": 1600}
+VARIANT_SUFFIX = re.compile(r"_(thumb|card)$")
+
+class ImageUtility:
+    """ 업로드 된 이미지로 크기별 파생 이미지를 만들고 찾아주는 클래스
+
+    images/.../<hash>.jpg 에 대해 <hash>_thumb.jpg, <hash>_card.jpg 를 만들고
+    <hash>.jpg 는 full 크기로 줄인 이미지로 저장함 (webp 를 켜면 같은 이름의 .webp 도 만듦) \n
+    EXIF 는 방향만 픽셀에 반영하고 나머지(촬영 위치 등)는 저장하지 않음
+    """
+    @staticmethod
+    def base_path(path: str) -> str:
+        """ 파생 이미지 경로를 넘겨도 원본 경로로 바꿔줌 (images/a_card.jpg -> images/a.jpg) """
+        root, extension = os.path.splitext(path)
+        return f"{VARIANT_SUFFIX.sub('', root)}{extension}"
+
+    @staticmethod
+    def variant_path(path: str, size: str, extension: Optional[str] = None) -> str:
+        root, original_extension = os.path.splitext(ImageUtility.base_path(path))
+        return f"{root}{'' if size == 'full' else f'_{size}'}{extension or original_extension}"
+
+    @staticmethod
+    def _save(image: Image.Image, path: str, format: str, **options) -> None:
+        """ 같은 폴더의 겹치지 않는 임시 파일에 쓰고 os.replace 로 바꿔치기 (다른 프로세스가 같은 파일을 동시에 만들어도 서로의 임시 파일을 건드리지 않음) """
+        fd, temp_path = tempfile.mkstemp(dir = os.path.dirname(path) or ".", prefix = f".{os.path.basename(path)}.", suffix = ".tmp")
+        os.close(fd)
+        try:
+            image.save(temp_path, format, **options)
+            os.replace(temp_path, path)
+
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def make_variants(path: str, webp: bool = True, target: Optional[str] = None) -> bool:
+        """ ProcessPoolExecutor 에서 실행하는 CPU 작업
+
+        Parameters:
+            path (str): 디스크에 저장된 업로드 이미지 경로 \n
+            webp (bool): WebP 파일도 만들지 여부 \n
+            target (str | None): 파생 이미지를 저장할 원본 경로, None 이면 path 자리에 저장 \n
+
+        Returns:
+            True: 파생 이미지 생성 성공 \n
+            False: 이미지 파일이 아님 \n
+        """
+        try:
+            with Image.open(path) as original:
+                image = ImageOps.exif_transpose(original)
+                image = image.convert("RGB") if image.mode != "RGB" else image.copy()
+
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            return False
+
+        target = target or path
+        os.makedirs(os.path.dirname(target) or ".", exist_ok = True)
+        # full 을 마지막에 쓰기 때문에 target 파일이 있으면 나머지 크기도 모두 있음
+        for size, max_side in VARIANTS.items():
+            variant = image.copy()
+            variant.thumbnail((max_side, max_side))
+            if webp:
+                ImageUtility._save(variant, ImageUtility.variant_path(target, size, ".webp"), "WEBP", quality = 80)
+
+            ImageUtility._save(variant, ImageUtility.variant_path(target, size, ".jpg"), "JPEG", quality = 85, optimize = True, progressive = True)
+
+        return True
+
+    @staticmethod
+    def all_paths(path: str) -> List[str]:
+        """ 원본과 모든 파생 이미지 경로 (지울 때 사용) """
+        return [ImageUtility.variant_path(path, size, extension) for size in VARIANTS for extension in [".jpg", ".webp"]]
+
+    @staticmethod
+    def is_inside(path: str, directory: str = "images") -> bool:
+        """ ../ 등으로 이미지 폴더 밖의 파일을 읽지 못하도록 확인 """
+        directory = os.path.realpath(directory)
+        return os.path.commonpath([os.path.realpath(path), directory]) == directory
+
+    @staticmethod
+    def candidates(path: str, size: Optional[str] = None, accept_webp: bool = False) -> List[str]:
+        """ 보내줄 수 있는 파일 경로를 우선순위대로 (디스크는 확인하지 않음) """
+        if size is None:
+            match = VARIANT_SUFFIX.search(os.path.splitext(path)[0])
+            size = match.group(1) if match else "full"
+
+        candidates = [ImageUtility.variant_path(path, size, ".webp")] if accept_webp else []
+        return candidates + [ImageUtility.variant_path(path, size), ImageUtility.base_path(path)]
+
+    @staticmethod
+    def resolve(path: str, size: Optional[str] = None, accept_webp: bool = False) -> Optional[str]:
+        """
+        Parameters:
+            path (str): 원본 또는 파생 이미지 경로 \n
+            size (str | None): thumb, card, full 중 하나, None 이면 path 에 붙은 크기 (없으면 full) \n
+            accept_webp (bool): 클라이언트가 WebP 를 받을 수 있는지 (Accept 헤더) \n
+
+        Returns:
+            str: 실제로 보내줄 파일 경로, 파생 이미지가 없는 예전 업로드는 원본 경로 \n
+            None: 파일이 없음 \n
+        """
+        if not ImageUtility.is_inside(path):
+            return None
+
+        for candidate in ImageUtility.candidates(path, size, accept_webp):
+            if os.path.isfile(candidate):
+                return candidate
+
+        return None
@@ -0,0 +1,157 @@
+from sqlalchemy.orm.session import Session
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+from database.conn import user_info
+from database.utility.commit_hooks import on_commit
+import threading
+import json
+import time
+
+class ResponseCache:
+    """ 자주 읽는 GET 응답 본문을 (경로, 정리한 파라미터) 키로 들고 있는 프로세스 로컬 캐시
+
+    값마다 태그 (item:3, user:admin 등) 를 달아두고, 데이터가 바뀌면 태그 단위로 관련 응답을 한꺼번에 지움 \n
+    모델 메소드는 flush 까지만 하므로 invalidate_on_commit 으로 태그를 세션에 모아뒀다가 commit 이 끝난 뒤에 지움
+    (commit 전에 지우면 그 사이에 들어온 요청이 바뀌기 전 값을 다시 캐시할 수 있음) \n
+    저장된 값은 여러 요청이 같이 쓰므로 꺼낸 쪽에서 고치지 말고 복사해서 써야 함
+
+    Methods:
+        key(route, **params): None 인 파라미터를 빼고 이름 순으로 정렬한 캐시 키 \n
+        get(self, key): 값을 꺼냄, 없거나 만료됐으면 None \n
+        set(self, key, value, tags, ttl): 값을 넣고, 개수나 용량을 넘으면 가장 오래 안 쓴 값부터 버림 \n
+        invalidate(self, *tags): 태그가 달린 값을 모두 지움 \n
+        invalidate_on_commit(self, db_session, *tags): db_session 이 commit 된 뒤에 invalidate \n
+        clear(self): 전부 지움 \n
+        stats(self): 크기, 사용 메모리, 경로별 적중률 \n
+    """
+    def __init__(self, maxsize: int = 2048, ttl: float = 30.0, max_bytes: int = 32 * 1024 * 1024) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.invalidations = 0
+        self._counts: Dict[str, Dict[str, int]] = {} # 경로 -> {"hits": 적중, "misses": 실패}
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, int, Tuple[str, ...]]]" = OrderedDict() # 키 -> (값, 만료 시각, 바이트, 태그)
+        self._tags: Dict[str, Set[Hashable]] = {} # 태그 -> 키 목록
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(route: str, **params: Any) -> Tuple:
+        """ 순서만 다른 같은 요청이 같은 키가 되도록 정리, list / set 값은 tuple 로 (set 은 정렬해서) 바꿈 """
+        normalized = []
+        for name in sorted(params):
+            value = params[name]
+            if value is None:
+                continue
+
+            if isinstance(value, (set, frozenset)):
+                value = tuple(sorted(value))
+
+            elif isinstance(value, list):
+                value = tuple(value)
+
+            normalized.append((name, value))
+
+        return (route, tuple(normalized))
+
+    def _count(self, key: Hashable, result: str) -> None:
+        route = key[0] if isinstance(key, tuple) else str(key)
+        counts = self._counts.setdefault(route, {"hits": 0, "misses": 0})
+        counts[result] += 1
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size, tags = self._data.pop(key)
+        self.bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+
+                self._count(key, "misses")
+                return None
+
+            self._data.move_to_end(key)
+            self._count(key, "hits")
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), ttl: Optional[float] = None) -> None:
+        # 사용 메모리는 JSON 으로 보낼 때의 본문 크기로 어림잡음
+        size = len(json.dumps(value, ensure_ascii = False, default = str).encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        tags = tuple(set(tags))
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl), size, tags)
+            self.bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            while len(self._data) > self.maxsize or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+
+    def invalidate(self, *tags: str) -> int:
+        """
+        Returns:
+            int: 지운 값 개수 \n
+        """
+        with self._lock:
+            removed = 0
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+
+            self.invalidations += removed
+            return removed
+
+    def invalidate_on_commit(self, db_session: Session, *tags: str) -> None:
+        """ db_session 이 commit 되면 지우고, rollback 되면 그냥 버림 """
+        on_commit(db_session, self.invalidate, *tags)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(counts["hits"] for counts in self._counts.values())
+            misses = sum(counts["misses"] for counts in self._counts.values())
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "tags": len(self._tags),
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "invalidations": self.invalidations,
+                "routes": {
+                    route: {**counts, "hit_rate": round(counts["hits"] / (counts["hits"] + counts["misses"]), 4) if counts["hits"] + counts["misses"] else 0.0}
+                    for route, counts in self._counts.items()
+                }
+            }
+
+
+# 응답 캐시, user_info.txt 에 response_cache_ttl = 10 처럼 적어서 덮어쓸 수 있음 (response_cache_size = 0 이면 사실상 꺼짐)
+response_cache = ResponseCache(
+    maxsize = int(user_info.get("response_cache_size", 2048)),
+    ttl = float(user_info.get("response_cache_ttl", 30)),
+    max_bytes = int(user_info.get("response_cache_max_bytes", 32 * 1024 * 1024))
+)
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import threading
+import time
+
+class TTLCache:
+    """ 최근에 쓴 순서(LRU)와 만료 시간(TTL)을 함께 쓰는 프로세스 로컬 캐시
+
+    run_sync 로 도는 동기 코드와 이벤트 루프 양쪽에서 접근하므로 lock 으로 감싸서 사용함
+
+    Methods:
+        get(self, key): 값을 꺼냄, 없거나 만료됐으면 None \n
+        set(self, key, value): 값을 넣고, 가득 찼으면 가장 오래 안 쓴 값을 버림 \n
+        delete(self, *keys): 값을 지움 \n
+        clear(self): 전부 지움 \n
+        stats(self): 크기, 적중/실패 횟수 \n
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._expires: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._data or self._expires[key] <= time.monotonic():
+                self._data.pop(key, None)
+                self._expires.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._expires[key] = time.monotonic() + self.ttl
+            while len(self._data) > self.maxsize:
+                old_key, _ = self._data.popitem(last = False)
+                del self._expires[old_key]
+
+    def delete(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+                self._expires.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
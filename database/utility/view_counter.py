@@ -0,0 +1,73 @@
+from database.utility.hyperloglog import HyperLogLog
+from typing import Dict, Optional, Tuple
+import asyncio
+
+class ViewCounter:
+    """ 조회수를 메모리에 모아뒀다가 한 번에 반영하기 위한 버퍼 (write-behind)
+
+    조회 1번마다 UPDATE 를 날리는 대신 아이템별 증가량만 더해두고,
+    batch_size 만큼 쌓이거나 interval 초가 지나면 drain 해서 한 번의 UPDATE 로 반영함
+    조회한 사람(viewer)을 같이 넘기면 아이템별 HyperLogLog 스케치에 모아서 고유 조회자 수도 함께 반영함
+    이벤트 루프 안에서만 쓰기 때문에 lock 없이 사용함
+
+    Methods:
+        add(self, key, viewer): 조회수 1 증가, batch_size 에 도달하면 flush 를 깨움 \n
+        pending(self, key): 아직 반영되지 않은 증가량 \n
+        drain(self): 쌓인 증가량과 스케치를 꺼내고 비움 \n
+        restore(self, counts, viewers): 반영에 실패한 증가량과 스케치를 되돌려 놓음 \n
+        bind(self): 현재 이벤트 루프에서 쓸 Event 를 만듦 \n
+        wait(self): batch_size 에 도달하거나 interval 초가 지날 때까지 기다림 \n
+    """
+    def __init__(self, batch_size: int = 500, interval: float = 5.0) -> None:
+        self.batch_size = batch_size
+        self.interval = interval
+        self.counts: Dict[int, int] = {}
+        self.viewers: Dict[int, HyperLogLog] = {}
+        self.events = 0
+        self._full: Optional[asyncio.Event] = None
+
+    @property
+    def full(self) -> asyncio.Event:
+        if self._full is None:
+            self._full = asyncio.Event()
+
+        return self._full
+
+    def bind(self) -> None:
+        """ flush 작업을 돌리는 이벤트 루프에서 Event 를 새로 만듦 (서버를 다시 시작하면 루프가 바뀜) """
+        self._full = asyncio.Event()
+        if self.events >= self.batch_size:
+            self._full.set()
+
+    def add(self, key: int, viewer: Optional[str] = None) -> None:
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if viewer is not None:
+            self.viewers.setdefault(key, HyperLogLog()).add(viewer)
+            
+        self.events += 1
+        if self.events >= self.batch_size:
+            self.full.set()
+
+    def pending(self, key: int) -> int:
+        return self.counts.get(key, 0)
+
+    def drain(self) -> Tuple[Dict[int, int], Dict[int, HyperLogLog]]:
+        counts, viewers = self.counts, self.viewers
+        self.counts, self.viewers, self.events = {}, {}, 0
+        self.full.clear()
+        return counts, viewers
+
+    def restore(self, counts: Dict[int, int], viewers: Dict[int, HyperLogLog]) -> None:
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+            self.events += value
+            
+        for key, sketch in viewers.items():
+            self.viewers[key] = self.viewers[key].merge(sketch) if key in self.viewers else sketch
+
+    async def wait(self) -> None:
+        try:
+            await asyncio.wait_for(self.full.wait(), timeout = self.interval)
+
+        except asyncio.TimeoutError:
+            pass
@@ -1,10 +1,16 @@
 from fastapi.middleware.cors import CORSMiddleware
+from database.search import autocomplete_index, hangul_index, similar_index
 from fastapi.openapi.utils import get_openapi
+from contextlib import asynccontextmanager, suppress
 from fastapi.responses import JSONResponse
+from database.models.category import Category
+from routers.middleware import RequestSizeLimitMiddleware, RequestTooLarge
+from routers.env import MAX_REQUEST_SIZE, shutdown_image_pool, async_engine, run_view_flusher, flush_view_counts, rebuild_trending, run_trending_refresher, run_image_gc, install_trending_signal, remove_trending_signal
 from database.models import *
 from fastapi import FastAPI
 from routers import *
 import uvicorn
+import asyncio
 
 def custom_openapi():
     if not app.openapi_schema:
@@ -38,7 +44,33 @@ def custom_openapi():
 
     return app.openapi_schema
 
-app = FastAPI(swagger_ui_parameters={"syntaxHighlight.theme": "nord"})
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with async_engine.session_maker() as db_session:
+        await db_session.run_sync(Category.load)
+        await db_session.run_sync(autocomplete_index.load)
+        await db_session.run_sync(hangul_index.load)
+        await db_session.run_sync(similar_index.load)
+        
+    await rebuild_trending()
+    view_flusher = asyncio.create_task(run_view_flusher())
+    trending_refresher = asyncio.create_task(run_trending_refresher())
+    image_collector = asyncio.create_task(run_image_gc())
+    install_trending_signal()
+    yield
+    
+    remove_trending_signal()
+    # 종료할 때 남은 조회수를 버리지 않고 반영
+    trending_refresher.cancel()
+    image_collector.cancel()
+    view_flusher.cancel()
+    with suppress(asyncio.CancelledError):
+        await view_flusher
+        
+    await flush_view_counts()
+    shutdown_image_pool()
+
+app = FastAPI(swagger_ui_parameters={"syntaxHighlight.theme": "nord"}, lifespan = lifespan)
 app.openapi = custom_openapi
 app.add_middleware(
     CORSMiddleware,
@@ -47,6 +79,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestSizeLimitMiddleware, max_size = MAX_REQUEST_SIZE)
+
+@app.exception_handler(RequestTooLarge)
+async def request_too_large_handler(request, exc: RequestTooLarge):
+    return JSONResponse({"message": exc.detail}, status_code = exc.status_code, headers = {"Connection": "close"})
+
 app.include_router(user_router)
 app.include_router(address_router)
 app.include_router(item_router)
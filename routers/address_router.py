@@ -1,9 +1,10 @@
 from database.models.address import Address, AddressBody
 from database.models.results import MACResult
 from fastapi.responses import JSONResponse
+from routers.env import get_db_session
+from sqlalchemy.ext.asyncio import AsyncSession
 from database.models.user import User
-from routers.env import db_session
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from typing import Optional
 
 address_router = APIRouter(
@@ -46,15 +47,15 @@ address_router = APIRouter(
     },
     name = "주소 조회하기"
 )
-async def get_address_with_user_id(user_id: str, default: bool = False):
-    user = User._load_user_info(db_session, user_id = user_id)
+async def get_address_with_user_id(user_id: str, default: bool = False, db_session: AsyncSession = Depends(get_db_session)):
+    user = await User._load_user_info_async(db_session, user_id = user_id)
     if user:
         if default:
-            result = Address.get_default_address(db_session, user.seq)  # type: ignore
+            result = await db_session.run_sync(Address.get_default_address, user.seq)  # type: ignore
             return JSONResponse(result, status_code = MACResult.SUCCESS.value)
         
         else:
-            result = Address.get_address(db_session, user.seq) #type: ignore
+            result = await db_session.run_sync(Address.get_address, user.seq) #type: ignore
             return JSONResponse(result, status_code = MACResult.SUCCESS.value)
         
     return JSONResponse({"message": "주소 조회에 실패하였습니다."}, status_code = MACResult.FAIL.value)
@@ -78,16 +79,16 @@ async def get_address_with_user_id(user_id: str, default: bool = False):
     },
     name = "주소 등록하기"
 )
-async def insert_address(user_id: str, data: AddressBody):
+async def insert_address(user_id: str, data: AddressBody, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "주소가 성공적으로 등록되었습니다.",
         MACResult.CONFLICT: "주소가 이미 등록되었습니다.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부에러가 발생하였습니다."
     }
     
-    user = User._load_user_info(db_session, user_id = user_id) #type: ignore
+    user = await User._load_user_info_async(db_session, user_id = user_id) #type: ignore
     if user:
-        result = Address.insert_address(db_session, user.seq, data.road_full_addr, data.eng_addr, data.zip_no, data.adm_cd, data.rn_mgt_sn, data.bg_mgt_sn, data.si_nm, data.sgg_nm, data.emd_nm, data.rn, data.addr_detail) #type: ignore
+        result = await db_session.run_sync(Address.insert_address, user.seq, data.road_full_addr, data.eng_addr, data.zip_no, data.adm_cd, data.rn_mgt_sn, data.bg_mgt_sn, data.si_nm, data.sgg_nm, data.emd_nm, data.rn, data.addr_detail) #type: ignore
         return JSONResponse({"message": response_dict[result]}, status_code = result.value)
         
     return JSONResponse({"message": "실패하였습니다"}, status_code = MACResult.FAIL.value)
@@ -110,16 +111,16 @@ async def insert_address(user_id: str, data: AddressBody):
         }
     }
 )
-async def delete_address(user_id: str, road_full_addr: str):
+async def delete_address(user_id: str, road_full_addr: str, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "주소가 성공적으로 삭제되었습니다.",
         MACResult.FAIL: "주소 제거에 실패하였습니다.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부에러가 발생하였습니다."
     }
     
-    user = User._load_user_info(db_session, user_id = user_id) # type: ignore
+    user = await User._load_user_info_async(db_session, user_id = user_id) # type: ignore
     if user:
-        result = Address.delete_address(db_session, user.seq, road_full_addr) # type: ignore
+        result = await db_session.run_sync(Address.delete_address, user.seq, road_full_addr) # type: ignore
         return JSONResponse({"message": response_dict[result]}, status_code = result.value)
         
     return JSONResponse({"message": response_dict[MACResult.FAIL]}, status_code = MACResult.FAIL.value)
@@ -142,16 +143,16 @@ async def delete_address(user_id: str, road_full_addr: str):
         },
     }                     
 )
-async def set_default_address(user_id: str, road_full_addr: str):
+async def set_default_address(user_id: str, road_full_addr: str, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "기본 배송지가 변경되었습니다.",
         MACResult.FAIL: "기본 배송지 변경에 실패하였습니다.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부에러가 발생하였습니다."
     }
     
-    user = User._load_user_info(db_session, user_id = user_id)
+    user = await User._load_user_info_async(db_session, user_id = user_id)
     if user:
-        result = Address.set_default_address(db_session, user.seq, road_full_addr) # type: ignore
+        result = await db_session.run_sync(Address.set_default_address, user.seq, road_full_addr) # type: ignore
         return JSONResponse({"message": response_dict[result]}, status_code = result.value)
     
     return JSONResponse({"message": response_dict[MACResult.FAIL]}, status_code = MACResult.FAIL.value)
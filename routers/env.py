@@ -1,8 +1,221 @@
+from database.conn import EngineConn, AsyncEngineConn, user_info
+from database.utility.view_counter import ViewCounter
+from database.utility.hyperloglog import HyperLogLog
+from database.utility.response_cache import response_cache
+from database.search import trending_index
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import OperationalError
 from database.models import create_table
-from database.conn import EngineConn
+from database.models.item_viewers import ItemViewers
+from database.models.item import Item
+from database.jobs import image_gc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from typing import AsyncIterator, Dict, Optional, Set
+import traceback
+import logging
+import asyncio
+import signal
 
 engine = EngineConn()
 create_table(engine)
-db_session = engine.session_maker()
+
+async_engine = AsyncEngineConn()
+
+# 이미지 업로드 제한, user_info.txt 에 max_upload_size = 20971520 처럼 바이트 단위로 적어서 덮어쓸 수 있음
+MAX_UPLOAD_SIZE = int(user_info.get("max_upload_size", 10 * 1024 * 1024)) # 파일 1개 최대 크기
+MAX_REQUEST_SIZE = int(user_info.get("max_request_size", 50 * 1024 * 1024)) # 요청 본문 전체 최대 크기, 넘으면 읽기 전에 413
+upload_semaphore = asyncio.Semaphore(int(user_info.get("max_concurrent_uploads", 8))) # 동시에 디스크에 쓰는 업로드 개수
+
+# GET /item/batch 로 한 번에 조회할 수 있는 아이템 개수, user_info.txt 에 max_batch_items = 200 처럼 적어서 덮어쓸 수 있음
+MAX_BATCH_ITEMS = int(user_info.get("max_batch_items", 100))
+
+# 썸네일 등 파생 이미지 생성은 CPU 작업이라 별도 프로세스에서 처리, user_info.txt 에 image_workers, image_webp 로 덮어쓸 수 있음
+IMAGE_WORKERS = int(user_info.get("image_workers", 2))
+IMAGE_WEBP = user_info.get("image_webp", "true").lower() == "true"
+image_pool: Optional[ProcessPoolExecutor] = None
+
+def get_image_pool() -> ProcessPoolExecutor:
+    global image_pool
+    if image_pool is None:
+        image_pool = ProcessPoolExecutor(max_workers = IMAGE_WORKERS)
+        
+    return image_pool
+
+def shutdown_image_pool() -> None:
+    global image_pool
+    if image_pool is not None:
+        image_pool.shutdown(wait = True)
+        image_pool = None
+
+# 이미지 파일 전송을 앞단 프록시에 맡기는 모드, user_info.txt 에 image_offload = x-accel 처럼 적어서 켬
+# none: 파이썬이 직접 보냄, x-accel: nginx X-Accel-Redirect, x-sendfile: Apache/lighttpd X-Sendfile
+IMAGE_OFFLOAD = user_info.get("image_offload", "none").lower()
+IMAGE_OFFLOAD_PREFIX = user_info.get("image_offload_prefix", "/protected/images/") # nginx internal location 경로
+
+# 참조 없는 이미지 파일 정리 주기(초)와 유예 시간, user_info.txt 에 image_gc_interval = 3600 처럼 적으면 켜짐 (0 이면 꺼짐)
+IMAGE_GC_INTERVAL = float(user_info.get("image_gc_interval", 0))
+IMAGE_GC_GRACE_HOURS = float(user_info.get("image_gc_grace_hours", 24))
+
+# 인기 순위를 바로 다시 만드는 시그널, user_info.txt 에 trending_signal = SIGUSR2 처럼 적어서 바꾸거나 none 으로 끔
+TRENDING_SIGNAL: Optional[signal.Signals] = getattr(signal, user_info.get("trending_signal", "SIGUSR1").upper(), None)
+trending_rebuilds: Set[asyncio.Task] = set() # 실행 중인 수동 rebuild, 끝나기 전에 가비지 컬렉션되지 않도록 들고 있음
+
+# 조회수 버퍼, user_info.txt 에 view_flush_size = 1000, view_flush_interval = 10 처럼 적어서 덮어쓸 수 있음
+view_counter = ViewCounter(batch_size = int(user_info.get("view_flush_size", 500)), interval = float(user_info.get("view_flush_interval", 5)))
+
+async def get_db_session() -> AsyncIterator[AsyncSession]:
+    """ 요청마다 커넥션 풀에서 AsyncSession 을 하나씩 꺼내주는 FastAPI 의존성
+
+    동기 모델 메소드는 `await db_session.run_sync(Model.method, ...)` 로 호출하면
+    비동기 드라이버 위에서 실행되어 이벤트 루프를 막지 않는다.
+    모델 메소드는 flush 까지만 하고, 요청이 끝날 때 여기서 한 번에 commit 한다.
+    핸들러에서 예외가 나거나, flush 가 실패해서 세션이 비활성 상태이거나,
+    모델 메소드가 에러 결과를 돌려주면서 rollback_only 로 표시했으면 요청 동안의 변경사항은 모두 rollback 된다.
+    """
+    async with async_engine.session_maker() as db_session:
+        try:
+            yield db_session
+            if db_session.info.pop("rollback_only", False) or not db_session.is_active:
+                await db_session.rollback()
+                
+            else:
+                await db_session.commit()
+            
+        except:
+            await db_session.rollback()
+            raise
+
+async def apply_view_counts(counts: Dict[int, int], viewers: Dict[int, HyperLogLog]) -> None:
+    async with async_engine.session_maker() as db_session:
+        await db_session.run_sync(Item.apply_view_counts, counts)
+        await db_session.run_sync(ItemViewers.merge_sketches, viewers)
+        await db_session.commit()
+
+async def flush_view_counts() -> None:
+    """ view_counter 에 쌓인 조회수와 고유 조회자 스케치를 데이터베이스에 반영
+
+    연결이 끊기거나 잠금을 못 얻는 등 일시적인 에러 (OperationalError) 면 다음 flush 때 다시 시도하도록 전부 되돌려 놓고,
+    그 밖의 에러면 아이템 하나 때문에 전체가 계속 실패하지 않도록 아이템별로 나눠서 다시 반영하고 그래도 실패하는 아이템은 버림
+    """
+    counts, viewers = view_counter.drain()
+    if len(counts) == 0:
+        return
+    
+    try:
+        await apply_view_counts(counts, viewers)
+        return
+            
+    except asyncio.CancelledError:
+        view_counter.restore(counts, viewers)
+        raise
+    
+    except OperationalError as e:
+        view_counter.restore(counts, viewers)
+        logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+        return
+            
+    except Exception as e:
+        logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+        
+    seqs = list(counts)
+    for i, seq in enumerate(seqs):
+        try:
+            await apply_view_counts({seq: counts[seq]}, {seq: viewers[seq]} if seq in viewers else {})
+            
+        except (asyncio.CancelledError, OperationalError) as e:
+            rest = seqs[i:]
+            view_counter.restore({key: counts[key] for key in rest}, {key: viewers[key] for key in rest if key in viewers})
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+            return
+            
+        except Exception as e:
+            logging.error(f"view counts for item {seq} dropped ({counts[seq]} views), {e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+
+async def run_view_flusher() -> None:
+    """ 서버가 켜져 있는 동안 batch_size 또는 interval 마다 조회수를 반영하는 백그라운드 작업 """
+    view_counter.bind()
+    while True:
+        await view_counter.wait()
+        await flush_view_counts()
+
+async def rebuild_trending() -> None:
+    """ 인기 순위를 다시 계산, 정렬은 CPU 작업이라 이벤트 루프를 막지 않도록 스레드에서 실행 """
+    async with async_engine.session_maker() as db_session:
+        rows = await db_session.run_sync(trending_index.fetch)
+        
+    await asyncio.to_thread(trending_index.build, rows)
+    response_cache.invalidate("trending")
+
+async def try_rebuild_trending() -> None:
+    try:
+        await rebuild_trending()
+        
+    except Exception as e:
+        logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
+
+async def run_trending_refresher() -> None:
+    """ 서버가 켜져 있는 동안 trending_index.interval 초마다 인기 순위를 다시 만드는 백그라운드 작업 """
+    while True:
+        await asyncio.sleep(trending_index.interval)
+        await try_rebuild_trending()
+
+def request_trending_rebuild() -> asyncio.Task:
+    """ 주기를 기다리지 않고 인기 순위를 바로 다시 만드는 수동 트리거, 이벤트 루프 안에서 불러야 함
+
+    인기 순위는 워커 프로세스마다 메모리에 있으므로 HTTP 엔드포인트 대신 시그널로 부름 (kill -USR1 <워커 pid>, install_trending_signal 참고)
+    """
+    task = asyncio.get_running_loop().create_task(try_rebuild_trending())
+    trending_rebuilds.add(task)
+    task.add_done_callback(trending_rebuilds.discard)
+    return task
+
+def install_trending_signal() -> bool:
+    """ TRENDING_SIGNAL 을 받으면 request_trending_rebuild 를 부르도록 현재 이벤트 루프에 연결
+
+    Returns:
+        True: 연결 성공 \n
+        False: 시그널을 쓸 수 없는 환경 (Windows, 메인 스레드가 아닌 루프 등) \n
+    """
+    if TRENDING_SIGNAL is None:
+        return False
+    
+    try:
+        asyncio.get_running_loop().add_signal_handler(TRENDING_SIGNAL, request_trending_rebuild)
+        return True
+        
+    except (NotImplementedError, RuntimeError, ValueError) as e:
+        logging.warning(f"trending rebuild signal not installed: {e}")
+        return False
+
+def remove_trending_signal() -> None:
+    if TRENDING_SIGNAL is not None:
+        with suppress(NotImplementedError, RuntimeError, ValueError):
+            asyncio.get_running_loop().remove_signal_handler(TRENDING_SIGNAL)
+
+def collect_images() -> None:
+    db_session = engine.session_maker()
+    try:
+        report = image_gc.collect(db_session, grace_hours = IMAGE_GC_GRACE_HOURS)
+        logging.info(f"image gc: {report}")
+        
+    finally:
+        db_session.close()
+
+async def run_image_gc() -> None:
+    """ IMAGE_GC_INTERVAL 초마다 참조 없는 이미지 파일을 지우는 백그라운드 작업, 파일 삭제와 동기 세션을 쓰므로 스레드에서 실행 """
+    if IMAGE_GC_INTERVAL <= 0:
+        return
+    
+    while True:
+        await asyncio.sleep(IMAGE_GC_INTERVAL)
+        try:
+            await asyncio.to_thread(collect_images)
+            
+        except Exception as e:
+            logging.error(f"{e}: {''.join(traceback.format_exception(None, e, e.__traceback__))}")
 
 session = {}
\ No newline at end of file
@@ -0,0 +1,179 @@
+from database.utility.image_util import ImageUtility
+from starlette.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, FileResponse
+from database.models.results import MACResult
+from email.utils import formatdate, parsedate_to_datetime
+from database.storage import image_storage
+from routers.env import IMAGE_OFFLOAD, IMAGE_OFFLOAD_PREFIX
+from fastapi import Request, Response
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+import os
+
+# 내용 해시로 저장한 파일은 같은 경로의 내용이 절대 바뀌지 않으므로 1년 동안 재검증 없이 캐시
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# uuid 이름의 예전 파일은 캐시는 하되 매번 ETag 로 재검증 (바뀌지 않았으면 304)
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+# 확장자 대신 파일 앞부분으로 실제 형식을 판단 (예전 업로드는 .jpg 이름으로 png 등이 저장되어 있음)
+SIGNATURES: List[Tuple[bytes, int, str]] = [
+    (b"\xff\xd8\xff", 0, "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", 0, "image/png"),
+    (b"GIF87a", 0, "image/gif"),
+    (b"GIF89a", 0, "image/gif"),
+    (b"WEBP", 8, "image/webp"),
+]
+
+def sniff_media_type(head: bytes) -> str:
+    for signature, offset, media_type in SIGNATURES:
+        if head[offset: offset + len(signature)] == signature:
+            return media_type
+
+    return "application/octet-stream"
+
+def _etag(file_path: str, stat_result: os.stat_result, immutable: bool) -> str:
+    if immutable:
+        return f'"{os.path.basename(file_path)}"'
+
+    return f'"{int(stat_result.st_mtime):x}-{stat_result.st_size:x}"'
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if header is None:
+        return False
+
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+def _not_modified_since(header: Optional[str], stat_result: os.stat_result) -> bool:
+    if header is None:
+        return False
+
+    try:
+        return int(stat_result.st_mtime) <= parsedate_to_datetime(header).timestamp()
+
+    except (TypeError, ValueError):
+        return False
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """ bytes=start-end 하나짜리 범위만 처리
+
+    Returns:
+        (int, int): 보낼 시작, 끝 바이트 (끝 포함) \n
+        None: bytes 단위가 아니거나 범위가 여러 개라 전체 파일을 보냄 \n
+
+    Raises:
+        ValueError: 형식이 틀렸거나 파일 크기를 벗어난 범위 \n
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    start, _, end = ranges.strip().partition("-")
+    if start == "":
+        length = int(end)
+        if length <= 0:
+            raise ValueError(header)
+
+        return max(size - length, 0), size - 1
+
+    first, last = int(start), int(end) if end else size - 1
+    if first >= size or last < first:
+        raise ValueError(header)
+
+    return first, min(last, size - 1)
+
+def offload_headers(file_path: str) -> Dict[str, str]:
+    """ 앞단 프록시가 파일을 직접 보내도록 하는 헤더, IMAGE_OFFLOAD 가 none 이면 빈 딕셔너리
+
+    nginx (x-accel) 설정 예시, images 폴더를 IMAGE_OFFLOAD_PREFIX 에 internal 로 연결함 \n
+        location /protected/images/ { internal; alias /srv/mac/images/; add_header Vary Accept; } \n
+    nginx 가 sendfile 로 보내면서 Range, ETag, Last-Modified, 304 를 직접 처리하고 Cache-Control 은 이 응답의 값을 그대로 씀
+    """
+    if IMAGE_OFFLOAD == "x-accel":
+        relative_path = os.path.relpath(os.path.realpath(file_path), os.path.realpath("images"))
+        return {"X-Accel-Redirect": f"{IMAGE_OFFLOAD_PREFIX.rstrip('/')}/{quote(relative_path.replace(os.sep, '/'))}"}
+
+    if IMAGE_OFFLOAD == "x-sendfile":
+        return {"X-Sendfile": os.path.realpath(file_path)}
+
+    return {}
+
+def _inspect(file_path: str) -> Tuple[os.stat_result, bytes]:
+    with open(file_path, "rb") as fp:
+        return os.fstat(fp.fileno()), fp.read(16)
+
+def _read_range(file_path: str, start: int, end: int) -> bytes:
+    with open(file_path, "rb") as fp:
+        fp.seek(start)
+        return fp.read(end - start + 1)
+
+async def image_response(request: Request, path: str, size: Optional[str] = None) -> Response:
+    """ 이미지 파일을 HTTP 캐시 검증 (ETag, Last-Modified, 304) 과 Range 요청을 지원해서 보내줌
+
+    image_storage 에 내용 해시로 저장된 파일은 If-None-Match 가 맞으면 디스크를 보지 않고 바로 304 를 돌려줌 \n
+    Content-Type 은 확장자가 아니라 파일 앞부분 바이트로 판단함 \n
+    IMAGE_OFFLOAD 를 켜면 경로 확인까지만 하고 본문 없이 X-Accel-Redirect / X-Sendfile 헤더로 전송을 프록시에 넘김
+
+    Parameters:
+        request (Request): 조건부 요청 헤더 (If-None-Match, If-Modified-Since, Range, If-Range, Accept) 를 읽을 요청 \n
+        path (str): 원본 또는 파생 이미지 경로 \n
+        size (str | None): thumb, card, full 중 하나, None 이면 path 에 붙은 크기 \n
+
+    Returns:
+        200: 전체 파일 \n
+        206: Range 로 요청한 부분 \n
+        304: 클라이언트가 가진 파일과 같음 \n
+        404: 이미지가 존재하지 않음 \n
+        416: 파일 크기를 벗어난 Range \n
+    """
+    accept = request.headers.get("accept")
+    accept_webp = accept is not None and "image/webp" in accept
+    immutable = image_storage.digest_of(path) is not None
+    headers: Dict[str, str] = {
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+        "Vary": "Accept",
+        "X-Content-Type-Options": "nosniff",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if immutable and if_none_match is not None:
+        # 해시 경로는 내용이 바뀌지 않으므로 후보 파일 이름만으로 ETag 를 비교할 수 있음
+        for candidate in ImageUtility.candidates(path, size, accept_webp):
+            etag = f'"{os.path.basename(candidate)}"'
+            if _etag_matches(if_none_match, etag):
+                return Response(status_code = 304, headers = {**headers, "ETag": etag})
+
+    file_path = await run_in_threadpool(ImageUtility.resolve, path, size, accept_webp)
+    if file_path is None:
+        return JSONResponse({"message": "이미지가 존재하지 않습니다."}, status_code = MACResult.NOT_FOUND.value)
+
+    offload = offload_headers(file_path)
+    if offload:
+        return Response(headers = {**headers, **offload})
+
+    stat_result, head = await run_in_threadpool(_inspect, file_path)
+    etag = _etag(file_path, stat_result, immutable)
+    headers["ETag"] = etag
+    headers["Last-Modified"] = formatdate(stat_result.st_mtime, usegmt = True)
+
+    if _etag_matches(if_none_match, etag) or (if_none_match is None and _not_modified_since(request.headers.get("if-modified-since"), stat_result)):
+        return Response(status_code = 304, headers = headers)
+
+    media_type = sniff_media_type(head)
+    headers["Accept-Ranges"] = "bytes"
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header is not None and (if_range is None or if_range == etag or if_range == headers["Last-Modified"]):
+        try:
+            byte_range = _parse_range(range_header, stat_result.st_size)
+
+        except ValueError:
+            return Response(status_code = 416, headers = {**headers, "Content-Range": f"bytes */{stat_result.st_size}"})
+
+        if byte_range is not None:
+            start, end = byte_range
+            content = await run_in_threadpool(_read_range, file_path, start, end)
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+            return Response(content, status_code = 206, media_type = media_type, headers = headers)
+
+    return FileResponse(file_path, media_type = media_type, headers = headers, stat_result = stat_result)
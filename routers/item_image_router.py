@@ -1,9 +1,16 @@
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import APIRouter, UploadFile, File, Form, Depends, Query, Request
+from fastapi.responses import JSONResponse
 from database.models.item_images import ItemImages
-from fastapi import APIRouter, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
 from database.models.results import MACResult
-from routers.env import db_session
-from typing import Optional
+from routers.upload import save_image_upload
+from database.utility.image_util import VARIANTS
+from routers.image_response import image_response
+from routers.env import get_db_session
+from typing import List, Optional
+import traceback
+import logging
+import asyncio
 
 item_image_router = APIRouter(
     prefix = "/item/images",
@@ -16,11 +23,19 @@ item_image_router = APIRouter(
             "description": f"<img src='https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcRWnq7jeLUzceGdpxcXuVvh0_f0hiRz4ZiJmVPncOI&s' /> ",
             "content": None
         },
+        404: {
+            "content": {
+                "application/json": {
+                    "example": {"message": "이미지가 존재하지 않습니다."}
+                }
+            }
+        }
     },
-    name = "상품 이미지 불러오기"
+    name = "상품 이미지 불러오기",
+    description = "size 로 thumb(160px), card(480px), full(1600px) 중 하나를 고름 (없으면 path 의 크기, 예: 추천 목록의 image_path 는 card) \n\n Accept 헤더에 image/webp 가 있으면 WebP 로 보내줌 \n\n ETag / If-None-Match (304), Range (206) 를 지원하고 내용 해시 경로는 immutable 로 캐시함"
 )
-async def get_image(path: str):
-    return FileResponse(path, media_type="image/png")
+async def get_image(request: Request, path: str, size: Optional[str] = Query(None, enum = list(VARIANTS))):
+    return await image_response(request, path, size)
 
 @item_image_router.get("/{item_seq}",
     responses={
@@ -37,8 +52,8 @@ async def get_image(path: str):
     },
     name="상품 모든 이미지 경로 조회",
 )
-async def get_all_item_image_path(item_seq: int):
-    paths = ItemImages.get_all_image_path(db_session, item_seq)
+async def get_all_item_image_path(item_seq: int, db_session: AsyncSession = Depends(get_db_session)):
+    paths = await db_session.run_sync(ItemImages.get_all_image_path, item_seq)
     return JSONResponse(paths, status_code = MACResult.SUCCESS.value)
 
 @item_image_router.get("/{item_seq}/{index}",
@@ -55,8 +70,8 @@ async def get_all_item_image_path(item_seq: int):
     },
     name="상품 이미지 경로 조회",
 )
-async def get_item_image_path(item_seq: int, index: int = 0):
-    path = ItemImages.get_image_path(db_session, item_seq, index)
+async def get_item_image_path(item_seq: int, index: int = 0, db_session: AsyncSession = Depends(get_db_session)):
+    path = await db_session.run_sync(ItemImages.get_image_path, item_seq, index)
     return JSONResponse({"path": path}, status_code = MACResult.SUCCESS.value)
 
 @item_image_router.put("/{item_seq}/{index}",
@@ -74,20 +89,97 @@ async def get_item_image_path(item_seq: int, index: int = 0):
                     "example": {"message": "해당 인덱스에 이미지가 존재합니다."}
                 }
             }
+        },
+        413: {
+            "content": {
+                "application/json": {
+                    "example": {"message": "이미지 크기가 너무 큽니다."}
+                }
+            }
+        },
+        422: {
+            "content": {
+                "application/json": {
+                    "example": {"message": "이미지 파일이 아닙니다."}
+                }
+            }
         }
     },
-    name = "이미지 업로드"
+    name = "이미지 업로드",
+    description = "업로드 한 이미지로 thumb, card, full 크기 이미지를 만들고 EXIF 는 지워서 저장"
 )
-async def insert_item_image(item_seq: int, image: UploadFile = File(None), index: int = 0):
+async def insert_item_image(item_seq: int, image: UploadFile = File(None), index: int = 0, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "이미지를 성공적으로 업로드 하였습니다.",
         MACResult.CONFLICT: "해당 인덱스에 이미지가 존재합니다.",
+        MACResult.PAYLOAD_TOO_LARGE: "이미지 크기가 너무 큽니다.",
+        MACResult.ENTITY_ERROR: "이미지 파일이 아닙니다.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
-    result = ItemImages.insert_image(db_session, item_seq, index, await image.read())
+    result, path = await save_image_upload(image)
+    if result == MACResult.SUCCESS:
+        result = await db_session.run_sync(ItemImages.insert_image, item_seq, index, path)
     
     return JSONResponse({"message": response_dict[result]}, status_code = result.value)
 
+@item_image_router.put("/{item_seq}",
+    responses={
+        200: {
+            "content": {
+                "application/json": {
+                    "example": [
+                        {"index": 0, "path": "images/8c/1a/8c1a....jpg", "message": "이미지를 성공적으로 업로드 하였습니다.", "status": 200},
+                        {"index": 1, "path": None, "message": "이미지 파일이 아닙니다.", "status": 422}
+                    ]
+                }
+            }
+        },
+        422: {
+            "content": {
+                "application/json": {
+                    "example": {"message": "이미지와 인덱스 개수가 다릅니다."}
+                }
+            }
+        }
+    },
+    name = "이미지 여러 장 업로드",
+    description = "images 를 동시에 저장하고 한 번에 등록함, indexes 를 빼면 0 부터 순서대로 \n\n 일부가 실패해도 나머지는 등록되고 결과는 이미지 순서대로 index 별 status 로 알려줌"
+)
+async def insert_item_images(item_seq: int, images: List[UploadFile] = File(...), indexes: Optional[List[int]] = Form(None), db_session: AsyncSession = Depends(get_db_session)):
+    response_dict = {
+        MACResult.SUCCESS: "이미지를 성공적으로 업로드 하였습니다.",
+        MACResult.CONFLICT: "해당 인덱스에 이미지가 존재합니다.",
+        MACResult.NOT_FOUND: "상품이 존재하지 않습니다.",
+        MACResult.PAYLOAD_TOO_LARGE: "이미지 크기가 너무 큽니다.",
+        MACResult.ENTITY_ERROR: "이미지 파일이 아닙니다.",
+        MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
+    }
+    indexes = indexes if indexes is not None else list(range(len(images)))
+    if len(indexes) != len(images):
+        return JSONResponse({"message": "이미지와 인덱스 개수가 다릅니다."}, status_code = MACResult.ENTITY_ERROR.value)
+    
+    # 동시 디스크 쓰기 개수는 upload_semaphore 가, 이미지 처리는 프로세스 풀 크기가 제한함
+    saved = []
+    for outcome in await asyncio.gather(*[save_image_upload(image) for image in images], return_exceptions = True):
+        if isinstance(outcome, BaseException):
+            # 한 장이 실패해도 나머지 이미지의 결과는 그대로 돌려줌
+            logging.error(f"{outcome}: {''.join(traceback.format_exception(None, outcome, outcome.__traceback__))}")
+            outcome = (MACResult.INTERNAL_SERVER_ERROR, None)
+            
+        saved.append(outcome)
+        
+    results = [result for result, _ in saved]
+    stored = [(position, index, path) for position, (index, (result, path)) in enumerate(zip(indexes, saved)) if result == MACResult.SUCCESS]
+    if stored:
+        inserted = await db_session.run_sync(ItemImages.insert_images, item_seq, [(index, path) for _, index, path in stored])
+        for (position, _, _), result in zip(stored, inserted):
+            results[position] = result
+            
+    return JSONResponse([
+        {"index": index, "path": path if result == MACResult.SUCCESS else None, "message": response_dict[result], "status": result.value}
+        for index, (_, path), result in zip(indexes, saved, results)
+    ], status_code = MACResult.SUCCESS.value)
+
 @item_image_router.delete("/{item_seq}/{index}",
     responses={
         200: {
@@ -96,26 +188,26 @@ async def insert_item_image(item_seq: int, image: UploadFile = File(None), index
                     "example": {"message": "이미지를 성공적으로 제거하였습니다."}
                 }
             }
+        },
+        404: {
+            "content": {
+                "application/json": {
+                    "example": {"message": "이미지가 존재하지 않습니다."}
+                }
+            }
         }
     },
     name="이미지 제거"
 )
-async def delete_item_image(item_seq: int, index:Optional[int] = None):
-    objs = db_session.query(ItemImages).filter_by(item_seq = item_seq).all()
-    result = None
-    for obj in objs:
-        if index and index == obj.index:
-           result = obj.delete_image(db_session, item_seq, obj.path) # type: ignore
-        
-        else:
-            result = obj.delete_image(db_session, item_seq, obj.path) # type: ignore
-            if result == MACResult.INTERNAL_SERVER_ERROR:
-                break
-    
-    if result is not None and result == MACResult.SUCCESS:
-        db_session.commit()
-        return JSONResponse({"message": "이미지를 성공적으로 제거하였습니다."})
-           
-    else:
-        return JSONResponse({"message": "서버 내부 에러가 발생하였습니다."})
-    
\ No newline at end of file
+@item_image_router.delete("/{item_seq}",
+    name="물품 모든 이미지 제거",
+    description = "파일은 다른 물품이나 프로필에서 같은 이미지를 쓰지 않으면 가비지 컬렉터가 지움"
+)
+async def delete_item_image(item_seq: int, index: Optional[int] = None, db_session: AsyncSession = Depends(get_db_session)):
+    response_dict = {
+        MACResult.SUCCESS: "이미지를 성공적으로 제거하였습니다.",
+        MACResult.NOT_FOUND: "이미지가 존재하지 않습니다.",
+        MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
+    }
+    result = await db_session.run_sync(ItemImages.delete_image, item_seq, index)
+    return JSONResponse({"message": response_dict[result]}, status_code = result.value)
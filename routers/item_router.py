@@ -1,16 +1,37 @@
-from database.models.item import Item, Category
+from routers.env import MAX_BATCH_ITEMS, get_db_session, engine, view_counter
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Query, Depends, Request
+from database.models.item import Item, Category, INFO_FIELDS, RECOMMEND_FIELDS
+from database.utility.field_util import FieldUtility
+from database.utility.response_cache import response_cache
 from database.models.results import MACResult
 from fastapi.responses import JSONResponse
 from database.models.user import User
-from fastapi import APIRouter, Query
-from routers.env import db_session
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 item_router = APIRouter(
     prefix = "/item",
     tags = ["item"]
 )
 
+INFO_FIELDS_DESCRIPTION = f"쉼표로 구분한 응답 필드, 빼면 전부 (seq 는 항상 포함, 빠진 필드의 쿼리는 하지 않음): {','.join(INFO_FIELDS)}"
+RECOMMEND_FIELDS_DESCRIPTION = f"쉼표로 구분한 응답 필드, 빼면 전부 (seq 는 항상 포함, image_path 를 빼면 이미지 쿼리를 하지 않음): {','.join(RECOMMEND_FIELDS)}"
+
+def _load_category_names() -> Optional[List[str]]:
+    """ category 파라미터의 enum, import 할 때 한 번만 세션을 열어서 읽고 바로 닫음 """
+    db_session = engine.session_maker()
+    try:
+        return Category.get_all_category_name(db_session)
+    
+    finally:
+        db_session.close()
+
+CATEGORY_NAMES = _load_category_names()
+
+def _list_tags(items: List[Dict[str, Any]]) -> List[str]:
+    """ 목록 응답 캐시 태그, 새 아이템이 등록되면 items 로, 들어있는 아이템이 바뀌면 item:고유 번호 로 지워짐 """
+    return ["items", *[f"item:{item['seq']}" for item in items]]
+
 @item_router.get("",
     responses={
         200: {
@@ -24,6 +45,8 @@ item_router = APIRouter(
                         "price": "10,000",
                         "description": "테스트 기기입니다.",
                         "views": -1,
+                        "saved_cnt": -1,
+                        "unique_viewers": -1,
                         "created_at": "2023/11/28 04:19:53",
                         "images": [
                             {
@@ -54,12 +77,89 @@ item_router = APIRouter(
     name = "물품 자세히 조회하기"
 )
 # 
-async def get_item(item_seq: int):
-    item = Item.get_item_by_item_seq(db_session, item_seq)
-    if item is None:
-        return JSONResponse({"message": "아이템이 존재하지 않습니다."}, status_code = MACResult.FAIL.value)
+async def get_item(request: Request, item_seq: int, user_id: Optional[str] = None, fields: Optional[str] = Query(None, description = INFO_FIELDS_DESCRIPTION), db_session: AsyncSession = Depends(get_db_session)):
+    try:
+        selected = FieldUtility.parse(fields, INFO_FIELDS)
+        
+    except ValueError as e:
+        return JSONResponse({"message": f"알 수 없는 필드입니다: {e}"}, status_code = MACResult.ENTITY_ERROR.value)
     
-    return JSONResponse(item.info(db_session), status_code = MACResult.SUCCESS.value)
+    # 캐시에는 데이터베이스에 반영된 조회수만 넣고, 아직 반영 안 된 조회수는 응답할 때마다 더함
+    key = response_cache.key("item", item_seq = item_seq, fields = selected)
+    cached = response_cache.get(key)
+    if cached is None:
+        item = await Item.get_item_by_item_seq_async(db_session, item_seq)
+        if item is None:
+            return JSONResponse({"message": "아이템이 존재하지 않습니다."}, status_code = MACResult.FAIL.value)
+        
+        cached = await db_session.run_sync(item.info, selected)
+        response_cache.set(key, cached, [f"item:{item_seq}", f"views:{item_seq}"])
+        
+    # 고유 조회자는 로그인한 유저면 아이디, 아니면 접속 IP 로 구분
+    viewer = f"user:{user_id}" if user_id else f"ip:{request.client.host if request.client else ''}"
+    view_counter.add(item_seq, viewer)
+    info = dict(cached)
+    if "views" in info:
+        info["views"] = (info["views"] or 0) + view_counter.pending(item_seq)
+    return JSONResponse(info, status_code = MACResult.SUCCESS.value)
+
+@item_router.get("/batch",
+    responses={
+        200: {
+            "content": {
+                "application/json": {
+                    "example": {
+                        "items": [
+                            {
+                                "seq": 3,
+                                "name": "test",
+                                "category": "디지털 기기",
+                                "cnt": "1",
+                                "price": "10,000",
+                                "description": "테스트 기기입니다.",
+                                "views": 5,
+                                "saved_cnt": 1,
+                                "unique_viewers": 4,
+                                "created_at": "2023/11/28 04:19:53",
+                                "images": []
+                            },
+                            None
+                        ],
+                        "not_found": [999]
+                    }
+                }
+            }
+        },
+        422: {
+            "content": {
+                "application/json": {
+                    "example": {"message": f"한 번에 {MAX_BATCH_ITEMS}개까지 조회할 수 있습니다."}
+                }
+            }
+        }
+    },
+    name = "물품 여러 개 조회하기",
+    description = "item_seqs 순서대로 물품 자세히 조회하기와 같은 정보를 돌려줌, 존재하지 않는 물품 자리는 null 이고 not_found 에 모음 \n\n 목록 미리보기용이라 조회수는 올리지 않음"
+)
+async def get_items(item_seqs: List[int] = Query(...), fields: Optional[str] = Query(None, description = INFO_FIELDS_DESCRIPTION), db_session: AsyncSession = Depends(get_db_session)):
+    if len(item_seqs) > MAX_BATCH_ITEMS:
+        return JSONResponse({"message": f"한 번에 {MAX_BATCH_ITEMS}개까지 조회할 수 있습니다."}, status_code = MACResult.ENTITY_ERROR.value)
+    
+    try:
+        selected = FieldUtility.parse(fields, INFO_FIELDS)
+        
+    except ValueError as e:
+        return JSONResponse({"message": f"알 수 없는 필드입니다: {e}"}, status_code = MACResult.ENTITY_ERROR.value)
+    
+    infos = await db_session.run_sync(Item.get_info_by_item_seqs, item_seqs, selected)
+    for info in infos:
+        if info is not None and "views" in info:
+            info["views"] = (info["views"] or 0) + view_counter.pending(info["seq"])
+            
+    return JSONResponse({
+        "items": infos,
+        "not_found": list(dict.fromkeys(seq for seq, info in zip(item_seqs, infos) if info is None))
+    }, status_code = MACResult.SUCCESS.value)
 
 @item_router.get("/search/{search_value}",
     responses={
@@ -87,10 +187,20 @@ async def get_item(item_seq: int):
         }
     },
     name = "아이템 검색하기",
-    description = "검색 창에 뜨는 목록"
+    description = "검색 창에 뜨는 목록 \n\n mode = prefix 는 메모리 접두사 인덱스에서 조회수 순으로 추천 (이름 또는 단어의 시작 부분 일치), like 는 이름 부분 일치, fulltext 는 전문 검색 인덱스를 사용하며 관련도 순으로 정렬, description = true 면 설명까지 검색, chosung 은 \"ㅇㅇㅍ\", \"아이ㅍ\" 처럼 초성이나 덜 완성된 한글로 검색"
 )
-async def search_item(search_value: str, start: int = 0, count: int = 10):
-    result = Item.search_items(db_session, search_value, start, count)
+async def search_item(search_value: str, start: int = 0, count: int = 10, mode: str = Query("prefix", enum = ["prefix", "like", "fulltext", "chosung"]), description: bool = False, db_session: AsyncSession = Depends(get_db_session)):
+    if mode == "prefix":
+        result = await db_session.run_sync(Item.suggest_items, search_value, start, count)
+        
+    elif mode == "chosung":
+        result = await db_session.run_sync(Item.search_chosung_items, search_value, start, count)
+        
+    elif mode == "fulltext":
+        result = await db_session.run_sync(Item.search_fulltext_items, search_value, start, count, description)
+        
+    else:
+        result = await db_session.run_sync(Item.search_items, search_value, start, count)
     if result is None or len(result) == 0:
         return JSONResponse([], status_code = MACResult.FAIL.value)
 
@@ -132,14 +242,42 @@ async def search_item(search_value: str, start: int = 0, count: int = 10):
         }
     },
     name = "아이템 자세히 검색하기",
-    description = "검색 탭에 뜨는 목록"
+    description = "검색 탭에 뜨는 목록 \n\n cursor 를 넘기면 (첫 페이지는 빈 문자열) start 대신 커서 기반으로 {\"items\": [...], \"next_cursor\": \"...\"} 를 반환 \n\n mode = fulltext 는 전문 검색 인덱스를 사용하며 관련도 순으로 정렬 (cursor 미지원), description = true 면 설명까지 검색 \n\n mode = chosung 은 \"ㅇㅇㅍ\", \"아이ㅍ\" 처럼 초성이나 덜 완성된 한글로 검색 (cursor 미지원)"
 )
-async def search_detail_item(search_value: str, start: int = 0, count: int = 10):
-    result = Item.search_detail_items(db_session, search_value, start, count)
+async def search_detail_item(search_value: str, start: int = 0, count: int = 10, cursor: Optional[str] = None, mode: str = Query("like", enum = ["like", "fulltext", "chosung"]), description: bool = False, fields: Optional[str] = Query(None, description = RECOMMEND_FIELDS_DESCRIPTION), db_session: AsyncSession = Depends(get_db_session)):
+    try:
+        selected = FieldUtility.parse(fields, RECOMMEND_FIELDS)
+        
+    except ValueError as e:
+        return JSONResponse({"message": f"알 수 없는 필드입니다: {e}"}, status_code = MACResult.ENTITY_ERROR.value)
+    
+    key = response_cache.key("search_detail", search_value = search_value, start = start, count = count, cursor = cursor, mode = mode, description = description, fields = selected)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return JSONResponse(cached, status_code = MACResult.SUCCESS.value)
+    
+    if mode == "fulltext":
+        result = await db_session.run_sync(Item.search_detail_fulltext_items, search_value, start, count, description, selected)
+    
+    elif mode == "chosung":
+        result = await db_session.run_sync(Item.search_detail_chosung_items, search_value, start, count, selected)
+    
+    elif cursor is not None:
+        page = await db_session.run_sync(Item.search_detail_items_by_cursor, search_value, cursor, count, selected)
+        if page is None:
+            return JSONResponse({"message": "유효한 커서가 아닙니다."}, status_code = MACResult.ENTITY_ERROR.value)
+        
+        response_cache.set(key, page, _list_tags(page["items"]))
+        return JSONResponse(page, status_code = MACResult.SUCCESS.value)
+    
+    else:
+        result = await db_session.run_sync(Item.search_detail_items, search_value, start, count, selected)
+        
     if result is None or len(result) == 0:
         return JSONResponse([], status_code = MACResult.FAIL.value)
 
     else:
+        response_cache.set(key, result, _list_tags(result))
         return JSONResponse(result, status_code = MACResult.SUCCESS.value)
 
 @item_router.get("/recommend",
@@ -170,16 +308,136 @@ async def search_detail_item(search_value: str, start: int = 0, count: int = 10)
         }
     },
     name = "아이템 추천",
-    description = "홈화면에서 나오는 아이템 추천"
+    description = "홈화면에서 나오는 아이템 추천, 조회수/저장 횟수/등록 시간으로 미리 계산한 인기 순위 순서 \n\n category 를 넘기면 해당 카테고리 안에서의 순위 \n\n cursor 를 넘기면 (첫 페이지는 빈 문자열) start 대신 커서 기반으로 같은 순서의 {\"items\": [...], \"next_cursor\": \"...\"} 를 반환"
+)
+async def recommend_item(start: int = 0, count: int = 10, cursor: Optional[str] = None, category: Optional[str] = Query(None, enum = CATEGORY_NAMES), fields: Optional[str] = Query(None, description = RECOMMEND_FIELDS_DESCRIPTION), db_session: AsyncSession = Depends(get_db_session)):
+    try:
+        selected = FieldUtility.parse(fields, RECOMMEND_FIELDS)
+        
+    except ValueError as e:
+        return JSONResponse({"message": f"알 수 없는 필드입니다: {e}"}, status_code = MACResult.ENTITY_ERROR.value)
+    
+    key = response_cache.key("recommend", start = start, count = count, cursor = cursor, category = category, fields = selected)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return JSONResponse(cached, status_code = MACResult.SUCCESS.value)
+    
+    category_seq = None if category is None else await db_session.run_sync(Category.convert_member, category)
+    if cursor is not None:
+        page = await db_session.run_sync(Item.get_recommended_item_by_cursor, cursor, count, category_seq, selected)
+        if page is None:
+            return JSONResponse({"message": "유효한 커서가 아닙니다."}, status_code = MACResult.ENTITY_ERROR.value)
+        
+        response_cache.set(key, page, [*_list_tags(page["items"]), "trending"])
+        return JSONResponse(page, status_code = MACResult.SUCCESS.value)
+    
+    result = await db_session.run_sync(Item.get_recommended_item, start, count, category_seq, selected)
+    if result is None or len(result) == 0:
+        return JSONResponse([], status_code = MACResult.FAIL.value)
+    
+    else:
+        # 인기 순위 순서이므로 순위를 다시 만들면 지워짐
+        response_cache.set(key, result, [*_list_tags(result), "trending"])
+        return JSONResponse(result, status_code = MACResult.SUCCESS.value)
+
+
+@item_router.get("/related",
+    responses = {
+        200: {
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "seq": -1,
+                            "name": "test",
+                            "created_at": "15시간 전",
+                            "price": 10000,
+                            "saved_cnt": 0,
+                            "image_path": "./images/3942b44c-5e53-48ea-ad4a-3af2a7ba7030.jpg"
+                        }
+                    ]
+                }
+            }
+        }
+    },
+    name = "함께 저장/구매한 아이템",
+    description = "이 상품을 저장/구매한 사람들이 함께 저장/구매한 상품, database/jobs/item_neighbors.py 가 미리 계산한 결과"
 )
-async def recommend_item(start: int = 0, count: int = 10,):
-    result = Item.get_recommended_item(db_session, start, count)
+async def related_item(item_seq: int, count: int = 10, fields: Optional[str] = Query(None, description = RECOMMEND_FIELDS_DESCRIPTION), db_session: AsyncSession = Depends(get_db_session)):
+    try:
+        selected = FieldUtility.parse(fields, RECOMMEND_FIELDS)
+        
+    except ValueError as e:
+        return JSONResponse({"message": f"알 수 없는 필드입니다: {e}"}, status_code = MACResult.ENTITY_ERROR.value)
+    
+    result = await db_session.run_sync(Item.get_related_items, item_seq, count, selected)
     if result is None or len(result) == 0:
         return JSONResponse([], status_code = MACResult.FAIL.value)
     
     else:
         return JSONResponse(result, status_code = MACResult.SUCCESS.value)
 
+@item_router.get("/similar",
+    responses = {
+        200: {
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "seq": -1,
+                            "name": "test",
+                            "created_at": "15시간 전",
+                            "price": 10000,
+                            "saved_cnt": 0,
+                            "image_path": "./images/3942b44c-5e53-48ea-ad4a-3af2a7ba7030.jpg"
+                        }
+                    ]
+                }
+            }
+        },
+        401: {
+            "content": {
+                "application/json": {
+                    "example": {"message": "아이템이 존재하지 않습니다."}
+                }
+            }
+        }
+    },
+    name = "이름/설명이 비슷한 아이템",
+    description = "이름과 설명의 글자 n-gram TF-IDF 유사도 순, 저장/구매 기록이 없는 새 아이템에도 사용 가능"
+)
+async def similar_item(item_seq: int, count: int = 10, fields: Optional[str] = Query(None, description = RECOMMEND_FIELDS_DESCRIPTION), db_session: AsyncSession = Depends(get_db_session)):
+    try:
+        selected = FieldUtility.parse(fields, RECOMMEND_FIELDS)
+        
+    except ValueError as e:
+        return JSONResponse({"message": f"알 수 없는 필드입니다: {e}"}, status_code = MACResult.ENTITY_ERROR.value)
+    
+    result = await db_session.run_sync(Item.get_similar_items, item_seq, count, selected)
+    if result is None:
+        return JSONResponse({"message": "아이템이 존재하지 않습니다."}, status_code = MACResult.FAIL.value)
+    
+    return JSONResponse(result, status_code = MACResult.SUCCESS.value)
+    
+@item_router.get("/cache/stats",
+    responses = {
+        200: {
+            "content": {
+                "application/json": {
+                    "example": {
+                        "size": 310, "maxsize": 2048, "bytes": 1843200, "max_bytes": 33554432, "ttl": 30.0, "tags": 540,
+                        "hits": 9120, "misses": 880, "hit_rate": 0.912, "invalidations": 75,
+                        "routes": {"item": {"hits": 6000, "misses": 400, "hit_rate": 0.9375}, "recommend": {"hits": 3120, "misses": 480, "hit_rate": 0.8667}}
+                    }
+                }
+            }
+        }
+    },
+    name = "응답 캐시 상태 조회하기",
+    description = "GET /item, /item/recommend, /item/search_detail, /user/{user_id} 응답 캐시의 경로별 적중률과 사용 메모리 (bytes 는 JSON 본문 크기 합)"
+)
+async def response_cache_stats():
+    return JSONResponse(response_cache.stats(), status_code = MACResult.SUCCESS.value)
 
 @item_router.put("/insert", 
     responses = {
@@ -207,7 +465,7 @@ async def recommend_item(start: int = 0, count: int = 10,):
     },
     name = "상품 등록하기"
 )
-async def insert_item(user_id: str, name: str, cnt: int, price: int, description: str, category: str = Query(enum = Category.get_all_category_name(db_session))):
+async def insert_item(user_id: str, name: str, cnt: int, price: int, description: str, category: str = Query(enum = CATEGORY_NAMES), db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "상품정보가 등록되었습니다.",
         MACResult.FAIL: "상품정보 입력에 실패하였습니다.",
@@ -216,10 +474,10 @@ async def insert_item(user_id: str, name: str, cnt: int, price: int, description
         MACResult.ENTITY_ERROR: "유효한 카테고리가 아닙니다.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
-    user = User._load_user_info(db_session, user_id = user_id)
+    user = await User._load_user_info_async(db_session, user_id = user_id)
     if user:
         if user.is_middleman: #type: ignore
-            result = Item.insert_item_info(db_session, user.seq, name, category, cnt, price, description) # type: ignore
+            result = await db_session.run_sync(Item.insert_item_info, user.seq, name, category, cnt, price, description) # type: ignore
         
         else:
             result = MACResult.FORBIDDEN
@@ -248,21 +506,21 @@ async def insert_item(user_id: str, name: str, cnt: int, price: int, description
     },
     name = "상품 정보 업데이트 하기"
 )
-async def update_item(item_seq: int, user_id: str, name: Optional[str] = None, cnt: Optional[int] = None, price: Optional[int] = None, description: Optional[str] = None, views: Optional[int] = None):
+async def update_item(item_seq: int, user_id: str, name: Optional[str] = None, cnt: Optional[int] = None, price: Optional[int] = None, description: Optional[str] = None, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "성공적으로 상품정보를 업데이트 하였습니다.",
         MACResult.FAIL: "상품 정보를 찾을 수 없습니다.",
         MACResult.NOT_FOUND: "유저 정보를 찾을 수 없습니다.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
-    item = Item.get_item_by_item_seq(db_session, seq = item_seq)
+    item = await Item.get_item_by_item_seq_async(db_session, seq = item_seq)
     if item is None:
         result = MACResult.FAIL
     
     else:
-        user = User._load_user_info(db_session, user_id = user_id)
+        user = await User._load_user_info_async(db_session, user_id = user_id)
         if user:
-            result = item.update_item_info(db_session, user.seq, name, cnt, price, description, views) # type: ignore
+            result = await db_session.run_sync(item.update_item_info, user.seq, name, cnt, price, description) # type: ignore
         
         else:
             result = MACResult.NOT_FOUND
@@ -288,7 +546,7 @@ async def update_item(item_seq: int, user_id: str, name: Optional[str] = None, c
     },
     name = "상품 삭제하기"
 )
-async def delete_item(item_seq: int, user_id: str):
+async def delete_item(item_seq: int, user_id: str, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "상품이 성공적으로 제거되었습니다.",
         MACResult.FAIL: "상품 제거에 실패하였습니다.",
@@ -296,17 +554,51 @@ async def delete_item(item_seq: int, user_id: str):
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
     
-    item = Item.get_item_by_item_seq(db_session, item_seq)
+    item = await Item.get_item_by_item_seq_async(db_session, item_seq)
     if item is None:
         result = MACResult.FAIL
         
     else:
-        user = User._load_user_info(db_session, user_id = user_id)
+        user = await User._load_user_info_async(db_session, user_id = user_id)
         if user:
-            result = item.delete_item(db_session, user.seq) # type: ignore
+            result = await db_session.run_sync(item.delete_item, user.seq) # type: ignore
             
         else:
             result = MACResult.NOT_FOUND
         
     return JSONResponse({"message": response_dict[result]}, status_code = result.value)
 
+@item_router.get("/stats",
+    responses = {
+        200: {
+            "content": {
+                "application/json": {
+                    "example": {
+                        "total_views": 120,
+                        "total_saved_cnt": 8,
+                        "unique_viewers": 57,
+                        "items": [
+                            {"seq": 1, "name": "아이폰 15", "views": 100, "saved_cnt": 6, "unique_viewers": 45},
+                            {"seq": 2, "name": "아이패드", "views": 20, "saved_cnt": 2, "unique_viewers": 15}
+                        ]
+                    }
+                }
+            }
+        },
+        404: {
+            "content": {
+                "application/json": {
+                    "example": {"message": "유저 정보를 찾을 수 없습니다."}
+                }
+            }
+        }
+    },
+    name = "판매자 상품 통계 조회하기",
+    description = "unique_viewers 는 HyperLogLog 추정치 (오차 약 1.6%), 최상위 unique_viewers 는 판매자 상품 중 하나라도 본 고유 조회자 수"
+)
+async def seller_stats(user_id: str, db_session: AsyncSession = Depends(get_db_session)):
+    user = await User._load_user_info_async(db_session, user_id = user_id)
+    if user is None:
+        return JSONResponse({"message": "유저 정보를 찾을 수 없습니다."}, status_code = MACResult.NOT_FOUND.value)
+    
+    return JSONResponse(await db_session.run_sync(Item.get_seller_stats, user.seq), status_code = MACResult.SUCCESS.value)
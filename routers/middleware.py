@@ -0,0 +1,43 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from starlette.responses import JSONResponse
+from fastapi import HTTPException
+
+class RequestTooLarge(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code = 413, detail = "요청 크기가 너무 큽니다.")
+
+
+class RequestSizeLimitMiddleware:
+    """ 본문이 max_size 바이트를 넘는 요청을 메모리나 임시 파일에 다 받기 전에 413 으로 거절하는 ASGI 미들웨어
+
+    Content-Length 가 있으면 본문을 읽기 전에 바로 거절하고,
+    chunked 전송처럼 길이를 모르면 받는 바이트 수를 세다가 넘는 순간 RequestTooLarge 를 발생시킴
+    """
+    def __init__(self, app: ASGIApp, max_size: int) -> None:
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_size:
+            response = JSONResponse({"message": "요청 크기가 너무 큽니다."}, status_code = 413, headers = {"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    raise RequestTooLarge()
+
+            return message
+
+        await self.app(scope, limited_receive, send)
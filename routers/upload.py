@@ -0,0 +1,103 @@
+from routers.env import MAX_UPLOAD_SIZE, IMAGE_WEBP, upload_semaphore, get_image_pool
+from database.utility.image_util import ImageUtility
+from starlette.concurrency import run_in_threadpool
+from database.models.results import MACResult
+from database.storage import image_storage
+from typing import Dict, Optional, Tuple, BinaryIO
+from fastapi import UploadFile
+import hashlib
+import asyncio
+import os
+
+CHUNK_SIZE = 1024 * 1024
+
+# 파생 이미지를 만들고 있는 해시 -> 작업, 같은 이미지가 동시에 올라오면 (한 요청 안의 중복 포함) 먼저 시작한 작업을 같이 기다림
+_building: Dict[str, "asyncio.Future[bool]"] = {}
+
+def _write_chunk(fp: BinaryIO, hasher: "hashlib._Hash", chunk: bytes) -> None:
+    hasher.update(chunk)
+    fp.write(chunk)
+
+async def save_upload(upload: UploadFile) -> Tuple[MACResult, Optional[str], Optional[str]]:
+    """ 업로드 파일을 CHUNK_SIZE 씩 나눠서 임시 파일에 저장하면서 sha256 을 계산, 파일 입출력은 스레드풀에서 해서 이벤트 루프를 막지 않음
+
+    Parameters:
+        upload (UploadFile): 업로드 된 파일 \n
+
+    Returns:
+        (MACResult.SUCCESS, str, str): 저장 성공, 임시 파일 경로, 내용 sha256 \n
+        (MACResult.PAYLOAD_TOO_LARGE, None, None): MAX_UPLOAD_SIZE 를 넘어서 저장하지 않음 \n
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    async with upload_semaphore:
+        temp_path = await run_in_threadpool(image_storage.temp_path)
+        fp = await run_in_threadpool(open, temp_path, "wb")
+        try:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_UPLOAD_SIZE:
+                    break
+
+                await run_in_threadpool(_write_chunk, fp, hasher, chunk)
+
+        finally:
+            await run_in_threadpool(fp.close)
+
+        if size > MAX_UPLOAD_SIZE:
+            await run_in_threadpool(os.remove, temp_path)
+            return MACResult.PAYLOAD_TOO_LARGE, None, None
+
+        return MACResult.SUCCESS, temp_path, hasher.hexdigest()
+
+async def save_image_upload(upload: UploadFile) -> Tuple[MACResult, Optional[str]]:
+    """ 업로드를 image_storage 에 저장, 처음 보는 이미지면 프로세스 풀에서 thumb, card, full 파생 이미지를 만듦
+
+    같은 내용의 이미지가 이미 저장되어 있으면 파생 이미지를 다시 만들지 않고 같은 경로를 돌려줌 \n
+    파일은 데이터베이스 행이 image_storage.acquire 로 참조해야 살아남고, 참조가 없는 파일은 가비지 컬렉터가 지움
+
+    Returns:
+        (MACResult.SUCCESS, str): 저장된 이미지 경로 \n
+        (MACResult.PAYLOAD_TOO_LARGE, None): MAX_UPLOAD_SIZE 를 넘음 \n
+        (MACResult.ENTITY_ERROR, None): 이미지 파일이 아님 \n
+    """
+    result, temp_path, digest = await save_upload(upload)
+    if result != MACResult.SUCCESS:
+        return result, None
+
+    path = image_storage.path(digest) # type: ignore
+    building = _building.get(digest) # type: ignore
+    if building is None:
+        building = asyncio.ensure_future(_build_variants(temp_path, path)) # type: ignore
+        _building[digest] = building # type: ignore
+        building.add_done_callback(lambda _: _building.pop(digest, None)) # type: ignore
+
+    else:
+        # 같은 내용을 이미 처리 중이므로 이 업로드의 임시 파일은 필요 없음
+        await run_in_threadpool(os.remove, temp_path) # type: ignore
+
+    # 기다리던 요청이 취소돼도 같은 이미지를 기다리는 다른 요청을 위해 작업은 계속 진행
+    if not await asyncio.shield(building):
+        return MACResult.ENTITY_ERROR, None
+
+    return MACResult.SUCCESS, path
+
+async def _build_variants(temp_path: str, path: str) -> bool:
+    """ 해시마다 한 번만 실행되는 작업, temp_path 는 끝나면 지움
+
+    Returns:
+        True: path 에 파생 이미지가 있음 
+
+        False: 이미지 파일이 아님 
+
+    """
+    try:
+        if await run_in_threadpool(image_storage.exists, path):
+            # 가비지 컬렉터가 참조 없는 파일로 보고 지우지 않도록 유예 시간을 다시 시작
+            await run_in_threadpool(os.utime, path)
+            return True
+
+        return await asyncio.get_running_loop().run_in_executor(get_image_pool(), ImageUtility.make_variants, temp_path, IMAGE_WEBP, path)
+
+    finally:
+        await run_in_threadpool(os.remove, temp_path)
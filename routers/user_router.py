@@ -1,9 +1,13 @@
 from database.models.user import User, SignUpModel, SignoutModel, LoginModel, ForgotPasswordModel
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from database.models.purchase import Purchase
+from database.models.item import Item
 from database.models.results import MACResult
-from starlette.responses import FileResponse
-from routers.env import db_session, session
+from database.utility.response_cache import response_cache
+from routers.image_response import image_response
+from routers.upload import save_image_upload
+from routers.env import get_db_session, session
 from fastapi.responses import JSONResponse
 from typing import Optional
 import logging
@@ -39,14 +43,14 @@ user_router = APIRouter(
     },
     name = "회원 가입"
 )
-async def signup(model: SignUpModel):
+async def signup(model: SignUpModel, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "회원가입에 성공하였습니다.",
         MACResult.FAIL: "회원가입에 실패하였습니다.",
         MACResult.CONFLICT: "이미 등록된 계정 또는 이메일 입니다.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
-    result = User.signup(db_session, model.user_id, model.password, model.name, model.email, model.phone, model.idnum)
+    result = await db_session.run_sync(User.signup, model.user_id, model.password, model.name, model.email, model.phone, model.idnum)
     
     return JSONResponse({"message": response_dict[result]}, status_code = result.value)
 
@@ -77,7 +81,7 @@ async def signup(model: SignUpModel):
     },
     name = "회원 탈퇴"
 )
-async def signout(model: SignoutModel):
+async def signout(model: SignoutModel, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "회원탈퇴에 성공하였습니다.",
         MACResult.FAIL: "회원탈퇴에 실패하였습니다.",
@@ -86,10 +90,10 @@ async def signout(model: SignoutModel):
     }
     
     result = MACResult.FAIL
-    user = User._load_user_info(db_session, user_id = model.user_id)
+    user = await User._load_user_info_async(db_session, user_id = model.user_id)
     if user:
-        if User.login(db_session, session, model.user_id, model.password) == MACResult.SUCCESS:
-            result = user.signout(db_session, session)
+        if await db_session.run_sync(User.login, session, model.user_id, model.password) == MACResult.SUCCESS:
+            result = await db_session.run_sync(user.signout, session)
     
     return JSONResponse({"message": response_dict[result]}, status_code = result.value)
 
@@ -113,14 +117,14 @@ async def signout(model: SignoutModel):
     },
     name = "로그인"
 )
-async def login(model: LoginModel):
+async def login(model: LoginModel, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "로그인에 성공하였습니다.",
         MACResult.FAIL: "아이디 또는 비밀번호가 일치하지 않습니다.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
     
-    result = User.login(db_session, session, model.user_id, model.password)
+    result = await db_session.run_sync(User.login, session, model.user_id, model.password)
     
     return JSONResponse({"message": response_dict[result]}, status_code = result.value)
 
@@ -151,15 +155,15 @@ async def login(model: LoginModel):
     },
     name = "로그아웃"
 )
-async def logout(user_id: str):
+async def logout(user_id: str, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "성공적으로 로그아웃 하였습니다",
         MACResult.FAIL: "로그아웃에 실패하였습니다.",
     }
     
-    user = User._load_user_info(db_session, user_id = user_id)
+    user = await User._load_user_info_async(db_session, user_id = user_id)
     if user:
-        result = user.logout(db_session, session)
+        result = await db_session.run_sync(user.logout, session)
     else:
         result = MACResult.FAIL
     
@@ -191,7 +195,7 @@ async def logout(user_id: str):
     },
     name = "정보 변경하기"
 )
-async def update_info(user_id: str, name: Optional[str] = None, email: Optional[str] = None, phone: Optional[str] = None):
+async def update_info(user_id: str, name: Optional[str] = None, email: Optional[str] = None, phone: Optional[str] = None, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "성공적으로 정보를 변경하였습니다.",
         MACResult.FAIL: "정보 변경에 실패하였습니다.",
@@ -199,10 +203,10 @@ async def update_info(user_id: str, name: Optional[str] = None, email: Optional[
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
     
-    user = User._load_user_info(db_session, user_id = user_id)
+    user = await User._load_user_info_async(db_session, user_id = user_id)
     result = MACResult.FAIL
     if user:
-        result = user.update_info(db_session, user_id, name, email, phone)
+        result = await db_session.run_sync(user.update_info, user_id, name, email, phone)
     
     return JSONResponse({"message": response_dict[result]}, status_code = result.value)
         
@@ -225,9 +229,9 @@ async def update_info(user_id: str, name: Optional[str] = None, email: Optional[
     },
    name = "아이디 찾기"               
 )
-async def forgot_id(email: str):
+async def forgot_id(email: str, db_session: AsyncSession = Depends(get_db_session)):
     try:
-        user = User._load_user_info(db_session, email = email)
+        user = await User._load_user_info_async(db_session, email = email)
         if user is None:
             return JSONResponse({"message": "아이디 찾기에 실패하였습니다."}, status_code = MACResult.FAIL.value)
 
@@ -255,14 +259,14 @@ async def forgot_id(email: str):
         }
     },
     name = "비밀번호 변경")
-async def forgot_password(model: ForgotPasswordModel):
+async def forgot_password(model: ForgotPasswordModel, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "성공적으로 정보를 변경하였습니다.",
         MACResult.FAIL: "정보 변경에 실패하였습니다.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
     
-    result = User.forgot_password(db_session, session, model.user_id, model.password)
+    result = await db_session.run_sync(User.forgot_password, session, model.user_id, model.password)
     
     return JSONResponse({"message": response_dict[result]}, status_code = result.value)
 
@@ -292,14 +296,14 @@ async def forgot_password(model: ForgotPasswordModel):
     },
     name = "아이디 중복 체크"
 )
-async def check_duplicate_id(id: str):
+async def check_duplicate_id(id: str, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "아이디가 사용 가능합니다!",
         MACResult.CONFLICT: "아이디가 이미 사용중입니다.",
         MACResult.ENTITY_ERROR: "아이디와 이메일중 하나만 입력하세요.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
-    result = User.check_duplicate(db_session, user_id = id)
+    result = await db_session.run_sync(User.check_duplicate, user_id = id)
     return JSONResponse({"message": response_dict[result]}, status_code = result.value)
 
 
@@ -329,14 +333,14 @@ async def check_duplicate_id(id: str):
     },
     name = "이메일 중복 체크"
 )
-async def check_duplicate_email(email: str):
+async def check_duplicate_email(email: str, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "이메일이 사용 가능합니다!",
         MACResult.CONFLICT: "이메일이 이미 사용중입니다.",
         MACResult.ENTITY_ERROR: "아이디와 이메일중 하나만 입력하세요.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
-    result = User.check_duplicate(db_session, email = email)
+    result = await db_session.run_sync(User.check_duplicate, email = email)
     return JSONResponse({"message": response_dict[result]}, status_code = result.value)
 
 @user_router.get("/profile",
@@ -345,18 +349,19 @@ async def check_duplicate_email(email: str):
             "description": f"<img src='https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcRWnq7jeLUzceGdpxcXuVvh0_f0hiRz4ZiJmVPncOI&s' /> ",
             "content": None
         },
-        408: {
+        404: {
             "content": {
                 "application/json": {
-                    "example": {"message": "세션이 만료되었습니다."}
+                    "example": {"message": "이미지가 존재하지 않습니다."}
                 }
             }
         }
     },
-    name = "프로필 이미지 불러오기"
+    name = "프로필 이미지 불러오기",
+    description = "ETag / If-None-Match (304), Range (206) 를 지원하고 내용 해시 경로는 immutable 로 캐시함"
 )
-async def profile(path: str):
-    return FileResponse(path, media_type="image/png")
+async def profile(request: Request, path: str):
+    return await image_response(request, path)
 
 @user_router.post("/profile/update",
     responses={
@@ -380,20 +385,31 @@ async def profile(path: str):
                     "example": {"message": "세션이 만료되었습니다."}
                 }
             }
+        },
+        413: {
+            "content": {
+                "application/json": {
+                    "example": {"message": "이미지 크기가 너무 큽니다."}
+                }
+            }
         }
     },
     name = "프로필 이미지 업데이트"
 )
-async def update_profile(user_id: str, file: UploadFile = File(None)):
+async def update_profile(user_id: str, file: UploadFile = File(None), db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "이미지를 성공적으로 변경하였습니다!",
         MACResult.FAIL: "이미지 변경에 실패하였습니다.",
         MACResult.TIME_OUT: "세션이 만료되었습니다.",
+        MACResult.PAYLOAD_TOO_LARGE: "이미지 크기가 너무 큽니다.",
+        MACResult.ENTITY_ERROR: "이미지 파일이 아닙니다.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
-    user = User._load_user_info(db_session, user_id = user_id)
+    user = await User._load_user_info_async(db_session, user_id = user_id)
     if user:
-        result = user.update_profile_image(db_session, session, None if file is None else await file.read())
+        result, path = (MACResult.SUCCESS, None) if file is None else await save_image_upload(file)
+        if result == MACResult.SUCCESS:
+            result = await db_session.run_sync(user.update_profile_image, session, path)
     
     else:
         logging.error("유저가 존재하지 않습니다.")
@@ -467,6 +483,62 @@ async def verify_email(email: str, verify_code: str):
     result = User.verify_email_code(session, email, verify_code)
     return JSONResponse({"message": response_dict[result]}, status_code = result.value)
 
+@user_router.get("/cache/stats",
+    responses={
+        200: {
+            "content": {
+                "application/json": {
+                    "example": {"size": 120, "maxsize": 1024, "ttl": 60.0, "hits": 9800, "misses": 200, "hit_rate": 0.98}
+                }
+            }
+        }
+    },
+    name = "유저 정보 캐시 상태 조회하기",
+    description = "캐시 크기를 정할 때 참고하는 적중/실패 횟수"
+)
+async def cache_stats():
+    return User.cache_stats()
+
+@user_router.get("/recommend",
+    responses={
+        200: {
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "seq": -1,
+                            "name": "test",
+                            "created_at": "15시간 전",
+                            "price": 10000,
+                            "saved_cnt": 0,
+                            "image_path": "./images/3942b44c-5e53-48ea-ad4a-3af2a7ba7030.jpg"
+                        }
+                    ]
+                }
+            }
+        },
+        404: {
+            "content": {
+                "application/json": {
+                    "example": {"message": "조건을 만족하는 유저가 없습니다."}
+                }
+            }
+        }
+    },
+    name = "유저 맞춤 아이템 추천",
+    description = "저장/구매한 아이템과 함께 저장/구매된 아이템 추천, 저장/구매한 아이템이 없으면 인기 순위"
+)
+async def recommend(user_id: str, count: int = 10, db_session: AsyncSession = Depends(get_db_session)):
+    user = await User._load_user_info_async(db_session, user_id = user_id)
+    if user is None:
+        return JSONResponse({"message": "조건을 만족하는 유저가 없습니다."}, status_code = MACResult.NOT_FOUND.value)
+    
+    result = await db_session.run_sync(user.get_recommended_items, count)
+    if result is None or len(result) == 0:
+        return JSONResponse([], status_code = MACResult.FAIL.value)
+    
+    return JSONResponse(result, status_code = MACResult.SUCCESS.value)
+
 @user_router.get("/{user_id}", 
     responses={
         200: {
@@ -508,10 +580,17 @@ async def verify_email(email: str, verify_code: str):
     name = "유저 정보 조회하기",
     description = "API KEY 필요"
 )
-async def info(user_id: str):
-    user = User._load_user_info(db_session, user_id = user_id)
+async def info(user_id: str, db_session: AsyncSession = Depends(get_db_session)):
+    key = response_cache.key("user", user_id = user_id)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return JSONResponse(cached, status_code = MACResult.SUCCESS.value)
+    
+    user = await User._load_user_info_async(db_session, user_id = user_id)
     if user:
-        return user.info
+        info = user.info
+        response_cache.set(key, info, [f"user:{user_id}"])
+        return info
     
     else:
         return JSONResponse({"message": "조건을 만족하는 유저가 없습니다."}, status_code = MACResult.NOT_FOUND.value)
@@ -542,17 +621,17 @@ async def info(user_id: str):
     },
     name = "상품 구매 요청하기"
 )
-async def purchase(user_id: str, item_seq: int):
+async def purchase(user_id: str, item_seq: int, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "성공적으로 구매 신청하였습니다.",
         MACResult.NOT_FOUND: "사용자를 찾을 수 없습니다.",
         MACResult.CONFLICT: "이미 구매중인 상품입니다.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다."
     }
-    user = User._load_user_info(db_session, user_id = user_id)
+    user = await User._load_user_info_async(db_session, user_id = user_id)
     result = MACResult.NOT_FOUND
     if user:
-        result = user.purchase(db_session, item_seq)
+        result = await db_session.run_sync(user.purchase, item_seq)
     
     return JSONResponse({"message": response_dict[result]}, status_code = result.value)
 
@@ -584,10 +663,10 @@ async def purchase(user_id: str, item_seq: int):
     },
     name = "구매중인 상품 목록 불러오기"
 )
-async def get_purchase_list(user_id: str):
-    user = User._load_user_info(db_session, user_id = user_id)
+async def get_purchase_list(user_id: str, db_session: AsyncSession = Depends(get_db_session)):
+    user = await User._load_user_info_async(db_session, user_id = user_id)
     if user:
-        result = Purchase.get_purchase_item_list(db_session, user.seq) # type: ignore
+        result = await db_session.run_sync(Purchase.get_purchase_item_list, user.seq) # type: ignore
         return JSONResponse(result, status_code = MACResult.SUCCESS.value)
     
     else:
@@ -630,12 +709,12 @@ async def get_purchase_list(user_id: str):
     },
     name = "상품 목록 조회하기"
 )
-async def load_save_items(user_id: str):
-    user = User._load_user_info(db_session, user_id = user_id)
+async def load_save_items(user_id: str, db_session: AsyncSession = Depends(get_db_session)):
+    user = await User._load_user_info_async(db_session, user_id = user_id)
     if user:
-        items = user.load_saved_items(db_session)
+        items = await db_session.run_sync(user.load_saved_items)
         if items:
-            return JSONResponse(list(map(lambda x: x.recommend(db_session), items)), status_code = MACResult.SUCCESS.value)
+            return JSONResponse(await db_session.run_sync(Item.recommend_many, items), status_code = MACResult.SUCCESS.value)
         
     return JSONResponse({"message": "유저 아이디가 잘못 입력되었습니다."}, status_code=MACResult.FAIL.value)
 
@@ -665,16 +744,16 @@ async def load_save_items(user_id: str):
     },
     name = "상품 목록 업데이트 하기"
 )
-async def update_saved_items(user_id: str, item_seq: int):
+async def update_saved_items(user_id: str, item_seq: int, db_session: AsyncSession = Depends(get_db_session)):
     response_dict = {
         MACResult.SUCCESS: "성공적으로 변경하였습니다.",
         MACResult.FAIL: "변경에 실패하였습니다.",
         MACResult.INTERNAL_SERVER_ERROR: "서버 내부 에러가 발생하였습니다.",
     }
     
-    user = User._load_user_info(db_session, user_id = user_id)
+    user = await User._load_user_info_async(db_session, user_id = user_id)
     if user:
-        result = user.update_saved_items(db_session, item_seq)
+        result = await db_session.run_sync(user.update_saved_items, item_seq)
         
     else:
         logging.error("유저가 존재하지 않습니다.")
@@ -725,11 +804,11 @@ async def update_saved_items(user_id: str, item_seq: int):
     },
     name = "중개자 등록 상품 조회하기"
 )
-async def get_registerd_items(user_id: str):
-    user = User._load_user_info(db_session, user_id = user_id) # type: ignore
+async def get_registerd_items(user_id: str, db_session: AsyncSession = Depends(get_db_session)):
+    user = await User._load_user_info_async(db_session, user_id = user_id) # type: ignore
     if user:
         if user.is_middleman: # type: ignore
-            return JSONResponse(user.get_registerd_item(db_session), status_code = MACResult.SUCCESS.value)
+            return JSONResponse(await db_session.run_sync(user.get_registerd_item), status_code = MACResult.SUCCESS.value)
         
         else:
             return JSONResponse([], status_code = MACResult.FORBIDDEN.value)
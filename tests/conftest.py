@@ -0,0 +1,68 @@
+"""sqlite 와 임시 폴더로 앱을 띄워서 테스트하는 설정
+
+database.conn 이 현재 폴더의 user_info.txt 를, user 모델이 auth/env.py 를 읽으므로
+임시 폴더에 둘 다 만든 뒤 그 폴더로 이동하고 나서 앱을 import 함 (images/ 도 이 폴더 아래에 생김)
+"""
+from fastapi.testclient import TestClient
+from typing import Iterator
+import tempfile
+import pytest
+import atexit
+import shutil
+import uuid
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKSPACE = tempfile.mkdtemp(prefix = "mac-test-")
+atexit.register(shutil.rmtree, WORKSPACE, True)
+
+with open(os.path.join(WORKSPACE, "user_info.txt"), "w") as fp:
+    fp.write(f"sqlite = {os.path.join(WORKSPACE, 'mac.db')}\nimage_workers = 4\n")
+
+os.makedirs(os.path.join(WORKSPACE, "auth"))
+open(os.path.join(WORKSPACE, "auth", "__init__.py"), "w").close()
+with open(os.path.join(WORKSPACE, "auth", "env.py"), "w") as fp:
+    fp.write('APP_PASSWORD = ""\nSENDER = ""\n')
+
+os.chdir(WORKSPACE)
+sys.path[:0] = [WORKSPACE, ROOT]
+
+@pytest.fixture(scope = "session")
+def client() -> Iterator[TestClient]:
+    from database.models import Category, create_table
+    from database.conn import EngineConn
+
+    # 라우터의 category enum 이 import 할 때 정해지므로 routers 패키지를 import 하기 전에 채움
+    engine = EngineConn()
+    create_table(engine)
+    db_session = engine.session_maker()
+    if not Category.get_all_category_name(db_session):
+        Category.setting(db_session)
+        db_session.commit()
+
+    db_session.close()
+    engine.engine.dispose()
+
+    import main
+    with TestClient(main.app) as client:
+        yield client
+
+@pytest.fixture
+def item_seq(client: TestClient) -> int:
+    """ 중개인 유저가 새로 등록한 아이템 고유 번호 """
+    from routers.env import engine
+    from database.models import User, Item
+
+    user_id = f"seller-{uuid.uuid4().hex[:8]}"
+    client.put("/user/signup", json = dict(user_id = user_id, password = "pw", name = "seller", email = f"{user_id}@test.com", phone = "010", idnum = user_id))
+    db_session = engine.session_maker()
+    user = db_session.query(User).filter_by(user_id = user_id).one()
+    user.is_middleman = True
+    db_session.commit()
+
+    response = client.put("/item/insert", params = dict(user_id = user_id, name = "테스트 상품", cnt = 1, price = 1000, description = "d", category = "패션"))
+    assert response.status_code == 200, response.text
+    seq = db_session.query(Item.seq).filter_by(user_seq = user.seq).order_by(Item.seq.desc()).first()[0]
+    db_session.close()
+    return seq
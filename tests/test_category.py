@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+
+def test_setting_invalidates_the_category_cache_only_on_commit(client: TestClient):
+    from database.models.category import Category
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy import create_engine
+
+    engine = create_engine("sqlite://")
+    Category.__table__.create(engine)
+    db_session = sessionmaker(bind = engine)()
+    cached = {1: "캐시"}
+    try:
+        # rollback 되면 캐시는 그대로
+        Category.seq_to_name = cached
+        Category.setting(db_session)
+        assert Category.seq_to_name is cached
+        db_session.rollback()
+        assert Category.seq_to_name is cached
+
+        # flush 만 된 동안에는 그대로, commit 이 끝나야 비움
+        Category.setting(db_session)
+        assert Category.seq_to_name is cached
+        db_session.commit()
+        assert Category.seq_to_name == {}
+        assert len(Category.get_all_category_name(db_session)) == 11 # type: ignore
+
+    finally:
+        db_session.close()
+        Category.invalidate()
+
+def test_category_enum_is_shared_by_routes(client: TestClient):
+    from routers.item_router import CATEGORY_NAMES
+
+    paths = client.get("/openapi.json").json()["paths"]
+    enums = [
+        parameter["schema"]["enum"]
+        for path in ["/item/recommend", "/item/insert"]
+        for method in paths[path].values()
+        for parameter in method["parameters"] if parameter["name"] == "category"
+    ]
+    # 테스트 설정에서 카테고리를 라우터보다 먼저 채우므로 비어 있지 않음
+    assert CATEGORY_NAMES and enums == [CATEGORY_NAMES, CATEGORY_NAMES]
@@ -0,0 +1,44 @@
+from database.utility.commit_hooks import on_commit
+from fastapi.testclient import TestClient
+from typing import List
+
+def test_on_commit_runs_only_after_commit(client: TestClient):
+    from routers.env import engine
+
+    calls: List[str] = []
+    db_session = engine.session_maker()
+    on_commit(db_session, calls.append, "rolled back")
+    db_session.rollback()
+    db_session.commit()
+    assert calls == []
+
+    on_commit(db_session, calls.append, "first")
+    on_commit(db_session, calls.append, "second")
+    assert calls == []
+    db_session.commit()
+    assert calls == ["first", "second"]
+
+    on_commit(db_session, calls.append, "closed")
+    db_session.close()
+    db_session.commit()
+    assert calls == ["first", "second"]
+
+def test_failed_insert_does_not_touch_search_index(client: TestClient, item_seq: int):
+    from database.search import autocomplete_index
+    from database.models.results import MACResult
+    from database.models.item import Item
+    from routers.env import engine
+
+    db_session = engine.session_maker()
+    item = Item.get_item_by_item_seq(db_session, item_seq)
+    assert item.update_item_info(db_session, item.user_seq, name = "롤백될 이름") == MACResult.SUCCESS
+    db_session.rollback()
+    db_session.close()
+    assert "롤백될 이름" not in autocomplete_index.suggest("롤백", 0, 10)
+
+    db_session = engine.session_maker()
+    item = Item.get_item_by_item_seq(db_session, item_seq)
+    item.update_item_info(db_session, item.user_seq, name = "커밋된 이름")
+    db_session.commit()
+    db_session.close()
+    assert "커밋된 이름" in autocomplete_index.suggest("커밋", 0, 10)
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+import pytest
+import uuid
+
+def signup(client: TestClient, user_id: str, email: str):
+    return client.put("/user/signup", json = dict(user_id = user_id, password = "pw", name = "name", email = email, phone = "010", idnum = uuid.uuid4().hex[:14]))
+
+def test_duplicate_signup_rolls_back_instead_of_committing(client: TestClient):
+    from database.models.user import User
+    from routers.env import engine
+
+    user_id = f"dup-{uuid.uuid4().hex[:8]}"
+    assert signup(client, user_id, f"{user_id}@test.com").status_code == 200
+
+    # 아이디만 겹치면 중복 체크를 지나서 flush 에서 IntegrityError 가 남
+    response = signup(client, user_id, f"other-{user_id}@test.com")
+    assert response.status_code == 500
+    assert "message" in response.json()
+
+    db_session = engine.session_maker()
+    assert [user.email for user in db_session.query(User).filter_by(user_id = user_id).all()] == [f"{user_id}@test.com"]
+    db_session.close()
+
+    # 같은 풀의 다음 요청이 실패한 트랜잭션을 물려받지 않음
+    other = f"ok-{uuid.uuid4().hex[:8]}"
+    assert signup(client, other, f"{other}@test.com").status_code == 200
+
+def test_error_result_rolls_back_earlier_writes(client: TestClient):
+    from database.utility.commit_hooks import on_commit
+    from database.models.results import MACResult
+    from routers.env import get_db_session
+    from database.models.user import User
+    from routers.env import engine
+    import asyncio
+
+    user_id = f"half-{uuid.uuid4().hex[:8]}"
+    assert signup(client, user_id, f"{user_id}@test.com").status_code == 200
+    calls = []
+
+    async def request() -> None:
+        sessions = get_db_session()
+        db_session = await sessions.__anext__()
+        user = await User._load_user_info_async(db_session, user_id = user_id)
+        assert await db_session.run_sync(user.update_info, user_id, name = "half") == MACResult.SUCCESS
+        on_commit(db_session.sync_session, calls.append, "committed")
+
+        # 같은 요청의 다음 단계가 에러 결과로 끝남
+        assert await db_session.run_sync(user.update_info, user_id, email = None, phone = object()) == MACResult.INTERNAL_SERVER_ERROR
+        with pytest.raises(StopAsyncIteration):
+            await sessions.__anext__()
+
+    client.portal.call(request)
+    assert calls == []
+
+    db_session = engine.session_maker()
+    assert db_session.query(User.name).filter_by(user_id = user_id).scalar() == "name"
+    db_session.close()
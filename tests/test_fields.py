@@ -0,0 +1,78 @@
+from fastapi.testclient import TestClient
+from typing import Optional, Set
+import pytest
+
+def test_parse_fields():
+    from database.utility.field_util import FieldUtility
+
+    assert FieldUtility.parse(None, ["seq", "name"]) is None
+    assert FieldUtility.parse(" ", ["seq", "name"]) is None
+    assert FieldUtility.parse("name, seq,,", ["seq", "name"]) == {"seq", "name"}
+    with pytest.raises(ValueError, match = "^image,price$"):
+        FieldUtility.parse("name,price,image", ["seq", "name"])
+
+def test_item_fields_select_keys_and_keep_seq(client: TestClient, item_seq: int):
+    from database.models.item import INFO_FIELDS
+
+    full = client.get("/item", params = dict(item_seq = item_seq)).json()
+    assert list(full) == list(INFO_FIELDS)
+
+    # 필드 목록이 다르면 캐시도 따로 씀
+    response = client.get("/item", params = dict(item_seq = item_seq, fields = "name,price"))
+    assert response.status_code == 200
+    assert response.json() == {"seq": item_seq, "name": full["name"], "price": full["price"]}
+    assert list(client.get("/item", params = dict(item_seq = item_seq)).json()) == list(INFO_FIELDS)
+
+    batch = client.get("/item/batch", params = dict(item_seqs = [item_seq, 10 ** 9], fields = "views")).json()
+    assert list(batch["items"][0]) == ["seq", "views"] and batch["items"][1] is None
+
+def test_list_fields(client: TestClient, item_seq: int):
+    recommend = client.get("/item/recommend", params = dict(count = 5, fields = "name")).json()
+    assert recommend and all(list(item) == ["seq", "name"] for item in recommend)
+
+    page = client.get("/item/recommend", params = dict(count = 5, cursor = "", fields = "price")).json()
+    assert page["items"] and all(list(item) == ["seq", "price"] for item in page["items"])
+
+    search = client.get("/item/search_detail/테스트 상품", params = dict(count = 5, fields = "image_path,name")).json()
+    assert search and all(list(item) == ["seq", "name", "image_path"] for item in search)
+
+@pytest.mark.parametrize("path, params", [
+    ("/item", dict(item_seq = 1)),
+    ("/item/batch", dict(item_seqs = [1])),
+    ("/item/recommend", dict()),
+    ("/item/search_detail/테스트", dict()),
+    ("/item/related", dict(item_seq = 1)),
+    ("/item/similar", dict(item_seq = 1))
+])
+def test_unknown_fields_are_rejected(client: TestClient, path: str, params: dict):
+    response = client.get(path, params = dict(params, fields = "name,password"))
+    assert response.status_code == 422
+    assert response.json() == {"message": "알 수 없는 필드입니다: password"}
+
+def test_unselected_fields_skip_their_queries(client: TestClient, item_seq: int):
+    from database.models.item import Item
+    from routers.env import engine
+    from sqlalchemy import event
+
+    def count(build, fields: Optional[Set[str]]) -> int:
+        statements = []
+
+        def listener(*args):
+            statements.append(args[2])
+
+        db_session = engine.session_maker()
+        item = db_session.query(Item).filter_by(seq = item_seq).one()
+        event.listen(engine.engine, "before_cursor_execute", listener)
+        try:
+            build(db_session, [item], fields)
+
+        finally:
+            event.remove(engine.engine, "before_cursor_execute", listener)
+            db_session.close()
+
+        return len(statements)
+
+    assert count(Item.info_many, {"name", "price", "views"}) == 0
+    assert count(Item.info_many, None) > count(Item.info_many, {"images"}) > 0
+    assert count(Item.recommend_many, {"name"}) == 0
+    assert count(Item.recommend_many, None) == 1
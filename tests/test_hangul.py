@@ -0,0 +1,51 @@
+from database.search.hangul import HangulUtility, HangulSearchIndex
+from fastapi.testclient import TestClient
+
+def test_decompose_splits_syllables_and_compound_jamo():
+    assert HangulUtility.decompose("아이폰 15") == ("ㅇㅏㅇㅣㅍㅗㄴ15", "ㅇㅇㅍ15")
+    assert HangulUtility.decompose("값 ㅘ") == ("ㄱㅏㅂㅅㅗㅏ", "ㄱㅘ")
+    assert HangulUtility.is_chosung("ㅇㅇ ㅍ")
+    assert not HangulUtility.is_chosung("아이ㅍ")
+    assert not HangulUtility.is_chosung(" ")
+
+def test_index_matches_chosung_and_half_typed_queries():
+    index = HangulSearchIndex()
+    index.upsert(1, "아이폰 15 프로", 10)
+    index.upsert(2, "아이패드", 30)
+    index.upsert(3, "갤럭시 탭", 20)
+
+    assert index.search("ㅇㅇㅍ", 0, 10) == [2, 1]
+    assert index.search("아이ㅍ", 0, 10) == [2, 1]
+    # 입력 도중에 다음 글자 초성이 받침으로 붙은 "아잎"
+    assert index.search("아잎", 0, 10) == [2, 1]
+    assert index.search("ㄱㄹㅅ", 0, 10) == [3]
+    assert index.search("ㅇㅇㅍ", 1, 1) == [1]
+    assert index.search("ㅎㅎ", 0, 10) == []
+
+    index.upsert(2, "맥북", 30)
+    index.remove(3)
+    assert index.search("ㅇㅇㅍ", 0, 10) == [1]
+    assert index.search("ㄱㄹㅅ", 0, 10) == []
+    assert "ㄱ" not in index.chosung_grams
+
+def test_chosung_search_mode_follows_committed_renames(client: TestClient, item_seq: int):
+    from database.models.item import Item
+    from routers.env import engine
+
+    db_session = engine.session_maker()
+    item = Item.get_item_by_item_seq(db_session, item_seq)
+    item.update_item_info(db_session, item.user_seq, name = "뷁쉛 텀블러")
+    db_session.commit()
+    db_session.close()
+
+    response = client.get("/item/search_detail/ㅂㅅㅌ", params = dict(mode = "chosung", fields = "seq,name"))
+    assert response.json() == [{"seq": item_seq, "name": "뷁쉛 텀블러"}]
+    response = client.get("/item/search/뷁쉛ㅌ", params = dict(mode = "chosung"))
+    assert response.json() == [{"name": "뷁쉛 텀블러"}]
+
+    db_session = engine.session_maker()
+    item = Item.get_item_by_item_seq(db_session, item_seq)
+    item.purchase_request(db_session)
+    db_session.commit()
+    db_session.close()
+    assert client.get("/item/search/뷁쉛ㅌ", params = dict(mode = "chosung")).json() == []
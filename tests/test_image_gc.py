@@ -0,0 +1,97 @@
+from database.models.image_blob import ImageBlob
+from database.models.results import MACResult
+from fastapi.testclient import TestClient
+from datetime import datetime
+from typing import List
+import time
+import uuid
+import os
+
+def _write(path: str, age_hours: float = 0) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+    with open(path, "wb") as fp:
+        fp.write(b"image")
+
+    modified = time.time() - age_hours * 3600
+    os.utime(path, (modified, modified))
+    return path
+
+def _backdate(hashes: List[str]) -> None:
+    from routers.env import engine
+
+    db_session = engine.session_maker()
+    db_session.query(ImageBlob).filter(ImageBlob.hash.in_(hashes)).update({"updated_at": datetime(2000, 1, 1)}, synchronize_session = False)
+    db_session.commit()
+    db_session.close()
+
+def test_collect_deletes_only_old_unreferenced_files(client: TestClient, item_seq: int):
+    from database.models.item_images import ItemImages
+    from database.storage import image_storage
+    from database.jobs.image_gc import collect
+    from routers.env import engine
+
+    orphan, recent, referenced, missing = [uuid.uuid4().hex * 2 for _ in range(4)]
+    legacy = _write(os.path.join(image_storage.root, f"{uuid.uuid4()}.jpg"), age_hours = 48)
+    _write(image_storage.path(orphan), age_hours = 48)
+    _write(image_storage.path(recent))
+    _write(image_storage.path(referenced), age_hours = 48)
+
+    db_session = engine.session_maker()
+    assert ItemImages.insert_images(db_session, item_seq, [(900, image_storage.path(referenced))]) == [MACResult.SUCCESS]
+    ImageBlob.insert_many(db_session, [(orphan, 5, 0), (recent, 5, 0), (missing, 5, 0)])
+    db_session.commit()
+    # 물품 삭제의 CASCADE 처럼 release 없이 참조 수가 어긋난 상황
+    db_session.query(ImageBlob).filter_by(hash = referenced).update({"ref_count": 0}, synchronize_session = False)
+    db_session.commit()
+    db_session.close()
+    _backdate([orphan, recent, referenced, missing])
+
+    # dry_run 은 지울 대상만 세고 아무것도 바꾸지 않음
+    db_session = engine.session_maker()
+    report = collect(db_session, grace_hours = 1, dry_run = True)
+    assert report["files_deleted"] >= 2 and report["ref_counts_fixed"] >= 1
+    assert os.path.isfile(image_storage.path(orphan)) and os.path.isfile(legacy)
+    assert ImageBlob.get_ref_counts_by_hashes(db_session, [orphan, referenced, missing]) == {orphan: 0, referenced: 0, missing: 0}
+    db_session.close()
+
+    db_session = engine.session_maker()
+    report = collect(db_session, grace_hours = 1)
+    assert report["files_deleted"] >= 2 and report["reclaimed_bytes"] >= 10
+    db_session.close()
+
+    # 참조 없이 오래된 파일과 예전 uuid 파일만 지우고, 유예 시간 안의 파일과 참조 중인 파일은 남김
+    assert not os.path.exists(image_storage.path(orphan))
+    assert not os.path.exists(legacy)
+    assert os.path.isfile(image_storage.path(recent))
+    assert os.path.isfile(image_storage.path(referenced))
+
+    # 어긋난 참조 수는 실제 참조 수로 고치고, 파일이 없는 ref_count 0 행은 지움
+    db_session = engine.session_maker()
+    assert ImageBlob.get_ref_counts_by_hashes(db_session, [orphan, recent, referenced, missing]) == {recent: 0, referenced: 1}
+    db_session.close()
+
+def test_collect_keeps_a_blob_acquired_again_during_the_grace_period(client: TestClient):
+    from database.storage import image_storage
+    from database.jobs.image_gc import collect
+    from routers.env import engine
+
+    digest = uuid.uuid4().hex * 2
+    path = _write(image_storage.path(digest), age_hours = 48)
+    db_session = engine.session_maker()
+    ImageBlob.insert_many(db_session, [(digest, 5, 0)])
+    db_session.commit()
+    db_session.close()
+    _backdate([digest])
+
+    # 파일은 오래됐어도 행이 방금 다시 참조됐다가 풀렸으면 (updated_at 이 최근) 지우지 않음
+    db_session = engine.session_maker()
+    image_storage.acquire(db_session, path)
+    image_storage.release(db_session, path)
+    db_session.commit()
+    collect(db_session, grace_hours = 1)
+    db_session.close()
+
+    assert os.path.isfile(path)
+    db_session = engine.session_maker()
+    assert ImageBlob.get_ref_counts_by_hashes(db_session, [digest]) == {digest: 0}
+    db_session.close()
@@ -0,0 +1,68 @@
+from fastapi.testclient import TestClient
+from typing import List
+
+def insert_items(count: int) -> List[int]:
+    from database.models.item import Item
+    from routers.env import engine
+
+    db_session = engine.session_maker()
+    items = [Item(name = f"묶음 상품 {i}", category_seq = 1, user_seq = 1, views = i) for i in range(count)]
+    db_session.add_all(items)
+    db_session.commit()
+    seqs = [item.seq for item in items]
+    db_session.close()
+    return seqs
+
+def test_batch_keeps_order_duplicates_and_missing_items(client: TestClient, item_seq: int):
+    other = insert_items(1)[0]
+    missing = 10 ** 9
+    response = client.get("/item/batch", params = {"item_seqs": [other, missing, item_seq, other, missing]})
+    assert response.status_code == 200, response.text
+
+    body = response.json()
+    assert [item and item["seq"] for item in body["items"]] == [other, None, item_seq, other, None]
+    assert body["not_found"] == [missing]
+
+    # 한 개씩 조회한 응답과 같은 정보 (묶음 조회는 조회수를 올리지 않으므로 단건 조회보다 먼저 비교)
+    single = client.get("/item", params = {"item_seq": item_seq}).json()
+    assert body["items"][2] == {**single, "views": single["views"] - 1}
+
+def test_batch_rejects_too_many_items(client: TestClient):
+    from routers.env import MAX_BATCH_ITEMS
+
+    response = client.get("/item/batch", params = {"item_seqs": list(range(1, MAX_BATCH_ITEMS + 2))})
+    assert response.status_code == 422
+    assert str(MAX_BATCH_ITEMS) in response.json()["message"]
+    assert client.get("/item/batch", params = {"item_seqs": list(range(1, MAX_BATCH_ITEMS + 1))}).status_code == 200
+
+def test_batch_does_not_count_views(client: TestClient, item_seq: int):
+    from routers.env import view_counter
+
+    pending = view_counter.pending(item_seq)
+    client.get("/item/batch", params = {"item_seqs": [item_seq] * 3})
+    assert view_counter.pending(item_seq) == pending
+
+def test_batch_queries_do_not_grow_with_item_count(client: TestClient):
+    from database.models.item import Item
+    from routers.env import engine
+    from sqlalchemy import event
+
+    def count(seqs: List[int]) -> int:
+        statements = []
+
+        def listener(*args):
+            statements.append(args[2])
+
+        db_session = engine.session_maker()
+        event.listen(engine.engine, "before_cursor_execute", listener)
+        try:
+            infos = Item.get_info_by_item_seqs(db_session, seqs)
+
+        finally:
+            event.remove(engine.engine, "before_cursor_execute", listener)
+            db_session.close()
+
+        assert [info["seq"] for info in infos] == seqs
+        return len(statements)
+
+    assert count(insert_items(2)) == count(insert_items(30))
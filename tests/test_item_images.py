@@ -0,0 +1,82 @@
+from database.models.image_blob import ImageBlob
+from database.models.results import MACResult
+from fastapi.testclient import TestClient
+from PIL import Image
+import io
+import os
+
+def _png(color: str) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 300), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+def test_batch_upload_with_duplicate_image(client: TestClient, item_seq: int):
+    from routers.env import engine
+
+    same, other = _png("red"), _png("blue")
+    # 같은 이미지가 여러 장이면 파생 이미지를 동시에 만들면서 서로의 임시 파일을 덮어쓰던 문제가 있었음
+    files = [("images", (f"{name}.png", same, "image/png")) for name in "abcd"] + [("images", ("e.png", other, "image/png"))]
+    response = client.put(f"/item/images/{item_seq}", files = files)
+    assert response.status_code == 200, response.text
+
+    results = response.json()
+    assert [(result["index"], result["status"]) for result in results] == [(index, 200) for index in range(5)]
+    assert len({result["path"] for result in results[:4]}) == 1
+    assert results[0]["path"] != results[4]["path"]
+
+    # 같은 이미지는 파일 하나를 두 행이 참조하고, 중간 임시 파일은 남지 않음
+    db_session = engine.session_maker()
+    digest = os.path.splitext(os.path.basename(results[0]["path"]))[0]
+    assert ImageBlob.get_ref_counts_by_hashes(db_session, [digest]) == {digest: 4}
+    db_session.close()
+
+    for path in [results[0]["path"], results[4]["path"]]:
+        directory = os.path.dirname(path)
+        assert os.path.isfile(path)
+        assert not [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+    assert len(client.get(f"/item/images/{item_seq}").json()) == 5
+
+def test_insert_images_updates_ref_counts_in_constant_queries(client: TestClient, item_seq: int):
+    from database.models.item_images import ItemImages
+    from database.storage import image_storage
+    from routers.env import engine
+    from sqlalchemy import event
+    import uuid
+
+    def digests(count: int):
+        return [uuid.uuid4().hex * 2 for _ in range(count)]
+
+    def insert(first_index: int, hashes):
+        statements = []
+
+        def count(*args):
+            statements.append(args[2])
+
+        db_session = engine.session_maker()
+        event.listen(engine.engine, "before_cursor_execute", count)
+        try:
+            results = ItemImages.insert_images(db_session, item_seq, [(first_index + i, image_storage.path(hash)) for i, hash in enumerate(hashes)])
+            db_session.commit()
+
+        finally:
+            event.remove(engine.engine, "before_cursor_execute", count)
+            db_session.close()
+
+        assert set(results) == {MACResult.SUCCESS}
+        return len(statements)
+
+    known, new = digests(1)[0], digests(2)
+    db_session = engine.session_maker()
+    image_storage.acquire(db_session, image_storage.path(known))
+    db_session.commit()
+    db_session.close()
+
+    # 이미 있는 해시 2번, 새 해시 2번 + 1번
+    small = insert(100, [known, known, new[0], new[0], new[1]])
+    large = insert(200, [known] + digests(20))
+    assert small == large
+
+    db_session = engine.session_maker()
+    assert ImageBlob.get_ref_counts_by_hashes(db_session, [known, *new]) == {known: 4, new[0]: 2, new[1]: 1}
+    db_session.close()
@@ -0,0 +1,82 @@
+from database.utility.cursor_util import CursorUtility
+from fastapi.testclient import TestClient
+from typing import List
+import uuid
+
+def insert_items(names: List[str], category_seq: int = 1, views: int = 0) -> List[int]:
+    from database.models.item import Item
+    from routers.env import engine
+
+    db_session = engine.session_maker()
+    items = [Item(name = name, category_seq = category_seq, user_seq = 1, views = views) for name in names]
+    db_session.add_all(items)
+    db_session.commit()
+    seqs = [item.seq for item in items]
+    db_session.close()
+    return seqs
+
+def test_cursor_round_trip():
+    cursor = CursorUtility.encode({"views": 3, "seq": 42})
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert CursorUtility.decode(cursor) == {"views": 3, "seq": 42}
+    assert CursorUtility.decode("") == {}
+
+    # base64 가 아니거나, JSON 이 아니거나, dict 가 아니면 잘못된 커서
+    assert CursorUtility.decode("!!!") is None
+    assert CursorUtility.decode(CursorUtility.encode({"seq": 1})[:-3]) is None
+    assert CursorUtility.decode("WzEsMl0") is None
+
+def test_search_offset_pages_in_sql(client: TestClient):
+    token = uuid.uuid4().hex[:8]
+    seqs = insert_items([f"{token} 상품 {i}" for i in range(5)])
+
+    pages = [client.get(f"/item/search_detail/{token}", params = dict(start = start, count = 2)).json() for start in (0, 2, 4)]
+    assert [[item["seq"] for item in page] for page in pages] == [seqs[:2], seqs[2:4], seqs[4:]]
+
+    names = client.get(f"/item/search/{token}", params = dict(mode = "like", start = 1, count = 3)).json()
+    assert [name["name"] for name in names] == [f"{token} 상품 {i}" for i in range(1, 4)]
+
+def test_search_cursor_does_not_skip_or_repeat_under_inserts(client: TestClient):
+    token = uuid.uuid4().hex[:8]
+    seqs = insert_items([f"{token} 커서 {i}" for i in range(5)])
+
+    walked, cursor = [], ""
+    while cursor is not None:
+        page = client.get(f"/item/search_detail/{token}", params = dict(cursor = cursor, count = 2)).json()
+        walked += [item["seq"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if len(walked) == 2:
+            # 페이지 사이에 새 아이템이 들어와도 offset 처럼 밀리지 않고 끝에 한 번만 나옴
+            seqs += insert_items([f"{token} 커서 새 상품"])
+
+    assert walked == seqs
+
+def test_recommend_cursor_breaks_view_ties_by_seq(client: TestClient):
+    from database.models.item import Item
+    from routers.env import engine
+
+    # 순위 rebuild 뒤에 들어와서 조회수 순으로 붙는 아이템, 조회수가 모두 같음
+    category_seq = 9
+    seqs = insert_items([f"동점 {i}" for i in range(4)], category_seq = category_seq, views = 7)
+
+    def page(cursor: str):
+        db_session = engine.session_maker()
+        result = Item.get_recommended_item_by_cursor(db_session, cursor, 1, category_seq)
+        db_session.close()
+        return result
+
+    walked, cursor = [], ""
+    while cursor is not None:
+        result = page(cursor)
+        walked += [item["seq"] for item in result["items"]]
+        cursor = result["next_cursor"]
+        if len(walked) == 2:
+            seqs += insert_items(["동점 새 상품"], category_seq = category_seq, views = 7)
+
+    assert walked == seqs
+
+def test_invalid_cursor_is_rejected(client: TestClient):
+    response = client.get("/item/recommend", params = dict(cursor = "!!!"))
+    assert response.status_code == 422
+    response = client.get("/item/search_detail/아무거나", params = dict(cursor = CursorUtility.encode({"views": 1})))
+    assert response.status_code == 422
@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+import uuid
+
+def test_renamed_item_appears_in_cached_search(client: TestClient, item_seq: int):
+    from database.models.item import Item
+    from database.models.user import User
+    from routers.env import engine
+
+    db_session = engine.session_maker()
+    user_seq = Item.get_item_by_item_seq(db_session, item_seq).user_seq
+    user_id = db_session.query(User.user_id).filter_by(seq = user_seq).scalar()
+    db_session.close()
+
+    keyword = uuid.uuid4().hex[:8]
+    client.put("/item/insert", params = dict(user_id = user_id, name = "다른 상품", cnt = 1, price = 1000, description = "d", category = "패션"))
+    db_session = engine.session_maker()
+    other_seq = db_session.query(Item.seq).filter_by(user_seq = user_seq, name = "다른 상품").scalar()
+    db_session.close()
+    client.post("/item/update", params = dict(item_seq = item_seq, user_id = user_id, name = f"{keyword} 하나"))
+    assert [item["seq"] for item in client.get(f"/item/search_detail/{keyword}").json()] == [item_seq]
+
+    # 캐시된 검색 결과에 없던 아이템이 이름이 바뀌어서 새로 걸리면 캐시도 지워져야 함
+    client.post("/item/update", params = dict(item_seq = other_seq, user_id = user_id, name = f"{keyword} 둘"))
+    assert sorted(item["seq"] for item in client.get(f"/item/search_detail/{keyword}").json()) == [item_seq, other_seq]
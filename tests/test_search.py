@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+from typing import List
+import uuid
+
+def insert_item(name: str, description: str = "") -> int:
+    from database.models.item import Item
+    from routers.env import engine
+
+    db_session = engine.session_maker()
+    item = Item(name = name, category_seq = 1, user_seq = 1, views = 0, description = description)
+    db_session.add(item)
+    db_session.commit()
+    seq = item.seq
+    db_session.close()
+    return seq
+
+def update_item(seq: int, **values) -> None:
+    from database.models.item import Item
+    from routers.env import engine
+
+    db_session = engine.session_maker()
+    db_session.query(Item).filter_by(seq = seq).update(values)
+    db_session.commit()
+    db_session.close()
+
+def fulltext(client: TestClient, search_value: str, description: bool = False) -> List[int]:
+    response = client.get(f"/item/search_detail/{search_value}", params = dict(mode = "fulltext", description = description, count = 50, fields = "seq"))
+    return [item["seq"] for item in response.json()]
+
+def test_fulltext_finds_substrings_through_the_index(client: TestClient):
+    token = uuid.uuid4().hex[:6]
+    seq = insert_item(f"빈티지{token}가죽가방", description = f"설명{token}전용")
+
+    assert fulltext(client, f"지{token}가") == [seq]
+    # 설명은 description = true 일 때만 검색
+    assert fulltext(client, f"명{token}전") == []
+    assert fulltext(client, f"명{token}전", description = True) == [seq]
+
+    names = client.get(f"/item/search/{token}", params = dict(mode = "fulltext")).json()
+    assert names == [{"name": f"빈티지{token}가죽가방"}]
+
+def test_fulltext_index_follows_updates_and_sales(client: TestClient):
+    token = uuid.uuid4().hex[:6]
+    seq = insert_item(f"처음{token}이름")
+
+    update_item(seq, name = f"바뀐{token}이름")
+    assert fulltext(client, f"처음{token}") == []
+    assert fulltext(client, f"바뀐{token}") == [seq]
+
+    update_item(seq, purchase_type = True)
+    assert fulltext(client, f"{token}이름") == []
+
+def test_fulltext_falls_back_to_like_for_short_queries(client: TestClient):
+    from database.search import FullTextIndex
+    from routers.env import engine
+
+    # trigram 토크나이저로는 두 글자 검색어를 찾을 수 없음
+    seq = insert_item("숄더백 겸용 돎뷁", description = "뷃뷄 소재")
+    db_session = engine.session_maker()
+    assert FullTextIndex.search(db_session, "돎뷁", False, 0, 10) == [seq]
+    assert FullTextIndex.search(db_session, "뷃뷄", False, 0, 10) == []
+    assert FullTextIndex.search(db_session, "뷃뷄", True, 0, 10) == [seq]
+    db_session.close()
@@ -0,0 +1,46 @@
+from database.storage import ContentAddressedStorage, ImageStorage
+import pytest
+
+class MemoryStorage(ImageStorage):
+    def __init__(self):
+        self.refs = []
+
+    def temp_path(self):
+        return "tmp"
+
+    def path(self, digest):
+        return digest
+
+    def digest_of(self, path):
+        return path
+
+    def exists(self, path):
+        return False
+
+    def acquire(self, db_session, path):
+        self.refs.append(path)
+
+    def release(self, db_session, path):
+        self.refs.remove(path)
+
+    def delete(self, path):
+        return 0
+
+    def scan(self, batch_size):
+        return iter([])
+
+def test_incomplete_storage_cannot_be_created():
+    with pytest.raises(TypeError):
+        ImageStorage() # type: ignore
+
+    class NoScan(ImageStorage):
+        temp_path = path = digest_of = exists = acquire = release = delete = MemoryStorage.delete
+
+    with pytest.raises(TypeError, match = "scan"):
+        NoScan() # type: ignore
+
+def test_complete_storage_gets_default_acquire_many():
+    storage = MemoryStorage()
+    storage.acquire_many(None, ["a", "b", "a"]) # type: ignore
+    assert storage.refs == ["a", "b", "a"]
+    assert isinstance(ContentAddressedStorage(), ImageStorage)
@@ -0,0 +1,156 @@
+from fastapi.testclient import TestClient
+from typing import List
+import pytest
+import time
+
+def test_items_get_their_own_created_at():
+    from database.models.item import Item
+
+    first = Item(name = "a", category_seq = 1, user_seq = 1)
+    time.sleep(0.01)
+    second = Item(name = "b", category_seq = 1, user_seq = 1)
+    assert first.created_at < second.created_at
+
+def recommended_seqs(client: TestClient, count: int) -> List[int]:
+    """ 추천 목록 전체를 count 개씩 끝까지 넘겨보며 모은 아이템 고유 번호 """
+    seqs: List[int] = []
+    while True:
+        page = client.get("/item/recommend", params = dict(start = len(seqs), count = count)).json()
+        seqs += [item["seq"] for item in page]
+        if len(page) < count:
+            return seqs
+
+def test_new_items_are_recommended_before_rebuild(client: TestClient, item_seq: int):
+    from database.models.item import Item
+    from routers.env import engine
+
+    # API 로 등록한 아이템은 commit 뒤에 순위에 바로 들어감
+    assert item_seq in recommended_seqs(client, 50)
+
+    # 다른 프로세스에서 등록된 것처럼 순위를 건너뛰고 넣은 아이템은 순위 뒤에 붙음
+    db_session = engine.session_maker()
+    item = Item(name = "다른 프로세스 상품", category_seq = 1, user_seq = 1, views = 0)
+    db_session.add(item)
+    db_session.commit()
+    seq = item.seq
+    db_session.close()
+
+    # 직접 넣은 행은 응답 캐시를 지우지 않으므로 다른 파라미터로 조회
+    seqs = recommended_seqs(client, 49)
+    assert seqs.count(seq) == 1 and seqs.count(item_seq) == 1
+
+def test_manual_rebuild_ranks_items_inserted_by_other_processes(client: TestClient):
+    from database.search import trending_index
+    from database.models.item import Item
+    from routers.env import engine, request_trending_rebuild
+
+    db_session = engine.session_maker()
+    item = Item(name = "수동 rebuild 상품", category_seq = 1, user_seq = 1, views = 10 ** 6)
+    db_session.add(item)
+    db_session.commit()
+    seq = item.seq
+    db_session.close()
+    assert seq not in trending_index.scores
+
+    async def rebuild() -> None:
+        await request_trending_rebuild()
+
+    client.portal.call(rebuild)
+    assert trending_index.slice(0, 1) == [seq]
+
+def test_trending_signal_requests_a_rebuild(monkeypatch):
+    import routers.env as env
+    import asyncio
+    import signal
+    import os
+
+    if env.TRENDING_SIGNAL is None:
+        pytest.skip("trending_signal 을 쓸 수 없는 플랫폼")
+
+    calls = []
+
+    async def rebuild() -> None:
+        calls.append(True)
+
+    monkeypatch.setattr(env, "try_rebuild_trending", rebuild)
+
+    async def main() -> None:
+        assert env.install_trending_signal()
+        try:
+            os.kill(os.getpid(), env.TRENDING_SIGNAL)
+            for _ in range(100):
+                if calls:
+                    break
+
+                await asyncio.sleep(0.01)
+
+        finally:
+            env.remove_trending_signal()
+
+    asyncio.run(main())
+    assert calls == [True]
+    assert signal.getsignal(env.TRENDING_SIGNAL) == signal.SIG_DFL
+
+def insert_items(category_seq: int, views: List[int], saved_cnt: int = 0) -> List[int]:
+    from database.models.item import Item
+    from routers.env import engine
+
+    db_session = engine.session_maker()
+    items = [Item(name = f"순위 상품 {view}", category_seq = category_seq, user_seq = 1, views = view, saved_cnt = saved_cnt) for view in views]
+    db_session.add_all(items)
+    db_session.commit()
+    seqs = [item.seq for item in items]
+    db_session.close()
+    return seqs
+
+def recommend(function, *args):
+    from routers.env import engine
+
+    db_session = engine.session_maker()
+    result = function(db_session, *args)
+    db_session.close()
+    return result
+
+def test_recommend_backfills_items_sold_in_other_processes(client: TestClient):
+    from database.models.item import Item
+    from routers.env import engine, rebuild_trending
+
+    category_seq = 10
+    seqs = insert_items(category_seq, [50, 40, 30, 20, 10])
+    client.portal.call(rebuild_trending)
+
+    # 다른 워커에서 팔려서 이 프로세스의 순위에는 아직 남아 있음
+    db_session = engine.session_maker()
+    db_session.query(Item).filter(Item.seq.in_(seqs[:2])).update({"purchase_type": True}, synchronize_session = False)
+    db_session.commit()
+    db_session.close()
+
+    page = recommend(Item.get_recommended_item, 0, 3, category_seq)
+    assert [item["seq"] for item in page] == seqs[2:]
+
+def test_recommend_cursor_follows_the_trending_ranking(client: TestClient):
+    from database.search import trending_index
+    from database.models.item import Item
+    from routers.env import rebuild_trending
+
+    category_seq = 11
+    insert_items(category_seq, [5, 500, 50, 0, 5000, 1, 2])
+    # 조회수는 적어도 저장을 많이 해서 인기 순위에서는 앞에 옴
+    saved = insert_items(category_seq, [3], saved_cnt = 10 ** 4)
+    client.portal.call(rebuild_trending)
+    unranked = insert_items(category_seq, [7])
+    ranking = [item["seq"] for item in recommend(Item.get_recommended_item, 0, 50, category_seq)]
+    assert ranking[:-1] == trending_index.slice(0, 50, category_seq) and ranking[-1:] == unranked
+    assert ranking[0] == saved[0]
+
+    seqs, cursor = [], ""
+    while cursor is not None:
+        page = recommend(Item.get_recommended_item_by_cursor, cursor, 2, category_seq)
+        seqs += [item["seq"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if len(seqs) == 2:
+            # 페이지 사이에 순위를 다시 만들어도 건너뛰거나 겹치지 않음
+            client.portal.call(rebuild_trending)
+            ranking = trending_index.slice(0, 50, category_seq)
+
+    assert seqs == ranking
@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+import uuid
+
+def test_user_cache_drops_rows_cached_before_commit(client: TestClient):
+    from database.models.results import MACResult
+    from database.models.user import User
+    from routers.env import engine
+
+    user_id = f"user-{uuid.uuid4().hex[:8]}"
+    client.put("/user/signup", json = dict(user_id = user_id, password = "pw", name = "before", email = f"{user_id}@test.com", phone = "010", idnum = user_id))
+
+    writer = engine.session_maker()
+    user = User._load_user_info(writer, user_id = user_id)
+    assert user.update_info(writer, user_id, name = "after") == MACResult.SUCCESS
+
+    # flush 와 commit 사이에 다른 요청이 바뀌기 전 행을 읽어서 캐시함
+    reader = engine.session_maker()
+    assert User._load_user_info(reader, user_id = user_id).name == "before"
+    reader.close()
+
+    writer.commit()
+    writer.close()
+
+    reader = engine.session_maker()
+    assert User._load_user_info(reader, user_id = user_id).name == "after"
+    reader.close()
+
+def test_rename_refreshes_cached_item_details(client: TestClient, item_seq: int):
+    from database.models.results import MACResult
+    from database.models.user import User
+    from database.models.item import Item
+    from routers.env import engine
+
+    params = dict(item_seq = item_seq, fields = "middleman_name")
+    assert client.get("/item", params = params).json()["middleman_name"] == "seller"
+
+    db_session = engine.session_maker()
+    user = db_session.query(User).filter(User.seq == db_session.query(Item.user_seq).filter_by(seq = item_seq).scalar_subquery()).one()
+    assert user.update_info(db_session, user.user_id, name = "renamed") == MACResult.SUCCESS
+    db_session.commit()
+    db_session.close()
+
+    assert client.get("/item", params = params).json()["middleman_name"] == "renamed"
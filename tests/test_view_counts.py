@@ -0,0 +1,117 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+def test_merge_sketches_skips_deleted_items(client: TestClient, item_seq: int):
+    from database.utility.hyperloglog import HyperLogLog
+    from database.models.item_viewers import ItemViewers
+    from database.models.item import Item
+    from routers.env import engine
+
+    missing = item_seq + 10 ** 6
+    sketches = {item_seq: HyperLogLog(), missing: HyperLogLog()}
+    for sketch in sketches.values():
+        sketch.add("viewer")
+
+    # MySQL 처럼 외래 키를 검사하도록 켬
+    with engine.engine.connect() as connection:
+        connection.execute(text("PRAGMA foreign_keys = ON"))
+        try:
+            db_session = Session(bind = connection)
+            Item.apply_view_counts(db_session, {item_seq: 1, missing: 1})
+            ItemViewers.merge_sketches(db_session, sketches)
+            db_session.commit()
+
+            assert [seq for (seq,) in db_session.query(ItemViewers.item_seq).filter(ItemViewers.item_seq.in_(sketches.keys()))] == [item_seq]
+            db_session.close()
+
+        finally:
+            connection.execute(text("PRAGMA foreign_keys = OFF"))
+
+def views_of(item_seq: int) -> int:
+    from database.models.item import Item
+    from routers.env import engine
+
+    db_session = engine.session_maker()
+    views = db_session.query(Item.views).filter_by(seq = item_seq).scalar() or 0
+    db_session.close()
+    return views
+
+def failing_apply_view_counts(monkeypatch, error: Exception, poison: int):
+    from database.models.item import Item
+
+    apply_view_counts = Item.apply_view_counts
+
+    def apply(db_session, counts):
+        if poison in counts:
+            raise error
+
+        apply_view_counts(db_session, counts)
+
+    monkeypatch.setattr(Item, "apply_view_counts", staticmethod(apply))
+
+def test_flush_drops_only_the_failing_item(client: TestClient, item_seq: int, monkeypatch):
+    from sqlalchemy.exc import IntegrityError
+    from routers.env import view_counter, flush_view_counts
+
+    poison = item_seq + 10 ** 6
+    failing_apply_view_counts(monkeypatch, IntegrityError("UPDATE item", {}, Exception("foreign key")), poison)
+    before = views_of(item_seq)
+
+    async def flush() -> None:
+        for _ in range(3):
+            view_counter.add(item_seq, "viewer")
+
+        view_counter.add(poison, "viewer")
+        await flush_view_counts()
+
+    client.portal.call(flush)
+    assert views_of(item_seq) == before + 3
+    assert view_counter.pending(item_seq) == 0
+    assert view_counter.pending(poison) == 0
+
+def test_flush_keeps_the_batch_on_operational_error(client: TestClient, item_seq: int, monkeypatch):
+    from sqlalchemy.exc import OperationalError
+    from routers.env import view_counter, flush_view_counts
+
+    failing_apply_view_counts(monkeypatch, OperationalError("UPDATE item", {}, Exception("lost connection")), item_seq)
+    before = views_of(item_seq)
+
+    async def flush() -> None:
+        view_counter.add(item_seq, "viewer")
+        view_counter.add(item_seq, "viewer")
+        await flush_view_counts()
+
+    client.portal.call(flush)
+    assert views_of(item_seq) == before
+    assert view_counter.pending(item_seq) == 2
+
+    monkeypatch.undo()
+    client.portal.call(flush_view_counts)
+    assert views_of(item_seq) == before + 2
+    assert view_counter.pending(item_seq) == 0
+
+def test_cancelled_flush_is_drained_on_shutdown(client: TestClient, item_seq: int):
+    from routers.env import view_counter, flush_view_counts
+    import asyncio
+
+    before = views_of(item_seq)
+
+    async def shutdown() -> None:
+        view_counter.add(item_seq, "viewer")
+        flusher = asyncio.create_task(flush_view_counts())
+        await asyncio.sleep(0)
+        # 종료할 때처럼 반영 도중에 취소하면 꺼낸 조회수를 버퍼에 되돌려 놓음
+        flusher.cancel()
+        try:
+            await flusher
+
+        except asyncio.CancelledError:
+            pass
+
+        assert view_counter.pending(item_seq) == 1
+        await flush_view_counts()
+
+    client.portal.call(shutdown)
+    assert views_of(item_seq) == before + 1
+    assert view_counter.pending(item_seq) == 0